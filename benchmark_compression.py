@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Write throughput of the output compression codecs and levels.
+
+Writes the same edge list rows once uncompressed and once per codec and level,
+through the writers the crawler uses, and reports rows per second, MB per
+second of uncompressed CSV and the compression ratio:
+
+    python benchmark_compression.py --rows 200000
+    python benchmark_compression.py --edge-list EdgeList/Edge_List.csv --gzip-levels 1,6 --zstd-levels 1,3,10
+
+Without ``--edge-list`` the rows are synthetic, with a realistic mix of
+repeated channels and connection types. zstd levels are skipped when the
+``zstandard`` package is not installed.
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import random
+import tempfile
+import time
+
+from telegram_snowball_sampling.compact_graph import EDGE_LIST_COLUMNS
+from telegram_snowball_sampling.compression import compressed_path, open_text
+from telegram_snowball_sampling.output import OutputService
+
+logger = logging.getLogger(__name__)
+
+CONNECTION_TYPES = ['forward'] * 6 + ['recommendation', 'outbound_link', 'telegram_link']
+
+
+def synthetic_rows(count: int, channels: int = 5000, seed: int = 0) -> list[list[str]]:
+    """Edge list rows between ``channels`` channels with skewed popularity."""
+    rng = random.Random(seed)
+    names = [(str(1000000000 + i), f"Channel {i}", f"channel_{i}") for i in range(channels)]
+    rows = []
+    for _ in range(count):
+        source = names[int(rng.paretovariate(1.2)) % channels]
+        target = names[int(rng.paretovariate(1.2) * 7) % channels]
+        rows.append([*source, *target, rng.choice(CONNECTION_TYPES), '1'])
+    return rows
+
+
+def read_rows(edge_list_path: str, limit: int) -> list[list[str]]:
+    """Up to ``limit`` data rows of an existing, possibly compressed, edge list."""
+    rows = []
+    with open_text(edge_list_path, 'r') as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        for row in reader:
+            rows.append(row)
+            if len(rows) >= limit:
+                break
+    return rows
+
+
+async def write_rows(path: str, rows: list[list[str]], compression: str, level: int) -> str:
+    """Write ``rows`` through an ``OutputService`` sink; return the path written."""
+    async with OutputService(fsync='never', compression=compression, compression_level=level) as outputs:
+        sink = outputs.open(path, EDGE_LIST_COLUMNS)
+        sink.writerows(rows)
+    return sink.path
+
+
+def benchmark(rows: list[list[str]], codecs: list[tuple[str, int]], directory: str) -> list[dict]:
+    """Time writing ``rows`` with each ``(compression, level)``."""
+    results = []
+    baseline = None
+    for compression, level in codecs:
+        path = compressed_path(os.path.join(directory, f"bench_{compression}_{level}.csv"), compression)
+        if os.path.exists(path):
+            os.remove(path)
+        started = time.perf_counter()
+        path = asyncio.run(write_rows(path, rows, compression, level))
+        seconds = time.perf_counter() - started
+        size = os.path.getsize(path)
+        if baseline is None:
+            baseline = size
+        results.append({
+            'compression': compression,
+            'level': level if compression != 'none' else '-',
+            'rows_per_second': len(rows) / seconds,
+            'mb_per_second': baseline / seconds / 1e6,
+            'size_mb': size / 1e6,
+            'ratio': baseline / size,
+        })
+        os.remove(path)
+    return results
+
+
+def parse_levels(value: str) -> list[int]:
+    return [int(level) for level in value.split(',') if level.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark edge list write throughput per compression level')
+    parser.add_argument('--rows', type=int, default=200000, help='Rows written per run')
+    parser.add_argument('--edge-list', dest='edge_list_path', default=None,
+                        help='Take the rows from this edge list instead of generating them')
+    parser.add_argument('--gzip-levels', default='1,3,6,9', help='Comma-separated gzip levels')
+    parser.add_argument('--zstd-levels', default='1,3,6,10,19', help='Comma-separated zstd levels')
+    parser.add_argument('--output-dir', default=None, help='Directory for the temporary files')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    rows = read_rows(args.edge_list_path, args.rows) if args.edge_list_path else synthetic_rows(args.rows)
+    codecs = [('none', 0)] + [('gzip', level) for level in parse_levels(args.gzip_levels)]
+    try:
+        import zstandard  # noqa: F401
+        codecs += [('zstd', level) for level in parse_levels(args.zstd_levels)]
+    except ImportError:
+        logger.warning("zstandard is not installed; skipping zstd levels")
+
+    with tempfile.TemporaryDirectory(dir=args.output_dir) as directory:
+        results = benchmark(rows, codecs, directory)
+
+    print(f"{len(rows)} rows, {results[0]['size_mb']:.1f} MB uncompressed")
+    print(f"{'codec':<6} {'level':>5} {'rows/s':>10} {'MB/s':>8} {'size MB':>8} {'ratio':>6}")
+    for result in results:
+        print(f"{result['compression']:<6} {result['level']:>5} {result['rows_per_second']:>10,.0f} "
+              f"{result['mb_per_second']:>8.1f} {result['size_mb']:>8.2f} {result['ratio']:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Startup time of the command line entry point.
+
+Runs each command in a fresh interpreter several times and reports the median
+wall time and which heavy dependencies it imported, next to the interpreter
+alone and to importing every command module up front (what ``main.py`` and
+``network_analysis.py`` used to do before doing anything):
+
+    python benchmark_startup.py
+    python benchmark_startup.py --repeat 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import telegram_snowball_sampling
+
+HEAVY_MODULES = ('telethon', 'networkx', 'numpy', 'pandas', 'matplotlib')
+
+
+def commands(directory: str) -> list[tuple[str, list[str]]]:
+    """The measured commands; ``merge`` runs on empty folders in ``directory``."""
+    cli = [sys.executable, '-m', 'telegram_snowball_sampling']
+    return [
+        ('interpreter only', [sys.executable, '-c', 'pass']),
+        ('all modules up front', [sys.executable, '-c', 'import telegram_snowball_sampling.crawler, '
+                                                        'telegram_snowball_sampling.analysis']),
+        ('--help', [*cli, '--help']),
+        ('crawl --help', [*cli, 'crawl', '--help']),
+        ('analyze --help', [*cli, 'analyze', '--help']),
+        ('compact --help', [*cli, 'compact', '--help']),
+        ('merge', [*cli, 'merge', '--results-folder', os.path.join(directory, 'results'),
+                   '--merged-folder', os.path.join(directory, 'merged')]),
+    ]
+
+
+def imported_heavy_modules(command: list[str], env: dict[str, str]) -> list[str]:
+    """Heavy dependencies imported by the command, from ``-X importtime``."""
+    result = subprocess.run([command[0], '-X', 'importtime', *command[1:]], env=env, capture_output=True, text=True)
+    imported = {line.rsplit('|', 1)[-1].strip() for line in result.stderr.splitlines() if line.startswith('import time:')}
+    return [module for module in HEAVY_MODULES if module in imported]
+
+
+def benchmark(repeat: int) -> list[dict]:
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(telegram_snowball_sampling.__file__)))
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [package_root, os.getenv('PYTHONPATH')]))}
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, 'results'))
+        for name, command in commands(directory):
+            times = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+                times.append(time.perf_counter() - started)
+            results.append({
+                'command': name,
+                'median_ms': statistics.median(times) * 1000,
+                'min_ms': min(times) * 1000,
+                'imports': imported_heavy_modules(command, env),
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the startup time of python -m telegram_snowball_sampling')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per command')
+    args = parser.parse_args()
+
+    print(f"{'command':<22} {'median ms':>9} {'min ms':>7}  heavy imports")
+    for result in benchmark(args.repeat):
+        print(f"{result['command']:<22} {result['median_ms']:>9.0f} {result['min_ms']:>7.0f}  "
+              f"{', '.join(result['imports']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
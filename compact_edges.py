@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Compact edge lists and the edge store.
+
+Same as ``python -m telegram_snowball_sampling compact``.
+
+With ``--input``, streams an existing edge list (plain, gzip or zstd) into a
+compacted copy in the same schema, one row per (From_Channel_ID,
+To_Channel_ID, ConnectionType) with the summed weight, in bounded memory (see
+``compaction``), and reports the compaction ratio and rows per second:
+
+    python compact_edges.py --input EdgeList/Edge_List.csv --output EdgeList/Edge_List.compact.csv.gz
+
+Otherwise folds the raw partitions of finished edge store runs into one
+weight-aggregated segment per run (see ``EdgeStore.compact``). Crawls may keep
+writing to the store meanwhile, so this can run in the background:
+
+    python compact_edges.py --store EdgeStore                 # every finished run
+    python compact_edges.py --store EdgeStore --runs run_2024_05_01_10_00_00
+    python compact_edges.py --store EdgeStore --every 60      # compact once an hour
+    python compact_edges.py --store EdgeStore --list          # show the manifest
+"""
+
+import sys
+
+from telegram_snowball_sampling.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(['compact', *sys.argv[1:]]))
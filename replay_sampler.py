@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Offline replay of the snowball sampler.
+
+Re-runs ``process_channels`` against a message archive recorded during an
+earlier crawl (``ARCHIVE_FOLDER``) instead of Telegram, so the sampling
+parameters can be tuned in minutes without any API calls:
+
+    python replay_sampler.py --archive archive --seeds channel1,channel2 --min-mentions 10
+
+The results CSV and edge list are written to the output directory, apart from
+the results of live crawls.
+"""
+
+import argparse
+import asyncio
+import datetime
+import logging
+import os
+import time
+
+from telegram_snowball_sampling.archive import MessageArchive
+from telegram_snowball_sampling.compact_graph import EDGE_LIST_COLUMNS
+from telegram_snowball_sampling.config import Config
+from telegram_snowball_sampling.crawler import process_channels
+from telegram_snowball_sampling.date_window import DateWindow
+from telegram_snowball_sampling.frontier import FRONTIER_TYPES
+from telegram_snowball_sampling.output import OutputService
+from telegram_snowball_sampling.replay import ReplayClient
+from telegram_snowball_sampling.scan_policy import SCAN_POLICIES, ScanPolicy
+from telegram_snowball_sampling.sweep import parse_thresholds
+
+logger = logging.getLogger(__name__)
+
+
+async def replay(args: argparse.Namespace) -> None:
+    """Replay a crawl from the archive with the parameters in ``args``."""
+    archive = MessageArchive(args.archive)
+    if not archive.channels():
+        logger.error("No archived channels found in %s", args.archive)
+        return
+
+    # A replay must neither skip URL edges seen by live runs nor write into their results
+    Config.URL_DEDUP_FILE = ''
+    Config.SAVE_RAW_URLS = False
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    datetimestamp = datetime.datetime.now().strftime('%Y_%m_%d_%H_%M_%S')
+    results_path = os.path.join(args.output_dir, f'replay_results_{datetimestamp}.csv')
+    edge_list_path = os.path.join(args.output_dir, f'replay_edge_list_{datetimestamp}.csv')
+
+    client = ReplayClient(archive)
+    start_time = time.time()
+    async with OutputService.from_config(Config) as outputs:
+        results_path, edge_list_path = outputs.path(results_path), outputs.path(edge_list_path)
+        edge_list_writer = outputs.open(edge_list_path, EDGE_LIST_COLUMNS)
+        results_writer = outputs.open(results_path, ['Channel ID', 'Channel Name', 'Channel Username'], rotate=False)
+        _, iteration_durations, channel_counts, total_messages = await process_channels(
+            client,
+            results_path,
+            [seed.strip() for seed in args.seeds.split(',') if seed.strip()],
+            args.iterations,
+            args.min_mentions,
+            args.max_posts,
+            not args.no_recommendations,
+            args.recommendations_depth,
+            not args.no_urls,
+            edge_list_writer=edge_list_writer,
+            frontier=args.frontier,
+            scan_policy=ScanPolicy.from_config(Config, args.max_posts)
+            if args.scan_policy is None else ScanPolicy(args.max_posts, adaptive=args.scan_policy == 'adaptive'),
+            date_window=DateWindow.parse(args.start_date, args.end_date),
+            sweep_thresholds=parse_thresholds(args.sweep),
+            results_writer=results_writer,
+        )
+
+    elapsed = time.time() - start_time
+    logger.info("Replayed %d messages in %.1f seconds (%.0f messages/second)",
+                total_messages, elapsed, total_messages / elapsed if elapsed else 0)
+    logger.info("Channels found per iteration: %s", channel_counts)
+    logger.info("Replay: %s", client.summary())
+    if client.missing_channels:
+        logger.warning("%d channels reached by this replay were never archived; "
+                       "a live crawl would have scanned them", len(client.missing_channels))
+    logger.info("Results written to %s and %s", results_path, edge_list_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Replay the snowball sampler from a message archive')
+    parser.add_argument('--archive', '-a', default=Config.ARCHIVE_FOLDER or 'archive',
+                        help='Archive folder recorded by a crawl with ARCHIVE_FOLDER set')
+    parser.add_argument('--seeds', '-s', required=True,
+                        help='Comma-separated seed channels (usernames or IDs)')
+    parser.add_argument('--output-dir', '-o', default='replay',
+                        help='Directory for the replay results and edge list')
+    parser.add_argument('--iterations', type=int, default=Config.DEFAULT_ITERATIONS)
+    parser.add_argument('--min-mentions', type=int, default=Config.DEFAULT_MIN_MENTIONS)
+    parser.add_argument('--max-posts', type=int, default=Config.DEFAULT_MAX_POSTS)
+    parser.add_argument('--no-recommendations', action='store_true',
+                        help='Ignore the archived channel recommendations')
+    parser.add_argument('--recommendations-depth', type=int, default=Config.DEFAULT_RECOMMENDATIONS_DEPTH)
+    parser.add_argument('--no-urls', action='store_true', help='Skip URL extraction')
+    parser.add_argument('--frontier', choices=FRONTIER_TYPES, default=Config.CRAWL_FRONTIER)
+    parser.add_argument('--scan-policy', choices=SCAN_POLICIES, default=None,
+                        help='Per-channel scan depth (default: SCAN_POLICY)')
+    parser.add_argument('--start-date', default=Config.DEFAULT_START_DATE,
+                        help='Oldest messages to replay: YYYY-MM-DD or number of days back')
+    parser.add_argument('--end-date', default=Config.DEFAULT_END_DATE,
+                        help='Newest messages to replay: YYYY-MM-DD')
+    parser.add_argument('--sweep', default=Config.SWEEP_THRESHOLDS,
+                        help='Further comma-separated minimum mentions derived from the same replay')
+
+    asyncio.run(replay(parser.parse_args()))
@@ -1,7 +1,23 @@
-"""Telegram Snowball Sampling core package."""
+"""Telegram Snowball Sampling core package.
 
-from .config import Config
-from .edge_list import create_edge_list
-from .merge_csv_data import merge_csv_files
+The exports are imported on first use, so ``python -m telegram_snowball_sampling``
+only loads the modules of the command it runs.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "Config": ".config",
+    "create_edge_list": ".edge_list",
+    "merge_csv_files": ".merge_csv_data",
+}
 
 __all__ = ["Config", "create_edge_list", "merge_csv_files"]
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
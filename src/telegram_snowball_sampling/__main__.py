@@ -0,0 +1,7 @@
+"""``python -m telegram_snowball_sampling``: see ``cli``."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
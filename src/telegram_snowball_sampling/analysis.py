@@ -0,0 +1,697 @@
+"""Network analysis for Telegram Snowball Sampling data.
+
+Performs network analysis on the edge list data generated by the Telegram
+Snowball Sampling Tool. Metrics are computed on a ``CompactGraph``, with
+NetworkX used where required, and the network is exported to Gephi, a PNG
+rendering and an interactive HTML viewer. pandas (for the metrics workbook)
+and matplotlib (for the PNG) are only imported by the exports that use them.
+
+Run it with ``python -m telegram_snowball_sampling analyze`` (or the
+``network_analysis.py`` script).
+"""
+
+import argparse
+import logging
+import os
+from typing import Any, Callable
+
+import networkx as nx
+import numpy as np
+
+from .analysis_state import AnalysisState
+from .backbone import BACKBONE_METHODS, extract_backbone
+from .compact_graph import CompactGraph
+from .compression import compressed_path
+from .config import Config
+from .edge_store import EdgeStore
+from .graph_algorithms import (
+    label_propagation,
+    pagerank,
+    weakly_connected_components,
+)
+from .html_viewer import build_viewer_payload, write_html_viewer
+from .layout import (
+    CONNECTION_TYPE_COLORS,
+    DEFAULT_EDGE_COLOR,
+    graph_fingerprint,
+    load_layout_cache,
+    multilevel_layout,
+    rasterize_graph,
+    save_layout_cache,
+)
+from .output import rotated_parts
+
+logger = logging.getLogger(__name__)
+
+
+def load_compact_graph(edge_list_path: str) -> CompactGraph | None:
+    """Stream the edge list CSV file into a compact integer-indexed graph.
+
+    This is the memory-efficient loader used for large crawls; repeated rows are
+    summed as in ``load_edge_list``. Files rotated out of the edge list
+    (``OUTPUT_ROTATE_MB``) are read first, oldest first.
+
+    Args:
+        edge_list_path (str): Path to the edge list CSV file.
+
+    Returns:
+        CompactGraph | None: The graph, or None if the file could not be read.
+    """
+    parts = rotated_parts(edge_list_path)
+    logger.info("Loading edge list from %s", ', '.join(parts))
+
+    try:
+        graph = CompactGraph.from_edge_list(*parts)
+        logger.info(
+            "Loaded network with %d nodes and %d edges (%.1f MB)",
+            graph.number_of_nodes(),
+            graph.number_of_edges(),
+            graph.nbytes / 1e6,
+        )
+        return graph
+
+    except Exception as e:
+        logger.error("Error loading edge list: %s", e)
+        return None
+
+
+def load_store_graph(
+    store_path: str,
+    runs: list[str] | None = None,
+    iterations: list[int] | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> CompactGraph | None:
+    """Stream the selected partitions of an edge store into a compact graph.
+
+    Only the partitions picked from the manifest are opened.
+
+    Args:
+        store_path (str): Edge store folder (``EDGE_STORE_FOLDER``).
+        runs (list[str], optional): Run IDs to include (default: all finished runs).
+        iterations (list[int], optional): Iterations to include, for runs partitioned per iteration.
+        since (str, optional): Only runs started on or after this ISO date.
+        until (str, optional): Only runs started before this ISO date.
+
+    Returns:
+        CompactGraph | None: The graph, or None if the store could not be read.
+    """
+    try:
+        store = EdgeStore(store_path)
+        partitions = store.select(runs, iterations, since, until)
+        logger.info("Loading %d of %d edge store partitions from %s (%d rows)", len(partitions),
+                    len(store.read_manifest()['partitions']), store_path,
+                    sum(partition.rows for partition in partitions))
+        graph = CompactGraph.from_rows(store.iter_rows(partitions))
+        logger.info(
+            "Loaded network with %d nodes and %d edges (%.1f MB)",
+            graph.number_of_nodes(),
+            graph.number_of_edges(),
+            graph.nbytes / 1e6,
+        )
+        return graph
+
+    except Exception as e:
+        logger.error("Error loading edge store: %s", e)
+        return None
+
+
+def load_edge_list(edge_list_path: str) -> nx.DiGraph:
+    """Load the edge list from a CSV file into a NetworkX graph.
+
+    Args:
+        edge_list_path (str): Path to the edge list CSV file.
+
+    Returns:
+        nx.DiGraph: A directed graph representing the network.
+    """
+    graph = load_compact_graph(edge_list_path)
+    if graph is None:
+        return nx.DiGraph()  # Return empty graph on error
+    return graph.to_networkx()
+
+
+def run_incremental_analysis(edge_list_path: str, state_path: str) -> tuple[dict[str, Any], AnalysisState]:
+    """Update the persistent analysis state with new edge list rows and return its metrics.
+
+    Args:
+        edge_list_path (str): Path to the edge list CSV file.
+        state_path (str): Path of the saved analysis state.
+
+    Returns:
+        tuple: The metrics and the updated state.
+    """
+    state = AnalysisState.load(state_path)
+    state.update_from_edge_list(edge_list_path)
+    state.save(state_path)
+    return state.metrics(), state
+
+
+def extract_backbone_graph(
+    G: nx.DiGraph | CompactGraph,
+    edge_budget: int,
+    method: str = 'disparity',
+) -> nx.DiGraph | CompactGraph:
+    """Reduce the graph to a backbone of at most ``edge_budget`` edges.
+
+    Nodes left without any edge are dropped. Node and edge attributes are kept.
+
+    Args:
+        G (nx.DiGraph | CompactGraph): The network graph.
+        edge_budget (int): Maximum number of edges in the backbone.
+        method (str): Backbone method ("disparity", "kcore" or "topk").
+
+    Returns:
+        nx.DiGraph | CompactGraph: The backbone graph, of the same type as ``G``.
+    """
+    node_ids, src, dst, weights, _ = graph_to_arrays(G)
+    keep = extract_backbone(src, dst, weights, len(node_ids), edge_budget, method)
+    if isinstance(G, CompactGraph):
+        B = G.edge_subgraph(keep)
+    else:
+        B = G.edge_subgraph((node_ids[src[i]], node_ids[dst[i]]) for i in np.flatnonzero(keep)).copy()
+
+    logger.info(
+        "Extracted %s backbone: %d of %d nodes, %d of %d edges",
+        method,
+        B.number_of_nodes(),
+        G.number_of_nodes(),
+        B.number_of_edges(),
+        G.number_of_edges(),
+    )
+    return B
+
+
+def calculate_network_metrics(
+    G: nx.DiGraph | CompactGraph,
+    networkx_max_edges: int | None = 2_000_000,
+) -> dict[str, Any]:
+    """Calculate various network metrics for the graph.
+
+    For a ``CompactGraph`` the counts, components, degrees and connection types
+    are computed on its arrays. Strongly connected components and the average
+    path length still need NetworkX, so they are only computed when the graph
+    has at most ``networkx_max_edges`` edges and are None otherwise.
+
+    Args:
+        G (nx.DiGraph | CompactGraph): The network graph.
+        networkx_max_edges (int, optional): Largest compact graph converted to
+            NetworkX for the remaining metrics. None means no limit.
+
+    Returns:
+        dict[str, Any]: Dictionary containing calculated metrics.
+    """
+    if isinstance(G, CompactGraph):
+        return _calculate_compact_metrics(G, networkx_max_edges)
+
+    metrics: dict[str, Any] = {}
+
+    # Basic metrics
+    metrics['node_count'] = G.number_of_nodes()
+    metrics['edge_count'] = G.number_of_edges()
+    metrics['density'] = nx.density(G)
+
+    # Calculate connected components (for directed graph)
+    # Weak components consider directions as undirected
+    metrics['weakly_connected_components'] = nx.number_weakly_connected_components(G)
+
+    # Strong components require following directions
+    metrics['strongly_connected_components'] = nx.number_strongly_connected_components(G)
+
+    # Top nodes by degree
+    in_degrees = dict(G.in_degree())
+    out_degrees = dict(G.out_degree())
+
+    metrics['top_receivers'] = sorted(in_degrees.items(), key=lambda x: x[1], reverse=True)[:10]
+    metrics['top_sources'] = sorted(out_degrees.items(), key=lambda x: x[1], reverse=True)[:10]
+
+    # Get connection type counts
+    connection_types = {}
+    for _, _, attr in G.edges(data=True):
+        conn_type = attr.get('connection_type', 'forward')
+        connection_types[conn_type] = connection_types.get(conn_type, 0) + 1
+
+    metrics['connection_types'] = connection_types
+    metrics['average_path_length'] = _average_path_length(G)
+
+    return metrics
+
+
+def _average_path_length(G: nx.DiGraph) -> float | None:
+    """Average shortest path length of the largest (undirected) component."""
+    try:
+        # Convert to undirected for path length calculation
+        UG = G.to_undirected()
+        largest_cc = max(nx.connected_components(UG), key=len)
+        largest_cc_graph = UG.subgraph(largest_cc)
+        return nx.average_shortest_path_length(largest_cc_graph)
+    except Exception as e:
+        logger.warning("Could not calculate average path length: %s", e)
+        return None
+
+
+def _calculate_compact_metrics(graph: CompactGraph, networkx_max_edges: int | None) -> dict[str, Any]:
+    """Calculate the metrics of ``calculate_network_metrics`` on a compact graph."""
+    n = graph.number_of_nodes()
+    m = graph.number_of_edges()
+    src, dst, _, _ = graph.edge_arrays()
+
+    metrics: dict[str, Any] = {
+        'node_count': n,
+        'edge_count': m,
+        'density': m / (n * (n - 1)) if n > 1 else 0.0,
+        'weakly_connected_components': len(np.unique(weakly_connected_components(src, dst, n))),
+        'connection_types': graph.connection_type_counts(),
+    }
+
+    def top(values: np.ndarray) -> list[tuple[str, int]]:
+        order = np.argsort(-values, kind='stable')[:10]
+        return [(graph.node_ids[i], int(values[i])) for i in order.tolist()]
+
+    metrics['top_receivers'] = top(graph.in_degree())
+    metrics['top_sources'] = top(graph.out_degree())
+
+    if networkx_max_edges is None or m <= networkx_max_edges:
+        G = graph.to_networkx()
+        metrics['strongly_connected_components'] = nx.number_strongly_connected_components(G)
+        metrics['average_path_length'] = _average_path_length(G)
+    else:
+        logger.info("Skipping strongly connected components and path length for %d edges", m)
+        metrics['strongly_connected_components'] = None
+        metrics['average_path_length'] = None
+
+    return metrics
+
+
+def log_network_summary(
+    metrics: dict[str, Any],
+    G: nx.DiGraph | CompactGraph | None = None,
+    name_lookup: Callable[[str], str] | None = None,
+) -> None:
+    """Log a summary of the network metrics.
+
+    Node names are taken from ``G`` or, when no graph is loaded (incremental
+    analysis), from ``name_lookup``.
+    """
+    if name_lookup is None and isinstance(G, CompactGraph):
+        name_lookup = G.node_name
+    elif name_lookup is None:
+        def name_lookup(node_id: str) -> str:
+            return G.nodes[node_id].get('name', 'Unknown')
+
+    logger.info("\n===== NETWORK ANALYSIS SUMMARY =====\n")
+
+    logger.info("Network Size:")
+    logger.info("  Nodes (Channels): %d", metrics['node_count'])
+    logger.info("  Edges (Connections): %d", metrics['edge_count'])
+    logger.info("  Density: %.4f", metrics['density'])
+
+    logger.info("\nConnectivity:")
+    logger.info("  Weakly Connected Components: %d", metrics['weakly_connected_components'])
+    if metrics['strongly_connected_components'] is not None:
+        logger.info("  Strongly Connected Components: %d", metrics['strongly_connected_components'])
+
+    if metrics['average_path_length']:
+        logger.info("  Average Path Length: %.2f", metrics['average_path_length'])
+
+    logger.info("\nConnection Types:")
+    for conn_type, count in metrics['connection_types'].items():
+        logger.info("  %s: %d (%.1f%%)", conn_type, count, count / metrics['edge_count'] * 100)
+
+    logger.info("\nTop Channel Sources (outgoing connections):")
+    for i, (node_id, degree) in enumerate(metrics['top_sources'], 1):
+        node_name = name_lookup(node_id)
+        logger.info("  %d. %s (ID: %s): %d outgoing connections", i, node_name, node_id, degree)
+
+    logger.info("\nTop Channel Receivers (incoming connections):")
+    for i, (node_id, degree) in enumerate(metrics['top_receivers'], 1):
+        node_name = name_lookup(node_id)
+        logger.info("  %d. %s (ID: %s): %d incoming connections", i, node_name, node_id, degree)
+
+    if metrics.get('top_pagerank'):
+        logger.info("\nTop Channels by PageRank:")
+        for i, (node_id, score) in enumerate(metrics['top_pagerank'], 1):
+            logger.info("  %d. %s (ID: %s): %.5f", i, name_lookup(node_id), node_id, score)
+
+
+def export_metrics_to_csv(metrics: dict[str, Any], output_path: str) -> None:
+    """Export the network metrics to a CSV file."""
+    try:
+        import pandas as pd
+
+        # Basic metrics
+        basic_metrics = {
+            'node_count': [metrics['node_count']],
+            'edge_count': [metrics['edge_count']],
+            'density': [metrics['density']],
+            'weakly_connected_components': [metrics['weakly_connected_components']],
+            'strongly_connected_components': [metrics['strongly_connected_components']],
+            'average_path_length': [metrics['average_path_length']]
+        }
+
+        # Create DataFrames
+        basic_df = pd.DataFrame(basic_metrics)
+
+        # Connection types
+        conn_types_data = [[conn_type, count] for conn_type, count in metrics['connection_types'].items()]
+        conn_types_df = pd.DataFrame(conn_types_data, columns=['connection_type', 'count'])
+
+        # Top sources
+        top_sources_data = [[i + 1, node_id, degree] for i, (node_id, degree) in enumerate(metrics['top_sources'])]
+        top_sources_df = pd.DataFrame(top_sources_data, columns=['rank', 'node_id', 'outgoing_connections'])
+
+        # Top receivers
+        top_receivers_data = [[i + 1, node_id, degree] for i, (node_id, degree) in enumerate(metrics['top_receivers'])]
+        top_receivers_df = pd.DataFrame(top_receivers_data, columns=['rank', 'node_id', 'incoming_connections'])
+
+        # Save to Excel with multiple sheets
+        with pd.ExcelWriter(output_path) as writer:
+            basic_df.to_excel(writer, sheet_name='Basic Metrics', index=False)
+            conn_types_df.to_excel(writer, sheet_name='Connection Types', index=False)
+            top_sources_df.to_excel(writer, sheet_name='Top Sources', index=False)
+            top_receivers_df.to_excel(writer, sheet_name='Top Receivers', index=False)
+            if metrics.get('top_pagerank'):
+                top_pagerank_data = [[i + 1, node_id, score]
+                                     for i, (node_id, score) in enumerate(metrics['top_pagerank'])]
+                pd.DataFrame(top_pagerank_data, columns=['rank', 'node_id', 'pagerank']).to_excel(
+                    writer, sheet_name='Top PageRank', index=False)
+
+        logger.info("Exported metrics to %s", output_path)
+
+    except Exception as e:
+        logger.error("Error exporting metrics to CSV: %s", e)
+
+
+def generate_gephi_file(G: nx.DiGraph | CompactGraph, output_path: str) -> None:
+    """Generate a GEXF file for use with Gephi visualization software."""
+    try:
+        if isinstance(G, CompactGraph):
+            G = G.to_networkx()
+
+        # Add readable labels to nodes
+        for node, attr in G.nodes(data=True):
+            username = attr.get('username', '')
+            name = attr.get('name', '')
+            G.nodes[node]['label'] = f"{name} (@{username})" if username else name
+
+        # Write to GEXF file
+        nx.write_gexf(G, output_path)
+        logger.info("Generated Gephi file at %s", output_path)
+        logger.info("You can open this file in Gephi for visualization and further analysis.")
+
+    except Exception as e:
+        logger.error("Error generating Gephi file: %s", e)
+
+
+def graph_to_arrays(
+    G: nx.DiGraph | CompactGraph,
+) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray, list[str]]:
+    """Convert a graph into node and edge arrays for the layout and renderer.
+
+    Args:
+        G (nx.DiGraph | CompactGraph): The network graph.
+
+    Returns:
+        tuple: Node IDs in index order, source indices, target indices, edge
+        weights and connection types.
+    """
+    if isinstance(G, CompactGraph):
+        src, dst, weights, types = G.edge_arrays()
+        type_names = np.array(G.type_names, dtype=object)
+        return (list(G.node_ids), src.astype(np.int64), dst.astype(np.int64),
+                weights.astype(float), type_names[types].tolist())
+
+    node_ids = list(G.nodes())
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    edge_count = G.number_of_edges()
+
+    src = np.empty(edge_count, dtype=np.int64)
+    dst = np.empty(edge_count, dtype=np.int64)
+    weights = np.empty(edge_count)
+    connection_types = []
+    for i, (u, v, attr) in enumerate(G.edges(data=True)):
+        src[i] = index[u]
+        dst[i] = index[v]
+        weights[i] = attr.get('weight', 1.0)
+        connection_types.append(attr.get('connection_type', 'forward'))
+
+    return node_ids, src, dst, weights, connection_types
+
+
+def compute_layout(
+    node_ids: list[str],
+    src: np.ndarray,
+    dst: np.ndarray,
+    weights: np.ndarray,
+    cache_path: str | None = None,
+    iterations: int = 50,
+) -> np.ndarray:
+    """Compute node positions, reusing a cached layout when possible.
+
+    An exact cache hit skips the layout entirely. If most nodes are already in
+    the cache, the cached positions are refined instead of recomputed.
+
+    Args:
+        node_ids (list[str]): Node IDs in index order.
+        src (np.ndarray): Source node indices.
+        dst (np.ndarray): Target node indices.
+        weights (np.ndarray): Edge weights.
+        cache_path (str, optional): Path of the ``.npz`` layout cache.
+        iterations (int): Force iterations per layout level.
+
+    Returns:
+        np.ndarray: Node positions of shape (n, 2).
+    """
+    fingerprint = graph_fingerprint(node_ids, len(src))
+    initial_positions = None
+
+    if cache_path:
+        cached, coverage, cached_fingerprint = load_layout_cache(cache_path, node_ids)
+        if cached is not None and cached_fingerprint == fingerprint:
+            logger.info("Reusing cached layout from %s", cache_path)
+            return cached
+        if cached is not None and coverage >= 0.5:
+            logger.info("Refining cached layout (%.0f%% of nodes cached)", coverage * 100)
+            initial_positions = cached
+
+    positions = multilevel_layout(src, dst, len(node_ids), weights,
+                                  iterations=iterations, initial_positions=initial_positions)
+
+    if cache_path:
+        save_layout_cache(cache_path, node_ids, positions, fingerprint)
+
+    return positions
+
+
+def generate_network_visualization(
+    G: nx.DiGraph | CompactGraph,
+    output_path: str,
+    layout_cache_path: str | None = None,
+    layout_iterations: int = 50,
+    image_size: int = 3000,
+) -> None:
+    """Render the full network to a PNG using the scalable layout and rasterizer.
+
+    Args:
+        G (nx.DiGraph | CompactGraph): The network graph.
+        output_path (str): Path of the PNG file to write.
+        layout_cache_path (str, optional): Path of the layout cache to read and update.
+        layout_iterations (int): Force iterations per layout level.
+        image_size (int): Width and height of the rendered network in pixels.
+    """
+    try:
+        import matplotlib.pyplot as plt
+
+        node_ids, src, dst, weights, connection_types = graph_to_arrays(G)
+        positions = compute_layout(node_ids, src, dst, weights,
+                                   cache_path=layout_cache_path, iterations=layout_iterations)
+
+        # Color edges by connection type
+        edge_colors = np.array([CONNECTION_TYPE_COLORS.get(conn_type, DEFAULT_EDGE_COLOR)
+                                for conn_type in connection_types]).reshape(-1, 3)
+
+        # Size nodes by (log) degree
+        degrees = np.bincount(src, minlength=len(node_ids)) + np.bincount(dst, minlength=len(node_ids))
+        node_sizes = np.log1p(degrees) / max(np.log1p(degrees.max(initial=0)), 1.0)
+
+        image = rasterize_graph(positions, src, dst, edge_colors=edge_colors, node_sizes=node_sizes,
+                                width=image_size, height=image_size)
+
+        # Create figure sized so that one raster pixel maps to one output pixel
+        dpi = 300
+        plt.figure(figsize=(image_size / dpi, image_size / dpi + 0.6), dpi=dpi)
+        plt.imshow(image, interpolation='nearest')
+
+        # Add a title
+        plt.title(f'Telegram Channel Network ({G.number_of_nodes()} nodes, {G.number_of_edges()} edges)')
+
+        # Add a legend
+        legend_elements = [
+            plt.Line2D([0], [0], color=CONNECTION_TYPE_COLORS['forward'], lw=2, label='Forward'),
+            plt.Line2D([0], [0], color=CONNECTION_TYPE_COLORS['recommendation'], lw=2, label='Recommendation'),
+            plt.Line2D([0], [0], color=CONNECTION_TYPE_COLORS['outbound_link'], lw=2, label='Outbound Link'),
+            plt.Line2D([0], [0], color=CONNECTION_TYPE_COLORS['telegram_link'], lw=2, label='Telegram Link')
+        ]
+        plt.legend(handles=legend_elements)
+
+        # Remove axis
+        plt.axis('off')
+
+        # Save the figure
+        plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
+        plt.close()
+
+        logger.info("Generated network visualization at %s", output_path)
+
+    except Exception as e:
+        logger.error("Error generating network visualization: %s", e)
+
+
+def generate_html_viewer(
+    G: nx.DiGraph | CompactGraph,
+    output_path: str,
+    layout_cache_path: str | None = None,
+    layout_iterations: int = 50,
+    max_edges: int | None = 1_000_000,
+) -> None:
+    """Generate a self-contained interactive HTML/WebGL viewer of the network.
+
+    Nodes are colored by community (label propagation) or connection type and
+    sized by PageRank. The layout shares its cache with the PNG visualization.
+
+    Args:
+        G (nx.DiGraph | CompactGraph): The network graph.
+        output_path (str): Path of the HTML file to write.
+        layout_cache_path (str, optional): Path of the layout cache to read and update.
+        layout_iterations (int): Force iterations per layout level.
+        max_edges (int, optional): Maximum number of edges embedded in the page.
+    """
+    try:
+        node_ids, src, dst, weights, connection_types = graph_to_arrays(G)
+        positions = compute_layout(node_ids, src, dst, weights,
+                                   cache_path=layout_cache_path, iterations=layout_iterations)
+
+        centrality, _ = pagerank(src, dst, len(node_ids), weights)
+        communities = label_propagation(src, dst, len(node_ids), weights)
+        logger.info("Detected %d communities for the viewer", int(communities.max(initial=-1)) + 1)
+
+        if isinstance(G, CompactGraph):
+            labels = [G.node_label(i) for i in range(len(node_ids))]
+        else:
+            labels = []
+            for node_id in node_ids:
+                attr = G.nodes[node_id]
+                name = attr.get('name') or node_id
+                username = attr.get('username')
+                labels.append(f"{name} (@{username})" if username and username != 'Unknown' else name)
+
+        payload = build_viewer_payload(labels, positions, src, dst, connection_types,
+                                       communities, centrality, edge_weights=weights,
+                                       max_edges=max_edges)
+        write_html_viewer(output_path, payload)
+
+    except Exception as e:
+        logger.error("Error generating interactive viewer: %s", e)
+
+
+def run_analysis(args: argparse.Namespace) -> int:
+    """Run the analysis selected by the ``analyze`` command line options.
+
+    Args:
+        args (argparse.Namespace): Options of ``python -m telegram_snowball_sampling analyze``.
+
+    Returns:
+        int: Exit status, 0 on success.
+    """
+    if args.backbone_method not in BACKBONE_METHODS:
+        logger.error("Unknown backbone method %s (choose from %s)", args.backbone_method, ', '.join(BACKBONE_METHODS))
+        return 2
+    if args.incremental and args.store_path:
+        logger.error("--incremental reads a single edge list; select edge store runs with --runs instead")
+        return 1
+    try:
+        iterations = [int(iteration) for iteration in args.iterations.split(',')] if args.iterations else None
+    except ValueError:
+        logger.error("--iterations must be comma-separated iteration numbers, got %s", args.iterations)
+        return 2
+
+    edge_list_path = args.edge_list_path or compressed_path(
+        os.path.join(Config.EDGE_LIST_FOLDER, Config.EDGE_LIST_FILENAME), Config.OUTPUT_COMPRESSION)
+
+    # Create output directory if it doesn't exist
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # Output file paths
+    metrics_output_path = os.path.join(args.output_dir, 'network_metrics.xlsx')
+    gephi_output_path = os.path.join(args.output_dir, 'network.gexf')
+    viz_output_path = os.path.join(args.output_dir, 'network_visualization.png')
+    viewer_output_path = os.path.join(args.output_dir, 'network_viewer.html')
+    layout_cache_path = args.layout_cache_path or os.path.join(args.output_dir, 'layout_cache.npz')
+
+    if args.incremental:
+        # Metrics only: the full graph is never loaded
+        state_path = args.state_path or os.path.join(args.output_dir, 'analysis_state.npz')
+        metrics, state = run_incremental_analysis(edge_list_path, state_path)
+        if metrics['node_count'] == 0:
+            logger.error("No nodes found in the edge list. Please check the file path and format.")
+            return 1
+        log_network_summary(metrics, name_lookup=state.node_name)
+        export_metrics_to_csv(metrics, metrics_output_path)
+        logger.info("\nIncremental analysis complete!")
+        logger.info("Run without --incremental to regenerate the Gephi file and visualizations.")
+        return 0
+
+    # Load the edge list into a compact graph; NetworkX is only used where required
+    if args.store_path:
+        G = load_store_graph(
+            args.store_path,
+            runs=args.runs.split(',') if args.runs else None,
+            iterations=iterations,
+            since=args.since,
+            until=args.until,
+        )
+    else:
+        G = load_compact_graph(edge_list_path)
+
+    if G is None or G.number_of_nodes() == 0:
+        logger.error("No nodes found in the edge list. Please check the file path and format.")
+        return 1
+
+    # Reduce dense networks to their backbone
+    output_graph = G
+    if args.backbone_edges:
+        output_graph = extract_backbone_graph(G, args.backbone_edges, args.backbone_method)
+        if args.backbone_scope == 'all':
+            G = output_graph
+
+    # Calculate network metrics
+    metrics = calculate_network_metrics(G, networkx_max_edges=args.networkx_max_edges)
+
+    # Log network summary
+    log_network_summary(metrics, G)
+
+    # Export metrics to CSV
+    export_metrics_to_csv(metrics, metrics_output_path)
+
+    if args.metrics_only:
+        logger.info("\nAnalysis complete (metrics only)!")
+        return 0
+
+    # Generate Gephi file
+    generate_gephi_file(output_graph, gephi_output_path)
+
+    # Generate network visualization
+    generate_network_visualization(output_graph, viz_output_path,
+                                   layout_cache_path=layout_cache_path,
+                                   layout_iterations=args.layout_iterations,
+                                   image_size=args.image_size)
+
+    # Generate interactive HTML viewer
+    generate_html_viewer(output_graph, viewer_output_path,
+                         layout_cache_path=layout_cache_path,
+                         layout_iterations=args.layout_iterations,
+                         max_edges=args.viewer_max_edges)
+
+    logger.info("\nAnalysis complete!")
+    logger.info("All output files have been saved to the '%s' directory.", args.output_dir)
+    return 0
@@ -0,0 +1,404 @@
+"""Persistent network metrics that are updated incrementally across crawl runs.
+
+``main.py`` appends to the same edge list forever, so instead of re-reading the
+whole file for every analysis the state remembers the byte offset it has
+consumed and only parses rows appended since. Files rotated out of the edge
+list (``Edge_List.001.csv``, ...) are read first, each with its own offset. Degrees, weakly connected
+components (union-find), connection type counts and a PageRank vector that
+warm-starts the next computation are kept on disk between runs.
+
+Offsets count uncompressed bytes, so gzip and zstd compressed edge lists work
+too; their already consumed part is decompressed and skipped on each update.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+from typing import Any
+
+import numpy as np
+
+from .compression import compression_of, open_binary
+from .graph_algorithms import pagerank
+from .output import rotated_parts
+
+logger = logging.getLogger(__name__)
+
+_SIGNATURE_BYTES = 4096
+_KEY_SHIFT = np.int64(32)
+_KEY_MASK = np.int64((1 << 32) - 1)
+
+
+def _file_signature(path: str, length: int) -> str:
+    """Hash the first ``length`` (uncompressed) bytes of a file to detect rewrites."""
+    with open_binary(path) as file:
+        return hashlib.blake2b(_read(file, length), digest_size=16).hexdigest()
+
+
+def _read(file, size: int) -> bytes:
+    """Read up to ``size`` bytes; a compressed file still being written ends at its last flushed block."""
+    blocks = []
+    while size > 0:
+        try:
+            # read1 returns what was decompressed so far instead of losing it when the stream ends early
+            block = file.read1(size)
+        except EOFError:
+            break
+        if not block:
+            break
+        blocks.append(block)
+        size -= len(block)
+    return b''.join(blocks)
+
+
+def _skip(file, offset: int) -> None:
+    """Move to ``offset``; a zstd stream can only be read up to it."""
+    if file.seekable():
+        file.seek(offset)
+    else:
+        while offset > 0 and (block := _read(file, min(offset, 1024 * 1024))):
+            offset -= len(block)
+
+
+class AnalysisState:
+    """Network metrics for one edge list file, maintained incrementally.
+
+    Edges are stored once per (source, target) pair, as in the directed graph
+    built by ``network_analysis.load_edge_list``: repeated rows add to the weight
+    and the latest row decides the connection type.
+    """
+
+    VERSION = 2
+
+    def __init__(self, chunk_size: int = 64 * 1024 * 1024) -> None:
+        self.chunk_size = chunk_size
+        self._reset()
+
+    def _reset(self) -> None:
+        self.source_path: str | None = None
+        self.files: dict[str, dict[str, Any]] = {}  # Consumed offset and signature per file
+        self.rows_consumed = 0
+
+        self.node_ids: list[str] = []
+        self.node_names: list[str] = []
+        self.node_usernames: list[str] = []
+        self.node_index: dict[str, int] = {}
+
+        # Edges sorted by key = (source << 32) | target
+        self.edge_keys = np.zeros(0, dtype=np.int64)
+        self.edge_weights = np.zeros(0)
+        self.edge_types = np.zeros(0, dtype=np.int16)
+        self.type_names: list[str] = []
+
+        self.in_degree = np.zeros(0, dtype=np.int64)
+        self.out_degree = np.zeros(0, dtype=np.int64)
+        self.parent = np.zeros(0, dtype=np.int64)
+        self.pagerank = np.zeros(0)
+        self.pagerank_iterations = 0
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    @classmethod
+    def load(cls, path: str) -> 'AnalysisState':
+        """Load a saved state, or return an empty state if none can be read."""
+        state = cls()
+        if not os.path.exists(path):
+            return state
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('version') not in (1, cls.VERSION):
+                    logger.warning("Ignoring analysis state %s with unsupported version", path)
+                    return state
+                state.source_path = meta['source_path']
+                if meta['version'] == 1:
+                    # One offset for the edge list itself, written before rotation was followed
+                    state.files = {meta['source_path']: {'offset': meta['offset'], 'signature': meta['signature']}}
+                else:
+                    state.files = meta['files']
+                state.rows_consumed = meta['rows_consumed']
+                state.type_names = meta['type_names']
+                state.pagerank_iterations = meta['pagerank_iterations']
+                state.node_ids = data['node_ids'].tolist()
+                state.node_names = data['node_names'].tolist()
+                state.node_usernames = data['node_usernames'].tolist()
+                state.edge_keys = data['edge_keys']
+                state.edge_weights = data['edge_weights']
+                state.edge_types = data['edge_types']
+                state.in_degree = data['in_degree']
+                state.out_degree = data['out_degree']
+                state.parent = data['parent']
+                state.pagerank = data['pagerank']
+        except Exception as e:
+            logger.warning("Could not read analysis state %s, starting fresh: %s", path, e)
+            return cls()
+
+        state.node_index = {node_id: i for i, node_id in enumerate(state.node_ids)}
+        logger.info("Loaded analysis state: %d nodes, %d edges, %d files consumed",
+                    len(state.node_ids), len(state.edge_keys), len(state.files))
+        return state
+
+    def save(self, path: str) -> None:
+        """Write the state atomically to ``path`` (an ``.npz`` file)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        meta = {
+            'version': self.VERSION,
+            'source_path': self.source_path,
+            'files': self.files,
+            'rows_consumed': self.rows_consumed,
+            'type_names': self.type_names,
+            'pagerank_iterations': self.pagerank_iterations,
+        }
+        temp_path = path + '.tmp.npz'
+        np.savez_compressed(
+            temp_path,
+            meta=np.asarray(json.dumps(meta)),
+            node_ids=np.asarray(self.node_ids, dtype=str),
+            node_names=np.asarray(self.node_names, dtype=str),
+            node_usernames=np.asarray(self.node_usernames, dtype=str),
+            edge_keys=self.edge_keys,
+            edge_weights=self.edge_weights,
+            edge_types=self.edge_types,
+            in_degree=self.in_degree,
+            out_degree=self.out_degree,
+            parent=self.parent,
+            pagerank=self.pagerank,
+        )
+        os.replace(temp_path, path)
+        logger.info("Saved analysis state to %s", path)
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def update_from_edge_list(self, edge_list_path: str) -> int:
+        """Consume the rows appended to the edge list since the last update.
+
+        The files rotated out of the edge list are read before it, oldest
+        first. When the edge list was rotated since the last update, its
+        offset carries over to the rotated file. The state is rebuilt from
+        scratch if the edge list is a different one, or a consumed file was
+        removed, truncated or its consumed beginning changed (e.g. after
+        compaction). Files are read in chunks and a partially written last
+        line is left for the next update.
+
+        Args:
+            edge_list_path (str): Path to the edge list CSV file.
+
+        Returns:
+            int: Number of rows consumed.
+        """
+        path = os.path.abspath(edge_list_path)
+        parts = rotated_parts(path)
+        if self.source_path != path or not self._follow_rotation(path, parts):
+            if self.source_path is not None:
+                logger.info("Edge list changed since the last analysis, rebuilding state")
+            self._reset()
+            self.source_path = path
+
+        consumed = sum(self._consume(part) for part in parts)
+        self.rows_consumed += consumed
+        if consumed:
+            self._update_pagerank()
+
+        logger.info("Consumed %d new edge list rows from %d files", consumed, len(parts))
+        return consumed
+
+    def _follow_rotation(self, path: str, parts: list[str]) -> bool:
+        """Match the consumed files with ``parts``; False if the consumed rows are no longer all there."""
+        for part in parts:
+            if part != path and part not in self.files and path in self.files and self._unchanged(part, path):
+                # The edge list was rotated to this file since the last update
+                self.files[part] = self.files.pop(path)
+        return set(self.files) <= set(parts) and all(self._unchanged(part, part) for part in self.files)
+
+    def _unchanged(self, part: str, consumed: str) -> bool:
+        """Whether ``part`` begins with what was consumed from the file ``consumed``."""
+        entry = self.files[consumed]
+        # Only a plain file's size can be compared with the uncompressed offset
+        if compression_of(part) == 'none' and os.path.getsize(part) < entry['offset']:
+            return False
+        return _file_signature(part, min(entry['offset'], _SIGNATURE_BYTES)) == entry['signature']
+
+    def _consume(self, part: str) -> int:
+        """Consume the rows of one file past its offset."""
+        entry = self.files.setdefault(part, {'offset': 0, 'signature': ''})
+        consumed = 0
+        with open_binary(part) as file:
+            _skip(file, entry['offset'])
+            pending = b''
+            while True:
+                block = _read(file, self.chunk_size)
+                if not block:
+                    break
+                data = pending + block
+                end = data.rfind(b'\n') + 1
+                pending = data[end:]
+                if not end:
+                    continue
+                text = data[:end].decode('utf-8')
+                if entry['offset'] == 0:
+                    # Skip the header row
+                    text = text[text.find('\n') + 1:]
+                rows = [row for row in csv.reader(io.StringIO(text, newline='')) if len(row) >= 7]
+                entry['offset'] += end
+                if rows:
+                    self._apply_rows(rows)
+                    consumed += len(rows)
+
+        entry['signature'] = _file_signature(part, min(entry['offset'], _SIGNATURE_BYTES))
+        return consumed
+
+    def _node(self, node_id: str, name: str, username: str) -> int:
+        index = self.node_index.get(node_id)
+        if index is None:
+            index = len(self.node_ids)
+            self.node_index[node_id] = index
+            self.node_ids.append(node_id)
+            self.node_names.append(name)
+            self.node_usernames.append(username)
+        return index
+
+    def _type(self, connection_type: str) -> int:
+        if connection_type not in self.type_names:
+            self.type_names.append(connection_type)
+        return self.type_names.index(connection_type)
+
+    def _apply_rows(self, rows: list[list[str]]) -> None:
+        count = len(rows)
+        src = np.empty(count, dtype=np.int64)
+        dst = np.empty(count, dtype=np.int64)
+        types = np.empty(count, dtype=np.int16)
+        weights = np.empty(count)
+        type_codes: dict[str, int] = {}
+        for i, row in enumerate(rows):
+            src[i] = self._node(row[0], row[1], row[2])
+            dst[i] = self._node(row[3], row[4], row[5])
+            connection_type = row[6] or 'forward'
+            code = type_codes.get(connection_type)
+            if code is None:
+                code = type_codes[connection_type] = self._type(connection_type)
+            types[i] = code
+            try:
+                weights[i] = float(row[7]) if len(row) > 7 and row[7] else 1.0
+            except ValueError:
+                weights[i] = 1.0
+
+        n = len(self.node_ids)
+        grow = n - len(self.in_degree)
+        if grow > 0:
+            self.in_degree = np.concatenate([self.in_degree, np.zeros(grow, dtype=np.int64)])
+            self.out_degree = np.concatenate([self.out_degree, np.zeros(grow, dtype=np.int64)])
+            self.parent = np.concatenate([self.parent, np.arange(n - grow, n, dtype=np.int64)])
+
+        # Aggregate the batch: summed weight and the type of the last occurrence
+        keys = (src << _KEY_SHIFT) | dst
+        batch_keys, first_in_reversed, inverse = np.unique(keys[::-1], return_index=True,
+                                                           return_inverse=True)
+        batch_weights = np.bincount(inverse, weights=weights[::-1])
+        batch_types = types[::-1][first_in_reversed]
+
+        position = np.searchsorted(self.edge_keys, batch_keys)
+        exists = np.zeros(len(batch_keys), dtype=bool)
+        in_range = position < len(self.edge_keys)
+        exists[in_range] = self.edge_keys[position[in_range]] == batch_keys[in_range]
+
+        # Existing edges: add weight, latest type wins
+        hit = position[exists]
+        self.edge_weights[hit] += batch_weights[exists]
+        self.edge_types[hit] = batch_types[exists]
+
+        # New edges: degrees, union-find and sorted insertion
+        new_keys = batch_keys[~exists]
+        if len(new_keys):
+            new_src = new_keys >> _KEY_SHIFT
+            new_dst = new_keys & _KEY_MASK
+            self.out_degree += np.bincount(new_src, minlength=n)
+            self.in_degree += np.bincount(new_dst, minlength=n)
+            for u, v in zip(new_src.tolist(), new_dst.tolist()):
+                self._union(u, v)
+
+            insert_at = position[~exists]
+            self.edge_keys = np.insert(self.edge_keys, insert_at, new_keys)
+            self.edge_weights = np.insert(self.edge_weights, insert_at, batch_weights[~exists])
+            self.edge_types = np.insert(self.edge_types, insert_at, batch_types[~exists])
+
+    def _find(self, node: int) -> int:
+        parent = self.parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return int(root)
+
+    def _union(self, u: int, v: int) -> None:
+        root_u, root_v = self._find(u), self._find(v)
+        if root_u != root_v:
+            self.parent[max(root_u, root_v)] = min(root_u, root_v)
+
+    def _update_pagerank(self) -> None:
+        src = self.edge_keys >> _KEY_SHIFT
+        dst = self.edge_keys & _KEY_MASK
+        x0 = self.pagerank if len(self.pagerank) else None
+        self.pagerank, self.pagerank_iterations = pagerank(src, dst, len(self.node_ids),
+                                                           self.edge_weights, x0=x0)
+        logger.info("PageRank converged in %d iterations%s", self.pagerank_iterations,
+                    " (warm start)" if x0 is not None else "")
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    def node_name(self, node_id: str) -> str:
+        """Return the display name of a node, or 'Unknown'."""
+        index = self.node_index.get(node_id)
+        return self.node_names[index] if index is not None else 'Unknown'
+
+    def weak_component_count(self) -> int:
+        """Count weakly connected components from the union-find forest."""
+        if len(self.parent) == 0:
+            return 0
+        roots = self.parent.copy()
+        # Full path compression, vectorized
+        while True:
+            next_roots = roots[roots]
+            if np.array_equal(next_roots, roots):
+                break
+            roots = next_roots
+        self.parent = roots
+        return int(np.count_nonzero(roots == np.arange(len(roots))))
+
+    def metrics(self, top_n: int = 10) -> dict[str, Any]:
+        """Return metrics in the same structure as ``calculate_network_metrics``.
+
+        Strongly connected components and the average path length cannot be
+        maintained incrementally and are reported as ``None``.
+        """
+        n = len(self.node_ids)
+        m = len(self.edge_keys)
+
+        def top(values: np.ndarray) -> list[tuple[str, Any]]:
+            order = np.argsort(-values, kind='stable')[:top_n]
+            return [(self.node_ids[i], values[i].item()) for i in order]
+
+        type_counts = np.bincount(self.edge_types, minlength=len(self.type_names))
+        return {
+            'node_count': n,
+            'edge_count': m,
+            'density': m / (n * (n - 1)) if n > 1 else 0.0,
+            'weakly_connected_components': self.weak_component_count(),
+            'strongly_connected_components': None,
+            'top_receivers': top(self.in_degree),
+            'top_sources': top(self.out_degree),
+            'top_pagerank': top(self.pagerank),
+            'connection_types': {name: int(count) for name, count in zip(self.type_names, type_counts)
+                                 if count},
+            'average_path_length': None,
+        }
@@ -0,0 +1,292 @@
+"""Raw message archive: compressed, append-only segments with a per-channel index.
+
+The crawler only looks at ``message.forward`` and throws the rest away, so every
+new analysis needs a new crawl. ``MessageArchive`` keeps the minimal fields of
+each fetched message (channel ID, message ID, date, forward header, text,
+entities, grouped_id) so later passes can re-read a channel's history without
+touching Telegram.
+
+Layout of an archive directory::
+
+    segment_000001.bin   concatenated zlib blocks, one block per channel flush
+    segment_000002.bin   a new segment starts once the current one is full
+    index.jsonl          one line per block: channel, segment, offset, length, ...
+    channels.jsonl       metadata (title, username, type) of every channel seen
+    recommendations.jsonl  recommended channel IDs of each channel
+
+Each block holds the JSON lines of one channel's messages. Segments and the
+index are only ever appended to; a block is indexed after it has been written,
+so a crash leaves at most an unindexed tail that readers never see. The channel
+and recommendation files let ``replay.ReplayClient`` re-run a whole crawl offline.
+"""
+
+import datetime
+import json
+import logging
+import os
+import zlib
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = 'index.jsonl'
+CHANNELS_FILENAME = 'channels.jsonl'
+RECOMMENDATIONS_FILENAME = 'recommendations.jsonl'
+
+
+def _date(value: Any) -> str | None:
+    return value.isoformat() if isinstance(value, datetime.datetime) else None
+
+
+def _peer_id(peer: Any) -> int | None:
+    for attribute in ('channel_id', 'chat_id', 'user_id'):
+        value = getattr(peer, attribute, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def message_record(channel_id: int, message: Any) -> dict[str, Any]:
+    """Extract the archived fields of a Telethon message."""
+    record: dict[str, Any] = {
+        'channel_id': channel_id,
+        'id': message.id,
+        'date': _date(getattr(message, 'date', None)),
+        'text': getattr(message, 'message', None) or '',
+        'grouped_id': getattr(message, 'grouped_id', None),
+        'entities': [],
+        'forward': None,
+    }
+
+    for entity in getattr(message, 'entities', None) or []:
+        item = {'type': type(entity).__name__, 'offset': entity.offset, 'length': entity.length}
+        if getattr(entity, 'url', None):
+            item['url'] = entity.url
+        record['entities'].append(item)
+
+    header = getattr(message, 'fwd_from', None)
+    if header is not None:
+        forward: dict[str, Any] = {
+            'from_id': _peer_id(getattr(header, 'from_id', None)),
+            'from_name': getattr(header, 'from_name', None),
+            'date': _date(getattr(header, 'date', None)),
+            'channel_post': getattr(header, 'channel_post', None),
+            'chat': None,
+        }
+        chat = getattr(getattr(message, 'forward', None), 'chat', None)
+        if chat is not None:
+            forward['chat'] = {
+                'id': chat.id,
+                'title': getattr(chat, 'title', None),
+                'username': getattr(chat, 'username', None),
+                'broadcast': bool(getattr(chat, 'broadcast', False)),
+            }
+        record['forward'] = forward
+    return record
+
+
+class MessageArchive:
+    """Append-only archive of messages, readable per channel.
+
+    Args:
+        directory (str): Archive directory; created if missing.
+        segment_size (int): Bytes after which a new segment file is started.
+        block_messages (int): Buffered messages per channel before a block is written.
+        level (int): zlib compression level.
+    """
+
+    def __init__(self, directory: str, segment_size: int = 64 * 1024 * 1024, block_messages: int = 1000,
+                 level: int = 6) -> None:
+        self.directory = directory
+        self.segment_size = segment_size
+        self.block_messages = max(1, block_messages)
+        self.level = level
+        os.makedirs(directory, exist_ok=True)
+
+        self._index: dict[int, list[dict[str, Any]]] = {}
+        self._channels: dict[int, dict[str, Any]] = {}
+        self._usernames: dict[str, int] = {}
+        self._recommendations: dict[int, list[int]] = {}
+        self._buffers: dict[int, list[dict[str, Any]]] = {}
+        self._segment_number = 0
+        self._segment = None
+        self._index_file = None
+        self.written_messages = 0
+        self.written_bytes = 0
+
+        self._load_index()
+
+    # Writing
+    def add(self, channel_id: int, message: Any) -> None:
+        """Buffer a message (a Telethon message or an archived record) of ``channel_id``."""
+        record = message if isinstance(message, dict) else message_record(channel_id, message)
+        buffer = self._buffers.setdefault(channel_id, [])
+        buffer.append(record)
+        if len(buffer) >= self.block_messages:
+            self.flush_channel(channel_id)
+
+    def flush_channel(self, channel_id: int) -> None:
+        """Write the buffered messages of a channel as one compressed block."""
+        records = self._buffers.pop(channel_id, None)
+        if not records:
+            return
+
+        payload = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records).encode('utf-8')
+        block = zlib.compress(payload, self.level)
+        segment = self._current_segment(len(block))
+        offset = segment.tell()
+        segment.write(block)
+        segment.flush()
+
+        entry = {
+            'channel': channel_id,
+            'segment': os.path.basename(segment.name),
+            'offset': offset,
+            'length': len(block),
+            'count': len(records),
+            'first_id': records[0]['id'],
+            'last_id': records[-1]['id'],
+        }
+        if self._index_file is None:
+            self._index_file = open(os.path.join(self.directory, INDEX_FILENAME), 'a', encoding='utf-8')
+        self._index_file.write(json.dumps(entry) + '\n')
+        self._index_file.flush()
+        self._index.setdefault(channel_id, []).append(entry)
+
+        self.written_messages += len(records)
+        self.written_bytes += len(block)
+
+    def add_channel(self, entity: Any) -> None:
+        """Record the metadata of a channel entity (written only when new or changed)."""
+        channel_id = getattr(entity, 'id', None)
+        if not isinstance(channel_id, int) or getattr(entity, 'min', False):
+            return
+        meta = {
+            'id': channel_id,
+            'title': getattr(entity, 'title', None),
+            'username': getattr(entity, 'username', None),
+            'broadcast': bool(getattr(entity, 'broadcast', False)),
+            'megagroup': bool(getattr(entity, 'megagroup', False)),
+        }
+        if self._channels.get(channel_id) == meta:
+            return
+        self._append(CHANNELS_FILENAME, meta)
+        self._set_channel(meta)
+
+    def add_recommendations(self, channel_id: int, chats: list[Any]) -> None:
+        """Record the channels recommended for ``channel_id`` (and their metadata)."""
+        for chat in chats:
+            self.add_channel(chat)
+        recommended = [chat.id for chat in chats if isinstance(getattr(chat, 'id', None), int)]
+        self._append(RECOMMENDATIONS_FILENAME, {'channel': channel_id, 'recommendations': recommended})
+        self._recommendations[channel_id] = recommended
+
+    def flush(self) -> None:
+        """Write the buffered messages of every channel."""
+        for channel_id in list(self._buffers):
+            self.flush_channel(channel_id)
+
+    def close(self) -> None:
+        """Flush all buffers and close the open files."""
+        self.flush()
+        for file in (self._segment, self._index_file):
+            if file is not None:
+                file.close()
+        self._segment = self._index_file = None
+
+    def __enter__(self) -> 'MessageArchive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # Reading
+    def channels(self) -> list[int]:
+        """IDs of every archived channel."""
+        return list(self._index)
+
+    def __contains__(self, channel_id: object) -> bool:
+        return channel_id in self._index
+
+    def channel(self, reference: int | str) -> dict[str, Any] | None:
+        """Return the archived metadata of a channel by ID or username."""
+        if isinstance(reference, str):
+            reference = self._usernames.get(reference.lstrip('@').lower(), reference)
+        return self._channels.get(reference)
+
+    def recommendations(self, channel_id: int) -> list[int] | None:
+        """Return the archived recommendations of a channel, or None if never fetched."""
+        return self._recommendations.get(channel_id)
+
+    def message_count(self, channel_id: int) -> int:
+        """Number of archived records of a channel, duplicates from repeated crawls included."""
+        return sum(entry['count'] for entry in self._index.get(channel_id, []))
+
+    def iter_channel(self, channel_id: int) -> Iterator[dict[str, Any]]:
+        """Yield the archived messages of a channel, newest first, each message once.
+
+        Buffered messages are flushed first so they are included.
+        """
+        self.flush_channel(channel_id)
+        records: dict[int, dict[str, Any]] = {}
+        for entry in self._index.get(channel_id, []):
+            for record in self._read_block(entry):
+                records[record['id']] = record
+        for message_id in sorted(records, reverse=True):
+            yield records[message_id]
+
+    def _read_block(self, entry: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        with open(os.path.join(self.directory, entry['segment']), 'rb') as file:
+            file.seek(entry['offset'])
+            payload = zlib.decompress(file.read(entry['length']))
+        for line in payload.decode('utf-8').splitlines():
+            yield json.loads(line)
+
+    # Internals
+    def _append(self, filename: str, record: dict[str, Any]) -> None:
+        with open(os.path.join(self.directory, filename), 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def _set_channel(self, meta: dict[str, Any]) -> None:
+        self._channels[meta['id']] = meta
+        if meta.get('username'):
+            self._usernames[meta['username'].lower()] = meta['id']
+
+    def _read_lines(self, filename: str) -> Iterator[dict[str, Any]]:
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line after a crash
+                    continue
+
+    def _load_index(self) -> None:
+        for meta in self._read_lines(CHANNELS_FILENAME):
+            self._set_channel(meta)
+        for record in self._read_lines(RECOMMENDATIONS_FILENAME):
+            self._recommendations[record['channel']] = record['recommendations']
+        for entry in self._read_lines(INDEX_FILENAME):
+            self._index.setdefault(entry['channel'], []).append(entry)
+        segments = [name for name in os.listdir(self.directory) if name.startswith('segment_')]
+        self._segment_number = max((int(name[8:14]) for name in segments), default=0)
+        if self._index:
+            logger.info("Opened message archive %s with %d channels", self.directory, len(self._index))
+
+    def _current_segment(self, incoming: int):
+        if self._segment is not None and self._segment.tell() + incoming > self.segment_size:
+            self._segment.close()
+            self._segment = None
+        if self._segment is None:
+            if self._segment_number == 0 or self._segment_full(incoming):
+                self._segment_number += 1
+            path = os.path.join(self.directory, f"segment_{self._segment_number:06d}.bin")
+            self._segment = open(path, 'ab')
+        return self._segment
+
+    def _segment_full(self, incoming: int) -> bool:
+        path = os.path.join(self.directory, f"segment_{self._segment_number:06d}.bin")
+        return os.path.exists(path) and os.path.getsize(path) + incoming > self.segment_size
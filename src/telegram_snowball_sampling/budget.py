@@ -0,0 +1,207 @@
+"""Crawl budgets: limits on API calls, messages, channels, time and FloodWait.
+
+``CrawlBudget`` keeps the counters and decides when the crawl must stop.
+``BudgetedClient`` wraps a ``TelegramClient`` so every request is charged
+against the budget without touching the crawling code: ``get_entity`` and raw
+requests count as one call, ``iter_messages`` as one call per page of 100
+messages plus one message per message yielded. Once a budget is spent the
+wrapper raises ``BudgetExhausted`` instead of contacting Telegram.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Any, AsyncIterator
+
+from telethon.errors import FloodWaitError
+
+logger = logging.getLogger(__name__)
+
+# Telethon fetches message history in pages of this size
+MESSAGES_PER_REQUEST = 100
+
+
+class BudgetExhausted(Exception):
+    """Raised when a request would exceed the crawl budget."""
+
+
+class CrawlBudget:
+    """Limits for a crawl; ``None`` means unlimited.
+
+    Args:
+        max_api_calls (int, optional): Total Telegram requests.
+        max_messages (int, optional): Total messages read.
+        max_channels_per_iteration (int, optional): Channels scanned per iteration;
+            the rest stay queued for the next one.
+        deadline_seconds (float, optional): Wall-clock time from the start of the crawl.
+        max_flood_wait_seconds (float, optional): Total time spent sleeping on FloodWait errors.
+    """
+
+    def __init__(
+        self,
+        max_api_calls: int | None = None,
+        max_messages: int | None = None,
+        max_channels_per_iteration: int | None = None,
+        deadline_seconds: float | None = None,
+        max_flood_wait_seconds: float | None = None,
+    ) -> None:
+        self.max_api_calls = max_api_calls
+        self.max_messages = max_messages
+        self.max_channels_per_iteration = max_channels_per_iteration
+        self.deadline_seconds = deadline_seconds
+        self.max_flood_wait_seconds = max_flood_wait_seconds
+
+        self.start_time = time.monotonic()
+        self.api_calls = 0
+        self.messages = 0
+        self.flood_wait_seconds = 0.0
+        self.reason: str | None = None
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'CrawlBudget':
+        """Create a budget from the ``BUDGET_*`` settings of ``Config``."""
+        return cls(
+            max_api_calls=config.BUDGET_MAX_API_CALLS,
+            max_messages=config.BUDGET_MAX_MESSAGES,
+            max_channels_per_iteration=config.BUDGET_MAX_CHANNELS_PER_ITERATION,
+            deadline_seconds=config.BUDGET_DEADLINE_MINUTES * 60 if config.BUDGET_DEADLINE_MINUTES else None,
+            max_flood_wait_seconds=config.BUDGET_MAX_FLOOD_WAIT_SECONDS,
+        )
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether any budget is spent. The first exhausted budget is kept in ``reason``."""
+        if self.reason is None:
+            if self.max_api_calls is not None and self.api_calls >= self.max_api_calls:
+                self.reason = f"API call budget of {self.max_api_calls} reached"
+            elif self.max_messages is not None and self.messages >= self.max_messages:
+                self.reason = f"message budget of {self.max_messages} reached"
+            elif self.deadline_seconds is not None and self.elapsed >= self.deadline_seconds:
+                self.reason = f"deadline of {self.deadline_seconds:.0f} seconds reached"
+        return self.reason is not None
+
+    def check(self) -> None:
+        """Raise ``BudgetExhausted`` if any budget is spent."""
+        if self.exhausted:
+            raise BudgetExhausted(self.reason)
+
+    def iteration_full(self, channels_scanned: int) -> bool:
+        """Whether the per-iteration channel budget is used up."""
+        return self.max_channels_per_iteration is not None and channels_scanned >= self.max_channels_per_iteration
+
+    def charge_api_call(self) -> None:
+        self.check()
+        self.api_calls += 1
+
+    def charge_message(self) -> None:
+        self.messages += 1
+
+    def allow_flood_wait(self, seconds: float) -> bool:
+        """Charge a FloodWait sleep; return False (and exhaust the budget) if it does not fit."""
+        remaining_time = None if self.deadline_seconds is None else self.deadline_seconds - self.elapsed
+        if self.max_flood_wait_seconds is not None and self.flood_wait_seconds + seconds > self.max_flood_wait_seconds:
+            self.reason = f"FloodWait budget of {self.max_flood_wait_seconds:.0f} seconds reached"
+            return False
+        if remaining_time is not None and seconds > remaining_time:
+            self.reason = f"FloodWait of {seconds} seconds would pass the deadline"
+            return False
+        self.flood_wait_seconds += seconds
+        return True
+
+    def summary(self) -> dict[str, Any]:
+        """Return the counters and the reason the crawl stopped, if any."""
+        return {
+            'api_calls': self.api_calls,
+            'messages': self.messages,
+            'flood_wait_seconds': self.flood_wait_seconds,
+            'elapsed_seconds': self.elapsed,
+            'stopped_by': self.reason,
+        }
+
+
+class BudgetedClient:
+    """Proxy around a ``TelegramClient`` that charges requests to a ``CrawlBudget``.
+
+    When a FloodWait budget is set, Telethon's automatic sleeping is disabled
+    while requests of this wrapper are in flight so every wait is seen, charged
+    and slept here; the client's own threshold is restored in between.
+    """
+
+    def __init__(self, client: Any, budget: CrawlBudget) -> None:
+        self._client = client
+        self.budget = budget
+        self._charge_flood_waits = (budget.max_flood_wait_seconds is not None
+                                    and hasattr(client, 'flood_sleep_threshold'))
+        self._flood_sleep_threshold = None
+        self._in_flight = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    @contextlib.contextmanager
+    def _charged_flood_waits(self):
+        """Turn off Telethon's FloodWait sleeping until the last overlapping request ends."""
+        if not self._charge_flood_waits:
+            yield
+            return
+        if not self._in_flight:
+            self._flood_sleep_threshold = self._client.flood_sleep_threshold
+            self._client.flood_sleep_threshold = 0
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            if not self._in_flight:
+                self._client.flood_sleep_threshold = self._flood_sleep_threshold
+
+    async def _request(self, function, *args, **kwargs) -> Any:
+        while True:
+            self.budget.charge_api_call()
+            try:
+                with self._charged_flood_waits():
+                    return await function(*args, **kwargs)
+            except FloodWaitError as e:
+                if not self.budget.allow_flood_wait(e.seconds):
+                    raise BudgetExhausted(self.budget.reason) from e
+                logger.warning("Flood wait of %d seconds (%.0f seconds used so far)",
+                               e.seconds, self.budget.flood_wait_seconds)
+                await asyncio.sleep(e.seconds)
+
+    async def __call__(self, request: Any, *args, **kwargs) -> Any:
+        return await self._request(self._client, request, *args, **kwargs)
+
+    async def get_entity(self, entity: Any, *args, **kwargs) -> Any:
+        return await self._request(self._client.get_entity, entity, *args, **kwargs)
+
+    async def iter_messages(self, entity: Any, *args, **kwargs) -> AsyncIterator[Any]:
+        limit = kwargs.get('limit')
+        count = 0
+        while True:
+            self.budget.charge_api_call()
+            try:
+                with self._charged_flood_waits():
+                    async for message in self._client.iter_messages(entity, *args, **kwargs):
+                        # A channel cut short must not pass for a complete scan
+                        if self.budget.exhausted:
+                            raise BudgetExhausted(self.budget.reason)
+                        if count and count % MESSAGES_PER_REQUEST == 0:
+                            self.budget.charge_api_call()
+                        count += 1
+                        self.budget.charge_message()
+                        kwargs['offset_id'] = message.id
+                        yield message
+                return
+            except FloodWaitError as e:
+                if not self.budget.allow_flood_wait(e.seconds):
+                    raise BudgetExhausted(self.budget.reason) from e
+                logger.warning("Flood wait of %d seconds while reading messages", e.seconds)
+                await asyncio.sleep(e.seconds)
+                # Resume after the last message received
+                if limit is not None:
+                    kwargs['limit'] = limit - count
@@ -0,0 +1,292 @@
+"""Command line entry point: ``python -m telegram_snowball_sampling <command>``.
+
+Commands:
+
+    crawl    Snowball-sample channels from seed channels, without prompts
+    merge    Merge the results files into the deduplicated master list
+    analyze  Network metrics, Gephi file and visualizations of the edge list or edge store
+    compact  Compact an edge list file or the partitions of the edge store
+
+Only ``argparse`` is loaded to parse the command line. Each command imports
+what it needs when it runs, so ``merge`` never loads Telethon and ``--help``
+loads neither Telethon, NetworkX, pandas nor matplotlib. Options left unset
+fall back to the configuration (environment variables and ``.env``), which is
+likewise read on first use.
+"""
+
+import argparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _add_crawl_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('channels', nargs='+',
+                        help='Seed channels (usernames, links or IDs; comma-separated lists are accepted)')
+    parser.add_argument('--iterations', type=int, default=None,
+                        help='Number of iterations (default: DEFAULT_ITERATIONS)')
+    parser.add_argument('--min-mentions', type=int, default=None,
+                        help='Minimum number of mentions to include a channel (default: DEFAULT_MIN_MENTIONS)')
+    parser.add_argument('--sweep', default=None,
+                        help='Further comma-separated minimum mention counts derived from the same crawl '
+                             '(default: SWEEP_THRESHOLDS)')
+    parser.add_argument('--max-posts', type=int, default=None,
+                        help='Maximum number of posts to check per channel (default: DEFAULT_MAX_POSTS)')
+    parser.add_argument('--recommendations', action=argparse.BooleanOptionalAction, default=None,
+                        help='Include channel recommendations (default: DEFAULT_INCLUDE_RECOMMENDATIONS)')
+    parser.add_argument('--recommendations-depth', type=int, default=None,
+                        help='Maximum depth for channel recommendations (default: DEFAULT_RECOMMENDATIONS_DEPTH)')
+    parser.add_argument('--urls', action=argparse.BooleanOptionalAction, default=None,
+                        help='Extract URLs from messages (default: DEFAULT_INCLUDE_URLS)')
+    parser.add_argument('--start-date', default=None,
+                        help='Read messages from this date, YYYY-MM-DD or a number of days back '
+                             '(default: DEFAULT_START_DATE)')
+    parser.add_argument('--end-date', default=None,
+                        help='Read messages up to this date, YYYY-MM-DD (default: DEFAULT_END_DATE)')
+    parser.add_argument('--deadline', type=float, default=None,
+                        help='Maximum runtime in minutes (default: BUDGET_DEADLINE_MINUTES)')
+    parser.add_argument('--merge', action=argparse.BooleanOptionalAction, default=True,
+                        help='Merge the results into the master list afterwards (default: yes)')
+    parser.add_argument('--analyze', action='store_true',
+                        help='Run the network analysis with its default options afterwards')
+
+
+def _add_merge_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--results-folder', default=None, help='Folder of the results files (default: RESULTS_FOLDER)')
+    parser.add_argument('--merged-folder', default=None, help='Folder of the master list (default: MERGED_FOLDER)')
+    parser.add_argument('--merged-filename', default=None, help='Name of the master list (default: MERGED_FILENAME)')
+
+
+def _add_analyze_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--edge-list', '-e', dest='edge_list_path', default=None,
+                        help='Path to the edge list CSV file (default: EDGE_LIST_FOLDER/EDGE_LIST_FILENAME; '
+                             '.gz and .zst files are decompressed on the fly)')
+    parser.add_argument('--store', dest='store_path', default=None,
+                        help='Read the edge store in this folder (EDGE_STORE_FOLDER) instead of the edge list')
+    parser.add_argument('--runs', default=None,
+                        help='Comma-separated edge store run IDs to analyse (default: all)')
+    parser.add_argument('--iterations', default=None,
+                        help='Comma-separated iterations to analyse, for runs partitioned per iteration')
+    parser.add_argument('--since', default=None, help='Only edge store runs started on or after this date')
+    parser.add_argument('--until', default=None, help='Only edge store runs started before this date')
+    parser.add_argument('--output-dir', '-o', dest='output_dir',
+                        default='network_analysis',
+                        help='Directory to save output files')
+    parser.add_argument('--metrics-only', action='store_true',
+                        help='Only compute and export the metrics; skip the Gephi file and visualizations')
+    parser.add_argument('--layout-cache', dest='layout_cache_path', default=None,
+                        help='Path of the layout cache (default: <output-dir>/layout_cache.npz)')
+    parser.add_argument('--layout-iterations', type=int, default=50,
+                        help='Force-directed iterations per layout level')
+    parser.add_argument('--image-size', type=int, default=3000,
+                        help='Width and height of the network visualization in pixels')
+    parser.add_argument('--viewer-max-edges', type=int, default=1_000_000,
+                        help='Maximum number of edges embedded in the interactive HTML viewer')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only read edges appended since the last run and update the saved metrics')
+    parser.add_argument('--state', dest='state_path', default=None,
+                        help='Path of the incremental analysis state (default: <output-dir>/analysis_state.npz)')
+    parser.add_argument('--backbone-edges', type=int, default=None,
+                        help='Reduce the network to a backbone with at most this many edges')
+    parser.add_argument('--backbone-method', default='disparity',
+                        help='Backbone extraction method: disparity, kcore or topk')
+    parser.add_argument('--backbone-scope', choices=('outputs', 'all'), default='outputs',
+                        help="Use the backbone for the visual and Gephi outputs only, or for the metrics as well")
+    parser.add_argument('--networkx-max-edges', type=int, default=2_000_000,
+                        help='Largest graph converted to NetworkX for strong components and path length')
+
+
+def _add_compact_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--input', '-i', dest='input_path', default=None,
+                        help='Edge list file to compact (.gz and .zst are decompressed on the fly)')
+    parser.add_argument('--output', '-o', dest='output_path', default=None,
+                        help='Compacted edge list (default: <input>.compact.csv); a .gz or .zst name compresses it')
+    parser.add_argument('--max-edges', type=int, default=None,
+                        help='Most distinct edges held in memory before spilling to temporary buckets')
+    parser.add_argument('--buckets', type=int, default=None, help='Hash partitions used when spilling')
+    parser.add_argument('--temp-dir', default=None, help='Folder for the spill buckets (default: system temp)')
+    parser.add_argument('--store', default=None, help='Edge store folder (default: EDGE_STORE_FOLDER)')
+    parser.add_argument('--runs', default=None, help='Comma-separated run IDs to compact (default: all finished)')
+    parser.add_argument('--every', type=float, default=None,
+                        help='Keep running and compact every this many minutes')
+    parser.add_argument('--list', action='store_true', help='List the runs and partitions and exit')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the parser of all commands; no command module is imported."""
+    parser = argparse.ArgumentParser(
+        prog='python -m telegram_snowball_sampling',
+        description='Snowball sampling of Telegram channel networks',
+    )
+    commands = parser.add_subparsers(dest='command', metavar='command', required=True)
+
+    crawl = commands.add_parser(
+        'crawl', help='Snowball-sample channels from seed channels',
+        description='Crawl from the seed channels without prompts. The Telegram credentials are read from '
+                    'TELEGRAM_API_ID and TELEGRAM_API_HASH; the first login of a session still asks for the '
+                    'phone number and code.')
+    _add_crawl_arguments(crawl)
+    crawl.set_defaults(handler=_crawl)
+
+    merge = commands.add_parser('merge', help='Merge the results files into the deduplicated master list')
+    _add_merge_arguments(merge)
+    merge.set_defaults(handler=_merge)
+
+    analyze = commands.add_parser('analyze', help='Analyse the edge list or edge store',
+                                  description='Network Analysis for Telegram Snowball Sampling Data')
+    _add_analyze_arguments(analyze)
+    analyze.set_defaults(handler=_analyze)
+
+    compact = commands.add_parser('compact', help='Compact an edge list file or the edge store',
+                                  description='Compact an edge list file or the partitions of the edge store')
+    _add_compact_arguments(compact)
+    compact.set_defaults(handler=_compact, parser=compact)
+
+    return parser
+
+
+def _crawl(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from .config import Config
+    from .crawler import run_crawl
+    from .date_window import DateWindow
+    from .merge_csv_data import merge_csv_files
+    from .sweep import parse_thresholds
+    from .utils import attempt_connection_to_telegram
+
+    Config.reload_env()
+    if not Config.validate():
+        logger.error("Set TELEGRAM_API_ID and TELEGRAM_API_HASH in the environment or .env "
+                     "(or run main.py once to be prompted for them)")
+        return 1
+
+    initial_channels = [channel.strip() for value in args.channels for channel in value.split(',') if channel.strip()]
+    if not initial_channels:
+        logger.error("No valid channels provided. Exiting.")
+        return 2
+    try:
+        sweep_thresholds = parse_thresholds(Config.SWEEP_THRESHOLDS if args.sweep is None else args.sweep)
+        date_window = DateWindow.parse(Config.DEFAULT_START_DATE if args.start_date is None else args.start_date,
+                                       Config.DEFAULT_END_DATE if args.end_date is None else args.end_date)
+    except ValueError as e:
+        logger.error("Invalid crawl parameters: %s", e)
+        return 2
+
+    def option(value, default):
+        return default if value is None else value
+
+    async def crawl():
+        client = await attempt_connection_to_telegram()
+        return await run_crawl(
+            client,
+            initial_channels,
+            option(args.iterations, Config.DEFAULT_ITERATIONS),
+            option(args.min_mentions, Config.DEFAULT_MIN_MENTIONS),
+            sweep_thresholds=sweep_thresholds,
+            max_posts=option(args.max_posts, Config.DEFAULT_MAX_POSTS),
+            include_recommendations=option(args.recommendations, Config.DEFAULT_INCLUDE_RECOMMENDATIONS),
+            recommendations_depth=option(args.recommendations_depth, Config.DEFAULT_RECOMMENDATIONS_DEPTH),
+            include_urls=option(args.urls, Config.DEFAULT_INCLUDE_URLS),
+            date_window=date_window,
+            deadline_minutes=args.deadline,
+        )
+
+    if asyncio.run(crawl()) is None:
+        return 1
+
+    if args.merge:
+        logger.info('Collating output files to master list in /merged folder...')
+        merge_csv_files(Config.RESULTS_FOLDER, Config.MERGED_FOLDER, Config.MERGED_FILENAME)
+    if args.analyze:
+        return main(['analyze', *(['--store', Config.EDGE_STORE_FOLDER] if Config.EDGE_STORE_FOLDER else [])])
+    return 0
+
+
+def _merge(args: argparse.Namespace) -> int:
+    from .config import Config
+    from .merge_csv_data import merge_csv_files
+
+    merge_csv_files(
+        args.results_folder or Config.RESULTS_FOLDER,
+        args.merged_folder or Config.MERGED_FOLDER,
+        args.merged_filename or Config.MERGED_FILENAME,
+    )
+    return 0
+
+
+def _analyze(args: argparse.Namespace) -> int:
+    from .analysis import run_analysis
+
+    return run_analysis(args)
+
+
+def _print_store(store) -> None:
+    """Print the runs and partitions of an edge store."""
+    manifest = store.read_manifest()
+    for run_id, run in manifest['runs'].items():
+        print(f"{run_id}  {run['status']:<11} started {run['started']}  {run['rows']} rows  {run['params']}")
+    for partition in manifest['partitions']:
+        iteration = f" iteration {partition.iteration}" if partition.iteration is not None else ''
+        print(f"  {partition.kind:<7} {partition.path}  {partition.rows} rows{iteration}")
+    print(store.summary())
+
+
+def _compact(args: argparse.Namespace) -> int:
+    import time
+
+    from .compaction import DEFAULT_BUCKETS, DEFAULT_MAX_EDGES, compact_edge_list, compacted_path
+    from .config import Config
+    from .edge_store import EdgeStore
+
+    if args.input_path:
+        output_path = args.output_path or compacted_path(args.input_path)
+        try:
+            stats = compact_edge_list(args.input_path, output_path, args.max_edges or DEFAULT_MAX_EDGES,
+                                      args.buckets or DEFAULT_BUCKETS, args.temp_dir)
+        except (OSError, ValueError, ImportError) as e:
+            logger.error("Error compacting %s: %s", args.input_path, e)
+            return 1
+        print(f"{stats.rows_in:,} rows -> {stats.rows_out:,} rows ({stats.ratio:.1f}:1), "
+              f"{stats.bytes_in / 1e6:.1f} MB -> {stats.bytes_out / 1e6:.1f} MB "
+              f"({stats.bytes_in / max(stats.bytes_out, 1):.1f}:1) in {stats.seconds:.1f}s, "
+              f"{stats.rows_per_second:,.0f} rows/s, {stats.spills} spills -> {output_path}")
+        return 0
+
+    store_path = args.store or Config.EDGE_STORE_FOLDER
+    if not store_path:
+        args.parser.error("give --input or --store (or set EDGE_STORE_FOLDER)")
+
+    store = EdgeStore(store_path)
+    if args.list:
+        _print_store(store)
+        return 0
+
+    runs = args.runs.split(',') if args.runs else None
+    while True:
+        try:
+            segments = store.compact(runs)
+            logger.info("Wrote %d segments; store: %s", len(segments), store.summary())
+        except (OSError, ValueError) as e:
+            logger.error("Error compacting %s: %s", store_path, e)
+        if args.every is None:
+            return 0
+        time.sleep(args.every * 60)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run a command.
+
+    Args:
+        argv (list[str], optional): Command line arguments (default: ``sys.argv[1:]``).
+
+    Returns:
+        int: Exit status.
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        logger.warning("Interrupted by user")
+        return 130
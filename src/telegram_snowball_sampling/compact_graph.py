@@ -0,0 +1,348 @@
+"""Compact, integer-indexed graph representation for very large crawls.
+
+NetworkX stores a dict per node, a dict per edge and nested adjacency dicts,
+which costs well over a kilobyte per edge. ``CompactGraph`` instead interns
+node IDs to integers once and keeps the graph in flat arrays:
+
+* an interned node table (string -> int) backed by a single UTF-8 buffer,
+  looked up through a sorted index array once the graph is built;
+* CSR adjacency (``indptr``/``indices``) with parallel weight and connection
+  type arrays;
+* node attributes (name, username) as columnar string arrays.
+
+Parallel edges are merged on construction: weights are summed and the latest
+connection type wins, matching ``network_analysis.load_edge_list``. Use
+:meth:`CompactGraph.to_networkx` for algorithms that need NetworkX.
+"""
+
+import bisect
+import csv
+import logging
+import sys
+from array import array
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from .compression import open_text
+
+logger = logging.getLogger(__name__)
+
+EDGE_LIST_COLUMNS = [
+    'From_Channel_ID', 'From_Channel_Name', 'From_Channel_Username',
+    'To_Channel_ID', 'To_Channel_Name', 'To_Channel_Username',
+    'ConnectionType', 'Weight',
+]
+
+
+def _read_edge_list(path: str) -> Iterator[list[str]]:
+    """Yield the rows of an edge list CSV file after its header."""
+    with open_text(path, 'r') as file:
+        reader = csv.reader(file)
+        header = next(reader, None) or []
+        if header[:len(EDGE_LIST_COLUMNS)] != EDGE_LIST_COLUMNS:
+            logger.warning("Edge list file %s is missing expected columns", path)
+        yield from reader
+
+
+class StringColumn:
+    """Append-only column of strings stored in one UTF-8 buffer with offsets."""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._offsets = array('q', [0])
+
+    def append(self, value: str) -> int:
+        """Append a string and return its position."""
+        self._buffer += value.encode('utf-8')
+        self._offsets.append(len(self._buffer))
+        return len(self._offsets) - 2
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._buffer[self._offsets[index]:self._offsets[index + 1]].decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the column's buffers."""
+        return len(self._buffer) + self._offsets.itemsize * len(self._offsets)
+
+
+class StringTable(StringColumn):
+    """Interned string -> int table.
+
+    While strings are added, a dict maps them to their IDs. :meth:`freeze`
+    replaces it by an array of the IDs in string order, searched by bisection
+    over the buffer, so a built table keeps no Python string per entry.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._index: dict[str, int] | None = {}
+        self._sorted: np.ndarray | None = None
+
+    def intern(self, value: str) -> int:
+        """Return the integer ID of ``value``, adding it if necessary."""
+        if self._index is None:
+            self._thaw()
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = self.append(value)
+        return index
+
+    def get(self, value: str, default: int | None = None) -> int | None:
+        """Return the integer ID of ``value`` or ``default``."""
+        if self._index is not None:
+            return self._index.get(value, default)
+        position = bisect.bisect_left(self._sorted, value, key=self.__getitem__)
+        if position < len(self._sorted) and self[self._sorted[position]] == value:
+            return int(self._sorted[position])
+        return default
+
+    def freeze(self) -> None:
+        """Drop the lookup dict in favour of the sorted index array."""
+        if self._index is None:
+            return
+        # UTF-8 byte order is code point order, so the buffer slices compare like the strings
+        self._sorted = np.fromiter((index for _, index in sorted(self._index.items())),
+                                   dtype=np.int64, count=len(self._index))
+        self._index = None
+
+    def _thaw(self) -> None:
+        self._index = {value: index for index, value in enumerate(self)}
+        self._sorted = None
+
+    def __contains__(self, value: object) -> bool:
+        return isinstance(value, str) and self.get(value) is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the buffers and the lookup structure."""
+        if self._index is None:
+            return super().nbytes + self._sorted.nbytes
+        return (super().nbytes + sys.getsizeof(self._index)
+                + sum(sys.getsizeof(value) + sys.getsizeof(index) for value, index in self._index.items()))
+
+
+class CompactGraph:
+    """Directed graph in CSR form with interned node IDs and columnar attributes."""
+
+    def __init__(
+        self,
+        node_ids: StringTable,
+        node_names: StringColumn,
+        node_usernames: StringColumn,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray,
+        types: np.ndarray,
+        type_names: list[str],
+    ) -> None:
+        self.node_ids = node_ids
+        self.node_names = node_names
+        self.node_usernames = node_usernames
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.types = types
+        self.type_names = type_names
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_rows(cls, rows: Iterable[list[str]]) -> 'CompactGraph':
+        """Build a graph from edge list rows (without the header).
+
+        Args:
+            rows (Iterable[list[str]]): Rows in the edge list column order.
+
+        Returns:
+            CompactGraph: The graph.
+        """
+        node_ids = StringTable()
+        node_names = StringColumn()
+        node_usernames = StringColumn()
+        type_codes: dict[str, int] = {}
+        src, dst = array('q'), array('q')
+        weights, types = array('d'), array('B')
+
+        def node(node_id: str, name: str, username: str) -> int:
+            index = node_ids.get(node_id)
+            if index is None:
+                index = node_ids.intern(node_id)
+                node_names.append(name)
+                node_usernames.append(username)
+            return index
+
+        for row in rows:
+            if len(row) < 7:
+                continue
+            src.append(node(row[0], row[1], row[2]))
+            dst.append(node(row[3], row[4], row[5]))
+            connection_type = row[6] or 'forward'
+            code = type_codes.get(connection_type)
+            if code is None:
+                code = type_codes[connection_type] = len(type_codes)
+                if code == 256:
+                    # More connection types than one byte can code
+                    types = array('I', types)
+            types.append(code)
+            try:
+                weights.append(float(row[7]) if len(row) > 7 and row[7] else 1.0)
+            except ValueError:
+                weights.append(1.0)
+
+        type_names = sorted(type_codes, key=type_codes.get)
+        type_dtype = np.uint8 if types.typecode == 'B' else np.uint32
+        return cls.from_arrays(node_ids, node_names, node_usernames,
+                               np.frombuffer(src, dtype=np.int64), np.frombuffer(dst, dtype=np.int64),
+                               np.frombuffer(weights, dtype=np.float64), np.frombuffer(types, dtype=type_dtype),
+                               type_names)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        node_ids: StringTable,
+        node_names: StringColumn,
+        node_usernames: StringColumn,
+        src: np.ndarray,
+        dst: np.ndarray,
+        weights: np.ndarray,
+        types: np.ndarray,
+        type_names: list[str],
+    ) -> 'CompactGraph':
+        """Build the CSR structure from (possibly repeated) edge arrays."""
+        n = len(node_ids)
+        keys = np.asarray(src, dtype=np.int64) * max(n, 1) + np.asarray(dst, dtype=np.int64)
+        # Unique over the reversed arrays so the first hit is the latest occurrence
+        unique_keys, latest, inverse = np.unique(keys[::-1], return_index=True, return_inverse=True)
+        summed = np.bincount(inverse, weights=np.asarray(weights)[::-1], minlength=len(unique_keys))
+        latest_types = np.asarray(types)[::-1][latest]
+
+        # The table is complete: look up node IDs without keeping a Python string per node
+        node_ids.freeze()
+
+        edge_src = unique_keys // max(n, 1)
+        index_dtype = np.int32 if n < 2 ** 31 else np.int64
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edge_src, minlength=n), out=indptr[1:])
+
+        return cls(
+            node_ids,
+            node_names,
+            node_usernames,
+            indptr,
+            (unique_keys % max(n, 1)).astype(index_dtype),
+            summed,
+            latest_types.astype(np.uint8 if len(type_names) <= 256 else np.uint32),
+            list(type_names),
+        )
+
+    @classmethod
+    def from_edge_list(cls, *edge_list_paths: str) -> 'CompactGraph':
+        """Stream edge list CSV files, possibly gzip or zstd compressed, into one compact graph.
+
+        Several paths (e.g. the rotated parts of an edge list, oldest first) are read in order.
+        """
+        return cls.from_rows(row for path in edge_list_paths for row in _read_edge_list(path))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def number_of_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def number_of_edges(self) -> int:
+        return len(self.indices)
+
+    def node_index(self, node_id: str) -> int | None:
+        """Return the integer index of a node ID, or ``None``."""
+        return self.node_ids.get(node_id)
+
+    def node_name(self, node_id: str) -> str:
+        """Return the name of a node by ID, or 'Unknown'."""
+        index = self.node_ids.get(node_id)
+        return self.node_names[index] if index is not None else 'Unknown'
+
+    def node_label(self, index: int) -> str:
+        """Return a display label "name (@username)" for a node index."""
+        name = self.node_names[index] or self.node_ids[index]
+        username = self.node_usernames[index]
+        return f"{name} (@{username})" if username and username != 'Unknown' else name
+
+    def sources(self) -> np.ndarray:
+        """Return the source node index of every edge (expanded from ``indptr``)."""
+        return np.repeat(np.arange(self.number_of_nodes(), dtype=self.indices.dtype),
+                         np.diff(self.indptr))
+
+    def edge_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return ``(src, dst, weights, types)`` arrays, one entry per edge."""
+        return self.sources(), self.indices, self.weights, self.types
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.indices, minlength=self.number_of_nodes())
+
+    def successors(self, index: int) -> np.ndarray:
+        return self.indices[self.indptr[index]:self.indptr[index + 1]]
+
+    def connection_type_counts(self) -> dict[str, int]:
+        counts = np.bincount(self.types, minlength=len(self.type_names))
+        return {name: int(count) for name, count in zip(self.type_names, counts) if count}
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the graph's arrays and string buffers."""
+        return (self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes + self.types.nbytes
+                + self.node_ids.nbytes + self.node_names.nbytes + self.node_usernames.nbytes)
+
+    # ------------------------------------------------------------------
+    # Transformations
+    # ------------------------------------------------------------------
+    def edge_subgraph(self, edge_mask: np.ndarray) -> 'CompactGraph':
+        """Return the graph induced by the selected edges, dropping isolated nodes."""
+        src, dst, weights, types = self.edge_arrays()
+        src, dst = src[edge_mask], dst[edge_mask]
+        kept = np.unique(np.concatenate([src, dst]))
+
+        node_ids, node_names, node_usernames = StringTable(), StringColumn(), StringColumn()
+        for index in kept.tolist():
+            node_ids.intern(self.node_ids[index])
+            node_names.append(self.node_names[index])
+            node_usernames.append(self.node_usernames[index])
+
+        remap = np.full(self.number_of_nodes(), -1, dtype=np.int64)
+        remap[kept] = np.arange(len(kept))
+        return CompactGraph.from_arrays(node_ids, node_names, node_usernames,
+                                        remap[src], remap[dst], weights[edge_mask], types[edge_mask],
+                                        self.type_names)
+
+    def to_networkx(self):
+        """Convert to a ``networkx.DiGraph`` with the usual node and edge attributes."""
+        import networkx as nx
+
+        G = nx.DiGraph()
+        for index in range(self.number_of_nodes()):
+            G.add_node(self.node_ids[index], name=self.node_names[index],
+                       username=self.node_usernames[index])
+
+        ids = list(self.node_ids)
+        src, dst, weights, types = self.edge_arrays()
+        G.add_edges_from(
+            (ids[u], ids[v], {'connection_type': self.type_names[t], 'weight': float(w)})
+            for u, v, w, t in zip(src.tolist(), dst.tolist(), weights.tolist(), types.tolist())
+        )
+        return G
@@ -0,0 +1,256 @@
+"""Streaming compaction of edge lists.
+
+``create_edge_list`` writes one weight-1 row per forward, so long-lived edge
+lists are mostly repetitions. ``aggregate_edges`` folds rows with the same
+(From_Channel_ID, To_Channel_ID, ConnectionType) into one row carrying the
+summed weight and the most recent name and username of each channel.
+
+Memory stays bounded: rows are first combined in an in-memory table of at
+most ``max_edges`` edges. When it fills up, its entries are spilled to
+``buckets`` temporary files, hash-partitioned by edge key, so every edge ends
+up in exactly one bucket. Each bucket is then aggregated on its own and
+written sorted by the position of the last input row it folds, and the
+buckets are merged back in that order. Output rows are therefore ordered by
+their last occurrence, and the graph loaded from a compacted edge list
+(where the latest row of a channel pair decides its connection type) is the
+one loaded from the original. Only the channel name table grows with the
+input, with the number of distinct channels.
+
+``compact_edge_list`` applies this to a (possibly compressed) edge list file.
+"""
+
+import csv
+import heapq
+import logging
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator
+
+from .compact_graph import EDGE_LIST_COLUMNS
+from .compression import open_text, strip_compression
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_EDGES = 2_000_000
+DEFAULT_BUCKETS = 64
+
+
+@dataclass
+class CompactionStats:
+    """Counters of one compaction."""
+
+    rows_in: int = 0
+    rows_out: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    spills: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        """Input rows per output row."""
+        return self.rows_in / self.rows_out if self.rows_out else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_in / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        return {'rows_in': self.rows_in, 'rows_out': self.rows_out, 'ratio': round(self.ratio, 2),
+                'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out, 'spills': self.spills,
+                'seconds': round(self.seconds, 2), 'rows_per_second': round(self.rows_per_second)}
+
+
+def _weight(row: list[str]) -> float:
+    try:
+        return float(row[7]) if len(row) > 7 and row[7] else 1.0
+    except ValueError:
+        return 1.0
+
+
+def _format_weight(weight: float) -> int | float:
+    return int(weight) if weight.is_integer() else weight
+
+
+def aggregate_edges(
+    rows: Iterable[list[str]],
+    max_edges: int = DEFAULT_MAX_EDGES,
+    buckets: int = DEFAULT_BUCKETS,
+    temp_dir: str | None = None,
+    stats: CompactionStats | None = None,
+) -> Iterator[list[Any]]:
+    """Sum the weights of rows with the same (from, to, type), keeping the latest channel names.
+
+    Args:
+        rows: Edge list rows without the header.
+        max_edges (int): Most edges combined in memory before spilling to the buckets.
+        buckets (int): Number of hash partitions used once the in-memory table is full.
+        temp_dir (str, optional): Where the bucket files are created (default: system temp).
+        stats (CompactionStats, optional): Receives the input and output row counts and spills.
+
+    Yields:
+        Edge list rows, ordered by the last input row each one folds.
+    """
+    stats = stats if stats is not None else CompactionStats()
+    names: dict[str, tuple[str, str]] = {}
+    # Edge key -> [summed weight, sequence number of its last row]
+    edges: dict[tuple[str, str, str], list[Any]] = {}
+    spill = None
+
+    try:
+        for sequence, row in enumerate(rows):
+            if len(row) < 7:
+                continue
+            stats.rows_in += 1
+            names[row[0]] = (row[1], row[2])
+            names[row[3]] = (row[4], row[5])
+            key = (row[0], row[3], row[6] or 'forward')
+            entry = edges.get(key)
+            if entry is None:
+                edges[key] = [_weight(row), sequence]
+                if len(edges) >= max_edges:
+                    if spill is None:
+                        spill = _Spill(buckets, temp_dir)
+                    spill.write(edges)
+                    stats.spills += 1
+                    edges = {}
+            else:
+                entry[0] += _weight(row)
+                entry[1] = sequence
+
+        if spill is None:
+            merged = ((entry[1], key, entry[0])
+                      for key, entry in sorted(edges.items(), key=lambda item: item[1][1]))
+        else:
+            spill.write(edges)
+            edges = {}
+            merged = spill.merged()
+
+        for _, (source, target, connection_type), weight in merged:
+            stats.rows_out += 1
+            yield [source, *names[source], target, *names[target], connection_type, _format_weight(weight)]
+    finally:
+        if spill is not None:
+            spill.close()
+
+
+class _Spill:
+    """Hash-partitioned temporary files of partially aggregated edges."""
+
+    def __init__(self, buckets: int, temp_dir: str | None) -> None:
+        self.directory = tempfile.mkdtemp(prefix='edge_compaction_', dir=temp_dir)
+        self.paths = [os.path.join(self.directory, f'bucket_{number:04d}.csv') for number in range(max(1, buckets))]
+        self._files = [open(path, 'w', newline='', encoding='utf-8') for path in self.paths]
+        self._writers = [csv.writer(file) for file in self._files]
+
+    def write(self, edges: dict[tuple[str, str, str], list[Any]]) -> None:
+        count = len(self._writers)
+        for key, (weight, sequence) in edges.items():
+            self._writers[hash(key) % count].writerow((sequence, *key, weight))
+
+    def _aggregate_bucket(self, path: str) -> str:
+        """Fold one bucket and rewrite it sorted by last sequence number."""
+        edges: dict[tuple[str, str, str], list[Any]] = {}
+        with open(path, 'r', newline='', encoding='utf-8') as file:
+            for sequence, source, target, connection_type, weight in csv.reader(file):
+                key = (source, target, connection_type)
+                entry = edges.get(key)
+                if entry is None:
+                    edges[key] = [float(weight), int(sequence)]
+                else:
+                    entry[0] += float(weight)
+                    entry[1] = max(entry[1], int(sequence))
+
+        sorted_path = path + '.sorted'
+        with open(sorted_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            for key, (weight, sequence) in sorted(edges.items(), key=lambda item: item[1][1]):
+                writer.writerow((sequence, *key, weight))
+        os.remove(path)
+        return sorted_path
+
+    def merged(self) -> Iterator[tuple[int, tuple[str, str, str], float]]:
+        """Yield ``(last sequence, key, weight)`` of every edge, merged across buckets in order."""
+        for file in self._files:
+            file.close()
+        sorted_paths = [self._aggregate_bucket(path) for path in self.paths]
+        self._files = [open(path, 'r', newline='', encoding='utf-8') for path in sorted_paths]
+        streams = [((int(sequence), (source, target, connection_type), float(weight))
+                    for sequence, source, target, connection_type, weight in csv.reader(file))
+                   for file in self._files]
+        yield from heapq.merge(*streams, key=lambda item: item[0])
+
+    def close(self) -> None:
+        for file in self._files:
+            file.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def read_edge_rows(edge_list_path: str) -> Iterator[list[str]]:
+    """Stream the data rows of a possibly compressed edge list, skipping its header."""
+    with open_text(edge_list_path, 'r') as file:
+        reader = csv.reader(file)
+        first = next(reader, None)
+        if first is not None and first[:1] != EDGE_LIST_COLUMNS[:1]:
+            yield first
+        yield from reader
+
+
+def compacted_path(input_path: str) -> str:
+    """Default name of a compacted edge list: ``Edge_List.compact.csv`` next to ``Edge_List.csv``."""
+    name, suffix = strip_compression(input_path)
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.compact{extension}{suffix}"
+
+
+def compact_edge_list(
+    input_path: str,
+    output_path: str,
+    max_edges: int = DEFAULT_MAX_EDGES,
+    buckets: int = DEFAULT_BUCKETS,
+    temp_dir: str | None = None,
+    level: int | None = None,
+) -> CompactionStats:
+    """Write a compacted copy of an edge list in the same schema.
+
+    Either file may be gzip or zstd compressed (by suffix). The output is written
+    to a temporary name first and renamed when complete.
+
+    Args:
+        input_path (str): Edge list to compact.
+        output_path (str): Compacted edge list; must differ from ``input_path``.
+        max_edges (int): Most edges combined in memory before spilling to the buckets.
+        buckets (int): Hash partitions used when spilling.
+        temp_dir (str, optional): Folder of the bucket files (default: system temp).
+        level (int, optional): Compression level of a compressed output.
+
+    Returns:
+        CompactionStats: Row and byte counts, spills and throughput.
+    """
+    if os.path.abspath(input_path) == os.path.abspath(output_path):
+        raise ValueError("The compacted edge list must be written to a new file")
+    stats = CompactionStats(bytes_in=os.path.getsize(input_path))
+    started = time.perf_counter()
+
+    directory, name = os.path.split(output_path)
+    # Keep the compression suffix, which selects the codec
+    temp_path = os.path.join(directory, f".compacting_{name}")
+    try:
+        with open_text(temp_path, 'w', level) as file:
+            writer = csv.writer(file)
+            writer.writerow(EDGE_LIST_COLUMNS)
+            writer.writerows(aggregate_edges(read_edge_rows(input_path), max_edges, buckets, temp_dir, stats))
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    stats.bytes_out = os.path.getsize(output_path)
+    stats.seconds = time.perf_counter() - started
+    logger.info("Compacted %s: %d rows -> %d rows (%.1f:1), %.1f MB -> %.1f MB, %.1fs (%d rows/s, %d spills)",
+                input_path, stats.rows_in, stats.rows_out, stats.ratio, stats.bytes_in / 1e6,
+                stats.bytes_out / 1e6, stats.seconds, stats.rows_per_second, stats.spills)
+    return stats
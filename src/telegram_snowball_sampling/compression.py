@@ -0,0 +1,152 @@
+"""Streaming gzip/zstd compression of crawler outputs.
+
+The codec of a file follows from its name: ``.gz`` is gzip, ``.zst`` is zstd
+and anything else is plain text. ``compressed_path`` adds the suffix of the
+configured ``OUTPUT_COMPRESSION`` to an output path, and ``open_text`` opens
+any of them as a text stream, so writers and readers need not care whether a
+file is compressed.
+
+Appending to a compressed file adds a new gzip member or zstd frame; the
+readers here decompress all of them in sequence, as ``gzip -d`` and
+``zstd -d`` do. Files are compressed and decompressed as they are written and
+read, never loaded whole.
+
+zstd needs the optional ``zstandard`` package.
+"""
+
+import gzip
+import io
+import os
+from typing import IO, Any
+
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+# Levels used when none is given: gzip's 9 is several times slower than 6 for little gain
+DEFAULT_LEVELS = {'gzip': 6, 'zstd': 3}
+
+_READ_SIZE = 128 * 1024
+
+
+def compression_of(path: str | os.PathLike) -> str:
+    """Return the codec of a file from its suffix: "gzip", "zstd" or "none"."""
+    name = os.fspath(path)
+    for compression, suffix in SUFFIXES.items():
+        if name.endswith(suffix):
+            return compression
+    return 'none'
+
+
+def strip_compression(path: str) -> tuple[str, str]:
+    """Split ``path`` into the uncompressed name and its compression suffix."""
+    compression = compression_of(path)
+    if compression == 'none':
+        return path, ''
+    suffix = SUFFIXES[compression]
+    return path[:-len(suffix)], suffix
+
+
+def compressed_path(path: str, compression: str) -> str:
+    """Return ``path`` with the suffix of ``compression`` ("none" leaves it unchanged)."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}")
+    if compression == 'none' or compression_of(path) == compression:
+        return path
+    return path + SUFFIXES[compression]
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd compression requires the zstandard package (pip install zstandard)") from e
+    return zstandard
+
+
+def open_binary(path: str | os.PathLike, mode: str = 'rb', level: int | None = None) -> IO[bytes]:
+    """Open a possibly compressed file as a binary stream of its uncompressed bytes.
+
+    Args:
+        path: File to open; the codec follows from its suffix.
+        mode (str): "rb", "wb" or "ab".
+        level (int, optional): Compression level when writing (None: the codec default).
+
+    Returns:
+        A file object; reading decompresses and writing compresses on the fly.
+    """
+    if mode not in ('rb', 'wb', 'ab'):
+        raise ValueError(f"Unsupported mode {mode!r}")
+    compression = compression_of(path)
+    if compression == 'none':
+        return open(path, mode)
+    level = level or DEFAULT_LEVELS[compression]
+
+    if compression == 'gzip':
+        if mode == 'rb':
+            return gzip.open(path, 'rb')
+        return gzip.open(path, mode, compresslevel=level)
+
+    zstandard = _zstandard()
+    raw = open(path, mode)
+    if mode == 'rb':
+        return io.BufferedReader(_ZstdReader(raw, zstandard.ZstdDecompressor()), _READ_SIZE)
+    return zstandard.ZstdCompressor(level=level).stream_writer(raw, closefd=True)
+
+
+class _ZstdReader(io.RawIOBase):
+    """Decompresses a sequence of zstd frames, the last of which may still be being written.
+
+    ``zstandard``'s own stream reader stops early on a frame without its end, so
+    the frames are fed through decompression objects instead.
+    """
+
+    def __init__(self, raw: IO[bytes], decompressor: Any) -> None:
+        self._raw = raw
+        self._decompressor = decompressor
+        self._frame = None
+        self._buffer = memoryview(b'')
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._buffer:
+            chunk = self._raw.read(_READ_SIZE)
+            if not chunk:
+                return 0
+            self._buffer = memoryview(self._decompress(chunk))
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def _decompress(self, chunk: bytes) -> bytes:
+        output = []
+        while chunk:
+            if self._frame is None:
+                self._frame = self._decompressor.decompressobj()
+            output.append(self._frame.decompress(chunk))
+            chunk = b''
+            if self._frame.eof:
+                chunk = self._frame.unused_data
+                self._frame = None
+        return b''.join(output)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+
+def open_text(path: str | os.PathLike, mode: str = 'r', level: int | None = None) -> IO[str]:
+    """Open a possibly compressed file as UTF-8 text, with ``newline=''`` as the csv module wants.
+
+    Args:
+        path: File to open; the codec follows from its suffix.
+        mode (str): "r", "w" or "a".
+        level (int, optional): Compression level when writing (None: the codec default).
+    """
+    mode = mode.replace('t', '')
+    if compression_of(path) == 'none':
+        return open(path, mode, newline='', encoding='utf-8')
+    return io.TextIOWrapper(open_binary(path, mode + 'b', level), encoding='utf-8', newline='')
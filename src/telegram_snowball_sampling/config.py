@@ -8,19 +8,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-try:
-    from dotenv import load_dotenv
-except ModuleNotFoundError:  # pragma: no cover - fallback for optional dependency
-    def load_dotenv(*_args, **_kwargs) -> None:
-        """Gracefully handle missing python-dotenv dependency."""
 
+def _load_dotenv(path: str) -> None:
+    """Load a .env file, importing python-dotenv only when there is one to read."""
+    try:
+        from dotenv import load_dotenv
+    except ModuleNotFoundError:  # pragma: no cover - fallback for optional dependency
         logger.warning(
             "python-dotenv is not installed; skipping automatic loading of .env files."
         )
+        return
+    # Force reload by setting override=True
+    load_dotenv(path, override=True)
 
 
-# Configuration variables with defaults
-class Config:
+class _LazyConfig(type):
+    """Loads the configuration on first use of a setting instead of at import."""
+
+    def __getattr__(cls, name):
+        # Only called for settings not loaded yet
+        if name.isupper() and not cls.__dict__.get('_loaded'):
+            cls.reload_env()
+            return getattr(cls, name)
+        raise AttributeError(f"type object {cls.__name__!r} has no attribute {name!r}")
+
+    def __setattr__(cls, name, value):
+        # Overriding a setting first loads the others, so a later load cannot undo it
+        if name.isupper() and not cls.__dict__.get('_loaded'):
+            cls.reload_env()
+        super().__setattr__(name, value)
+
+
+# Configuration variables with defaults, read from the environment and .env on first use
+class Config(metaclass=_LazyConfig):
+    _loaded = False
+
     # Load environment variables from .env file
     @classmethod
     def reload_env(cls):
@@ -28,8 +50,7 @@ class Config:
         # Load .env file explicitly, ensuring we get fresh values
         if os.path.exists('.env'):
             logger.info("Loading configuration from .env file")
-            # Force reload by setting override=True
-            load_dotenv('.env', override=True)
+            _load_dotenv('.env')
         else:
             logger.warning("No .env file found")
 
@@ -39,6 +60,8 @@ class Config:
     @classmethod
     def _load_config(cls):
         """Load configuration values from environment variables"""
+        cls._loaded = True
+
         # Telegram API credentials
         cls.API_ID = os.getenv('TELEGRAM_API_ID')
         cls.API_HASH = os.getenv('TELEGRAM_API_HASH')
@@ -60,25 +83,93 @@ class Config:
         else:
             cls.DEFAULT_MAX_POSTS = None
 
+        # Further minimum mention counts derived from the same crawl, e.g. "10,20" (empty disables the sweep)
+        cls.SWEEP_THRESHOLDS = os.getenv('SWEEP_THRESHOLDS', '').strip()
+
+        # Study period: YYYY-MM-DD or a number of days back (empty means unbounded)
+        cls.DEFAULT_START_DATE = os.getenv('DEFAULT_START_DATE', '').strip()
+        cls.DEFAULT_END_DATE = os.getenv('DEFAULT_END_DATE', '').strip()
+
         # Channel recommendations configuration
         cls.DEFAULT_INCLUDE_RECOMMENDATIONS = os.getenv('DEFAULT_INCLUDE_RECOMMENDATIONS', 'True').lower() in ('true',
                                                                                                                '1', 't')
         cls.DEFAULT_RECOMMENDATIONS_DEPTH = int(os.getenv('DEFAULT_RECOMMENDATIONS_DEPTH', 2))
 
+        # Crawl order: "priority" (most mentioned channels first) or "fifo"
+        cls.CRAWL_FRONTIER = os.getenv('CRAWL_FRONTIER', 'priority').lower()
+
         # URL extraction configuration
         cls.DEFAULT_INCLUDE_URLS = os.getenv('DEFAULT_INCLUDE_URLS', 'True').lower() in ('true', '1', 't')
+        cls.SAVE_RAW_URLS = os.getenv('SAVE_RAW_URLS', 'True').lower() in ('true', '1', 't')
+        cls.URL_DEDUP_CAPACITY = int(os.getenv('URL_DEDUP_CAPACITY', 10_000_000))
+        cls.URL_DEDUP_ERROR_RATE = float(os.getenv('URL_DEDUP_ERROR_RATE', 0.001))
+        cls.URL_DEDUP_FILE = os.getenv('URL_DEDUP_FILE', '')
+
+        # URL extraction workers: 0 extracts on the event loop; "process" or "thread" pool otherwise
+        cls.EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', 0))
+        cls.EXTRACTION_EXECUTOR = os.getenv('EXTRACTION_EXECUTOR', 'process').lower()
+        cls.EXTRACTION_BATCH_SIZE = int(os.getenv('EXTRACTION_BATCH_SIZE', 256))
+
+        # Raw message archive (empty disables it)
+        cls.ARCHIVE_FOLDER = os.getenv('ARCHIVE_FOLDER', '')
+        cls.ARCHIVE_SEGMENT_MB = int(os.getenv('ARCHIVE_SEGMENT_MB', 64))
+
+        # Per-channel forward-source histograms (empty disables them)
+        cls.HISTOGRAM_FILE = os.getenv('HISTOGRAM_FILE', '')
+        cls.HISTOGRAM_MAX_AGE_DAYS = float(os.getenv('HISTOGRAM_MAX_AGE_DAYS', 7))
+
+        # Inaccessible channels remembered across runs (empty keeps them for this run only)
+        cls.NEGATIVE_CACHE_FILE = os.getenv('NEGATIVE_CACHE_FILE', 'negative_cache.json')
+        cls.NEGATIVE_CACHE_RETRY_DAYS = float(os.getenv('NEGATIVE_CACHE_RETRY_DAYS', 30))
+
+        # Per-channel scan depth: "fixed" reads max_posts; "adaptive" (opt-in) stops saturated
+        # channels early and extends productive ones, which also lowers mention counts
+        cls.SCAN_POLICY = os.getenv('SCAN_POLICY', 'fixed').lower()
+        cls.SCAN_WINDOW = int(os.getenv('SCAN_WINDOW', 100))
+        cls.SCAN_MIN_NEW_SOURCES = int(os.getenv('SCAN_MIN_NEW_SOURCES', 1))
+        cls.SCAN_MAX_EXTENSION = float(os.getenv('SCAN_MAX_EXTENSION', 4))
+
+        # Capacity of the queues between the fetch, parse, resolve and write stages of a channel scan
+        cls.PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 100))
+
+        # Crawl budgets (empty means unlimited)
+        cls.BUDGET_MAX_API_CALLS = cls._optional_number('BUDGET_MAX_API_CALLS', int)
+        cls.BUDGET_MAX_MESSAGES = cls._optional_number('BUDGET_MAX_MESSAGES', int)
+        cls.BUDGET_MAX_CHANNELS_PER_ITERATION = cls._optional_number('BUDGET_MAX_CHANNELS_PER_ITERATION', int)
+        cls.BUDGET_DEADLINE_MINUTES = cls._optional_number('BUDGET_DEADLINE_MINUTES', float)
+        cls.BUDGET_MAX_FLOOD_WAIT_SECONDS = cls._optional_number('BUDGET_MAX_FLOOD_WAIT_SECONDS', float)
+
+        # Output writers: rows per write, fsync policy (never, close, interval or batch) and rotation size
+        cls.OUTPUT_BATCH_SIZE = int(os.getenv('OUTPUT_BATCH_SIZE', 500))
+        cls.OUTPUT_FSYNC = os.getenv('OUTPUT_FSYNC', 'close').lower()
+        cls.OUTPUT_FSYNC_INTERVAL = float(os.getenv('OUTPUT_FSYNC_INTERVAL', 5))
+        cls.OUTPUT_ROTATE_MB = float(os.getenv('OUTPUT_ROTATE_MB', 0))
+        cls.OUTPUT_COMPRESSION = os.getenv('OUTPUT_COMPRESSION', 'none').lower()
+        cls.OUTPUT_COMPRESSION_LEVEL = int(os.getenv('OUTPUT_COMPRESSION_LEVEL', 0))
 
         # File paths and directories
         cls.RESULTS_FOLDER = os.getenv('RESULTS_FOLDER', 'results')
         cls.MERGED_FOLDER = os.getenv('MERGED_FOLDER', 'merged')
         cls.EDGE_LIST_FOLDER = os.getenv('EDGE_LIST_FOLDER', 'EdgeList')
         cls.EDGE_LIST_FILENAME = os.getenv('EDGE_LIST_FILENAME', 'Edge_List.csv')
+        cls.EDGE_STORE_FOLDER = os.getenv('EDGE_STORE_FOLDER', '')
+        cls.EDGE_STORE_PARTITION = os.getenv('EDGE_STORE_PARTITION', 'run').lower()
         cls.MERGED_FILENAME = os.getenv('MERGED_FILENAME', 'merged_channels.csv')
         cls.API_DETAILS_FILE = os.getenv('API_DETAILS_FILE', 'api_values.txt')
 
         # Debug mode
         cls.DEBUG = os.getenv('DEBUG', 'False').lower() in ('true', '1', 't')
 
+    @staticmethod
+    def _optional_number(name, number_type):
+        """Read a numeric environment variable; empty or invalid values mean no limit"""
+        value = os.getenv(name, '').strip()
+        try:
+            return number_type(value) if value else None
+        except ValueError:
+            logger.warning(f"Ignoring invalid value for {name}: {value}")
+            return None
+
     @classmethod
     def validate(cls):
         """Validate the configuration and log warnings for missing values"""
@@ -97,16 +188,33 @@ class Config:
         logger.info(f"Default iterations: {cls.DEFAULT_ITERATIONS}")
         logger.info(f"Default min mentions: {cls.DEFAULT_MIN_MENTIONS}")
         logger.info(f"Default max posts: {cls.DEFAULT_MAX_POSTS}")
+        logger.info(f"Sweep thresholds: {cls.SWEEP_THRESHOLDS or 'none'}")
+        logger.info(f"Default date window: {cls.DEFAULT_START_DATE or 'unbounded'} to {cls.DEFAULT_END_DATE or 'now'}")
         logger.info(f"Include recommendations: {cls.DEFAULT_INCLUDE_RECOMMENDATIONS}")
         logger.info(f"Recommendations depth: {cls.DEFAULT_RECOMMENDATIONS_DEPTH}")
+        logger.info(f"Crawl frontier: {cls.CRAWL_FRONTIER}")
+        logger.info(f"Scan policy: {cls.SCAN_POLICY}")
+        logger.info(f"Pipeline queue size: {cls.PIPELINE_QUEUE_SIZE}")
         logger.info(f"Include URLs: {cls.DEFAULT_INCLUDE_URLS}")
+        logger.info(f"URL extraction workers: {cls.EXTRACTION_WORKERS} ({cls.EXTRACTION_EXECUTOR})")
+        logger.info(f"Message archive: {cls.ARCHIVE_FOLDER or 'disabled'}")
+        logger.info(f"Forward histograms: {cls.HISTOGRAM_FILE or 'disabled'} "
+                    f"(reused for {cls.HISTOGRAM_MAX_AGE_DAYS} days)")
+        logger.info(f"Negative cache: {cls.NEGATIVE_CACHE_FILE or 'this run only'} "
+                    f"(retry after {cls.NEGATIVE_CACHE_RETRY_DAYS} days)")
+        logger.info(f"Budget - max API calls: {cls.BUDGET_MAX_API_CALLS}, max messages: {cls.BUDGET_MAX_MESSAGES}, "
+                    f"max channels per iteration: {cls.BUDGET_MAX_CHANNELS_PER_ITERATION}, "
+                    f"deadline (minutes): {cls.BUDGET_DEADLINE_MINUTES}, "
+                    f"max FloodWait seconds: {cls.BUDGET_MAX_FLOOD_WAIT_SECONDS}")
+        logger.info(f"Output - batch size: {cls.OUTPUT_BATCH_SIZE}, fsync: {cls.OUTPUT_FSYNC}, "
+                    f"rotate at: {f'{cls.OUTPUT_ROTATE_MB} MB' if cls.OUTPUT_ROTATE_MB else 'never'}, "
+                    f"compression: {cls.OUTPUT_COMPRESSION}"
+                    f"{f' (level {cls.OUTPUT_COMPRESSION_LEVEL})' if cls.OUTPUT_COMPRESSION_LEVEL else ''}")
         logger.info(f"Results folder: {cls.RESULTS_FOLDER}")
         logger.info(f"Merged folder: {cls.MERGED_FOLDER}")
         logger.info(f"Edge list folder: {cls.EDGE_LIST_FOLDER}")
+        logger.info(f"Edge store: {cls.EDGE_STORE_FOLDER or 'disabled'}"
+                    f"{f' (one partition per {cls.EDGE_STORE_PARTITION})' if cls.EDGE_STORE_FOLDER else ''}")
         logger.info(f"Debug mode: {cls.DEBUG}")
 
         return True
-
-
-# Initial load of configuration
-Config.reload_env()
@@ -0,0 +1,725 @@
+"""Snowball sampling crawl.
+
+``process_channels`` runs the iterations of a crawl on a connected client;
+``run_crawl`` wraps it with the outputs of a run (results file, edge list or
+edge store partitions, archive, histograms, negative cache) and the summary
+shown at the end. Both take every parameter explicitly, so the interactive
+``main.py`` and the ``crawl`` subcommand share them.
+"""
+
+import contextlib
+import csv
+import datetime
+import logging
+import os
+import time
+from typing import Any
+
+from telethon.errors import RPCError
+from telethon.errors.rpcerrorlist import ChannelPrivateError
+from telethon.tl.types import Channel, PeerChannel
+
+from .archive import MessageArchive
+from .budget import BudgetedClient, BudgetExhausted, CrawlBudget
+from .compact_graph import EDGE_LIST_COLUMNS
+from .compression import compressed_path, open_text
+from .config import Config
+from .date_window import DateWindow
+from .dedup import Deduplicator
+from .edge_list import create_edge_list
+from .edge_store import EdgeStore, RunPartitions
+from .extraction import ExtractionExecutor
+from .frontier import create_frontier, save_frontier
+from .histograms import ChannelHistogram, HistogramStore, scan_scope
+from .identity import ChannelRegistry
+from .negative_cache import NegativeCache
+from .output import OutputService
+from .pipeline import STOP, Pipeline
+from .recommendations import (
+    get_channel_recommendations,
+    process_urls,
+)
+from .replay import ArchiveRecorder
+from .resolver import EntityResolver
+from .scan_policy import ScanPolicy
+from .sweep import SweepRecorder
+from .urls import UrlStore
+from .utils import (
+    create_network_visualization_guide,
+    final_message,
+    remove_inaccessible_channels,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def _iterate(items):
+    """Iterate a plain iterable with ``async for``, like ``client.iter_messages``."""
+    for item in items:
+        yield item
+
+
+async def _within(messages, date_window):
+    """Yield messages until the first one older than the date window."""
+    # History is returned newest first; the rest is outside the window
+    async for message in messages:
+        if date_window.before_start(message):
+            return
+        yield message
+
+
+async def process_channels(
+    client,
+    csv_file_path,
+    initial_channels,
+    iterations,
+    min_mentions: int = 5,
+    max_posts: int | None = None,
+    include_recommendations: bool = True,
+    recommendations_depth: int = 2,
+    include_urls: bool = True,
+    edge_list_writer: Any | None = None,
+    frontier: str = 'priority',
+    budget: CrawlBudget | None = None,
+    scan_policy: ScanPolicy | None = None,
+    date_window: DateWindow | None = None,
+    negative_cache: NegativeCache | None = None,
+    archive: MessageArchive | None = None,
+    sweep_thresholds: list[int] | None = None,
+    histograms: HistogramStore | None = None,
+    results_writer: Any | None = None,
+):
+    """Process channels using snowball sampling technique.
+
+    Args:
+        client (TelegramClient): Initialized Telegram client
+        csv_file_path (str): Path to the CSV file for results
+        initial_channels (list): Initial seed channels
+        iterations (int): Number of iterations to perform
+        min_mentions (int): Minimum number of mentions to include a channel
+        max_posts (int, optional): Maximum number of posts to check per channel
+        include_recommendations (bool): Whether to include channel recommendations
+        recommendations_depth (int): Maximum depth for recommendations
+        include_urls (bool): Whether to extract and process URLs
+        edge_list_writer (csv.writer, TextIO or RunPartitions, optional): Writer for edge list entries.
+            The partitions of a ``RunPartitions`` writer are told when each iteration starts
+        frontier (str): Order in which queued channels are scanned: "priority" (most
+            mentioned and referred channels first) or "fifo" (discovery order)
+        budget (CrawlBudget, optional): Limits on API calls, messages, channels per iteration,
+            time and FloodWait. When a budget runs out the crawl stops cleanly and the
+            channels still queued are written to an ``unexplored_`` CSV next to the results
+        scan_policy (ScanPolicy, optional): Decides how many messages are read per channel.
+            Defaults to a fixed ``max_posts`` limit
+        date_window (DateWindow, optional): Only read messages from this period, both for
+            forwards and URLs. Reading starts at the window end and stops at its start
+        negative_cache (NegativeCache, optional): Channels known to be private, banned or
+            missing. They are never queued, and new failures are recorded and saved
+        archive (MessageArchive, optional): Stores every message read from the scanned
+            channels, with the channel entities and recommendations seen, so later
+            analyses can re-read them and ``ReplayClient`` can re-run the crawl offline
+        sweep_thresholds (list[int], optional): Further minimum mention counts to evaluate in the
+            same crawl. The crawl runs at the loosest of these and ``min_mentions``, and the results
+            CSV and edge list of every stricter threshold are derived from it and written to a
+            ``sweep_min<N>`` folder next to the results, or to edge store runs ``<run_id>_min<N>``
+            when ``edge_list_writer`` is a ``RunPartitions`` (see ``SweepRecorder``)
+        histograms (HistogramStore, optional): Stores the forward sources of every scanned channel.
+            A channel with a fresh histogram taken with the same scan limits is not read again;
+            its stored forwards are counted instead
+        results_writer (csv.writer or SinkWriter, optional): Writer for the results rows. By default
+            they are appended to ``csv_file_path``
+
+    Returns:
+        tuple: Results, durations, channel counts, and total messages processed
+
+    Note:
+        Channel entities are cached to minimize redundant API calls. Every entity is recorded in a
+        ``ChannelRegistry`` that maps all aliases of a channel to its ID, so a channel reached as a
+        username, entity, peer or ID is queued, fetched and written under one identity. At the start
+        of each iteration the queued channels are resolved in bulk (see ``EntityResolver``) and channels
+        processed since they were queued are dropped without a request.
+    """
+    # Record the entities and recommendations needed to replay the crawl offline
+    if archive is not None:
+        client = ArchiveRecorder(client, archive)
+
+    # Charge every request to the crawl budget
+    budget = budget or CrawlBudget()
+    client = BudgetedClient(client, budget)
+
+    if scan_policy is None:
+        scan_policy = ScanPolicy(max_posts, adaptive=False)
+
+    # Edge store partitions switch per iteration; keep them before the writer gets wrapped
+    partitions = edge_list_writer if isinstance(edge_list_writer, RunPartitions) else None
+
+    # Crawl once at the loosest threshold and derive the stricter ones from it
+    sweep = None
+    if sweep_thresholds:
+        thresholds = sorted(set(sweep_thresholds) | {min_mentions})
+        min_mentions = thresholds[0]
+        sweep = SweepRecorder(iterations, thresholds[1:])
+        edge_list_writer = sweep.writer(edge_list_writer)
+        logger.info(f"Sweep: crawling at min mentions {min_mentions}, deriving {thresholds[1:]}")
+
+    date_window = date_window or DateWindow()
+    if date_window:
+        logger.info(f"Reading messages from {date_window}")
+    histogram_scope = scan_scope(scan_policy, date_window)
+
+    # Stages each channel's messages go through; the statistics cover the whole crawl
+    pipeline = Pipeline(Config.PIPELINE_QUEUE_SIZE)
+
+    # Every alias of a channel (username, entity, peer, ID) maps to one canonical ID
+    registry = ChannelRegistry()
+
+    # Channels that failed before are skipped until their retry period has passed
+    negative_cache = negative_cache if negative_cache is not None else NegativeCache()
+
+    # Initial variables defined
+    channels_to_process = create_frontier(frontier, key=registry.key, exclude=negative_cache.blocked)
+    for initial_channel in initial_channels:
+        channels_to_process.add(initial_channel)
+    processed_channel_ids = set()  # Track processed channels by canonical ID
+    iteration_results, iteration_durations, mention_counter = [], [], {}
+    referrer_counter: dict[str, int] = {}  # Distinct channels forwarding from each channel
+    total_messages_processed, channel_counts = 0, []
+
+    # Resolves queued channels in bulk at the start of each iteration
+    resolver = EntityResolver(client, registry=registry, negative_cache=negative_cache)
+
+    # Cache for channels linked through t.me URLs, keyed by username or ID
+    linked_channel_cache: dict[str, Channel | None] = {}
+
+    # Run-wide filter of the URLs already saved, optionally shared across runs. URL edges are
+    # never filtered: each channel's links are written once per run, with their counts as weight
+    url_filter = None
+    if include_urls and Config.SAVE_RAW_URLS:
+        if Config.URL_DEDUP_FILE:
+            url_filter = Deduplicator.load(Config.URL_DEDUP_FILE, Config.URL_DEDUP_CAPACITY,
+                                           Config.URL_DEDUP_ERROR_RATE)
+        else:
+            url_filter = Deduplicator(Config.URL_DEDUP_CAPACITY, Config.URL_DEDUP_ERROR_RATE)
+
+    # Worker pool extracting URLs off the event loop (inline when EXTRACTION_WORKERS is 0)
+    extractor = ExtractionExecutor.from_config(Config) if include_urls else None
+
+    # Set up the deduplicated URL store if needed
+    url_file = None
+    if include_urls and Config.SAVE_RAW_URLS:
+        url_file_path = compressed_path(
+            os.path.join(Config.RESULTS_FOLDER, f"urls_{datetime.datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.txt"),
+            Config.OUTPUT_COMPRESSION)
+        url_file = UrlStore(url_file_path, url_filter, Config.OUTPUT_COMPRESSION_LEVEL or None)
+        logger.info(f"URLs will be saved to {url_file_path}")
+
+    for iteration in range(iterations):
+        if budget.exhausted:
+            break
+        iteration_start_time = time.time()
+        channels_scanned = 0
+        current_iteration_channels = set()
+        current_iteration_channel_names = {}
+        iteration_number = iteration + 1  # (adjust for zero indexed value meaning first iter is displayed as 1 & not 0)
+
+        logger.info(f"Starting iteration {iteration_number}/{iterations}")
+        if partitions is not None:
+            partitions.start_iteration(iteration_number)
+
+        try:
+            await resolver.resolve_frontier(channels_to_process, processed_channel_ids)
+        except BudgetExhausted:
+            break
+
+        while channels_to_process and not budget.exhausted:
+            if budget.iteration_full(channels_scanned):
+                logger.info(f"Channel budget of {budget.max_channels_per_iteration} reached for iteration "
+                            f"{iteration_number}; {len(channels_to_process)} channels stay queued")
+                break
+            channel = channels_to_process.pop()
+
+            # Skip channels scanned since they were queued before making any request
+            if registry.resolve_id(channel) in processed_channel_ids:
+                registry.skip()
+                continue
+
+            scanning = None  # Channel ID while its scan is under way
+            try:
+                # Get the channel entity unless it is already known
+                channel_entity = channel if isinstance(channel, Channel) else registry.cached(channel)
+                if channel_entity is None:
+                    try:
+                        channel_entity = await client.get_entity(channel)
+                    except (ValueError, RPCError) as e:
+                        if not negative_cache.add(registry.key(channel), e):
+                            raise
+                        logger.warning(f"Cannot access channel {channel}: {e}")
+                        continue
+                    negative_cache.discard(registry.key(channel), registry.key(channel_entity))
+                registry.register(channel_entity, channel)
+                channel_name = getattr(channel_entity, 'title', 'Unknown')
+                channel_username = getattr(channel_entity, 'username', 'Unknown')
+                channel_id = getattr(channel_entity, 'id', None)
+
+                # Skip if we couldn't get a valid channel ID
+                if channel_id is None:
+                    logger.warning(f"Could not get valid ID for channel: {channel}")
+                    continue
+
+                # Convert ID to string to ensure consistency
+                channel_id_str = str(channel_id)
+
+                if Config.DEBUG:
+                    logger.debug(f"Processing channel: {channel_name} (@{channel_username}, ID: {channel_id_str})")
+
+                # Check if we've already processed this channel
+                if channel_id not in processed_channel_ids:
+                    processed_channel_ids.add(channel_id)
+                    scanning = channel_id
+                    channels_scanned += 1
+                    if sweep is not None:
+                        sweep.start_channel(channel_id_str, channel_name, channel_username,
+                                            seed=any(registry.resolve_id(seed) == channel_id
+                                                     for seed in initial_channels))
+
+                    # Process channel recommendations if enabled
+                    if include_recommendations:
+                        discovered = {}
+                        recommendation_channels = await get_channel_recommendations(
+                            client,
+                            channel_entity,
+                            max_depth=recommendations_depth,
+                            edge_list_writer=edge_list_writer,
+                            discovered=discovered,
+                            registry=registry,
+                        )
+                        # Queue the recommended entities themselves so they need no lookup
+                        for recommended_channel in recommendation_channels:
+                            if sweep is not None:
+                                sweep.add_recommendation(registry.key(recommended_channel))
+                            if registry.resolve_id(recommended_channel) in processed_channel_ids:
+                                registry.skip()
+                                continue
+                            _, depth = discovered.get(recommended_channel, (None, 1))
+                            channels_to_process.add(registry.entity(recommended_channel) or recommended_channel,
+                                                    depth=depth)
+
+                    # Process URLs if enabled
+                    if include_urls:
+                        await process_urls(client, channel_entity, edge_list_writer, url_file,
+                                           resolved_channels=linked_channel_cache, registry=registry,
+                                           date_window=date_window,
+                                           extractor=extractor)
+
+                    try:
+                        scan = scan_policy.start()
+                        channel_referrals = set()  # Channels this channel forwarded from
+
+                        # Count the stored forwards of a recently scanned channel instead of reading it again
+                        stored = histograms.fresh(channel_id, histogram_scope) if histograms is not None else None
+                        histogram = ChannelHistogram(channel_id) if histograms is not None and stored is None else None
+                        if stored is not None:
+                            logger.info(f"Using stored forwards of {channel_name} ({len(stored)} sources)")
+                            messages = _iterate(stored.replay(registry))
+                        else:
+                            # Use the previously fetched channel_entity to avoid redundant API calls
+                            messages = _within(client.iter_messages(channel_entity, **date_window.iter_kwargs()),
+                                               date_window)
+
+                        async def parse_message(message, emit):
+                            """Count a message and pass forwards from channels over the threshold on."""
+                            nonlocal total_messages_processed
+                            if stored is None:
+                                if archive is not None:
+                                    archive.add(channel_id, message)
+                                if histogram is not None:
+                                    histogram.add_message(message)
+
+                                if Config.DEBUG and total_messages_processed % 100 == 0:
+                                    logger.debug("Processing message %d...", total_messages_processed)
+
+                                total_messages_processed += 1
+                            new_source = False
+
+                            if message.forward:
+                                # Check if the forward is from a channel
+                                fwd_from = message.forward.chat if isinstance(message.forward.chat, Channel) else None
+
+                                if fwd_from:
+                                    fwd_from_id = getattr(fwd_from, 'id', None)
+
+                                    # Skip if we couldn't get a valid channel ID
+                                    if fwd_from_id is None:
+                                        logger.warning(
+                                            f"Could not get valid ID for forwarded channel in message {message.id}")
+                                        return None
+
+                                    # Canonical key shared by the counters, the frontier and the writers
+                                    fwd_from_id_str = registry.key(fwd_from)
+                                    if histogram is not None:
+                                        histogram.add_forward(fwd_from, message)
+
+                                    mention_counter[fwd_from_id_str] = mention_counter.get(fwd_from_id_str, 0) + 1
+                                    if sweep is not None:
+                                        sweep.add_forward(fwd_from_id_str)
+                                    if fwd_from_id_str not in channel_referrals:
+                                        channel_referrals.add(fwd_from_id_str)
+                                        new_source = True
+                                        referrer_counter[fwd_from_id_str] = referrer_counter.get(fwd_from_id_str, 0) + 1
+
+                                    # Raise the priority of a channel that is already queued
+                                    if fwd_from_id_str in channels_to_process:
+                                        channels_to_process.add(fwd_from, key=fwd_from_id_str,
+                                                                mentions=mention_counter[fwd_from_id_str],
+                                                                referrers=referrer_counter[fwd_from_id_str])
+
+                                    if mention_counter[fwd_from_id_str] >= min_mentions:
+                                        await emit((fwd_from, fwd_from_id, fwd_from_id_str))
+
+                            if stored is None and not scan.record(new_source):
+                                return STOP
+                            return None
+
+                        async def resolve_forward(forward, emit):
+                            """Get the entity of a forwarded channel and pass its row on to the writer."""
+                            fwd_from, fwd_from_id, fwd_from_id_str = forward
+                            if negative_cache.blocked(fwd_from_id_str):
+                                return
+                            try:
+                                # Reuse the known entity of the forwarding channel or fetch it once
+                                fwd_from_entity = registry.cached(fwd_from_id)
+                                if fwd_from_entity is None:
+                                    try:
+                                        fwd_from_entity = await client.get_entity(fwd_from)
+                                    except (ValueError, RPCError) as e:
+                                        negative_cache.add(fwd_from_id_str, e, name=getattr(fwd_from, 'title', None))
+                                        raise
+                                    negative_cache.discard(fwd_from_id_str)
+                                    registry.register(fwd_from_entity)
+
+                                fwd_from_name = getattr(fwd_from_entity, 'title', 'Unknown')
+                                fwd_from_username = getattr(fwd_from_entity, 'username', 'Unknown')
+                                if sweep is not None:
+                                    sweep.add_source(fwd_from_id_str, fwd_from_name, fwd_from_username)
+
+                                # Add to current iteration's channels
+                                current_iteration_channels.add(fwd_from_id)
+                                current_iteration_channel_names[fwd_from_id] = fwd_from_name
+                                await emit((fwd_from_id_str, fwd_from_name, fwd_from_username))
+
+                                # Display progress
+                                queue = len(channels_to_process)
+                                completed = len(processed_channel_ids)
+
+                                logger.info(
+                                    f"Processed messages: [{total_messages_processed}]; channels: [{completed}]"
+                                    f" (iteration {iteration_number}/{iterations}) Left in queue: {queue} "
+                                    f"¦ Forward found in: {channel} = {channel_name} <<< "
+                                    f"{fwd_from_id} = {fwd_from_name} "
+                                )
+
+                            except BudgetExhausted:
+                                raise
+
+                            except Exception as ex:
+                                logger.error(f"Error processing forward: {ex}")
+                                if Config.DEBUG:
+                                    import traceback
+                                    logger.error(traceback.format_exc())
+
+                        with contextlib.ExitStack() as stack:
+                            channel_results = results_writer or csv.writer(
+                                stack.enter_context(open_text(csv_file_path, 'a')))
+
+                            async def write_forward(row, emit):
+                                """Write a forward to the edge list and the results CSV."""
+                                fwd_from_id_str, fwd_from_name, fwd_from_username = row
+                                create_edge_list(
+                                    edge_list_writer,
+                                    fwd_from_id_str,
+                                    fwd_from_name,
+                                    fwd_from_username,
+                                    channel_id_str,
+                                    channel_name,
+                                    channel_username,
+                                    connection_type="forward",
+                                )
+                                channel_results.writerow([fwd_from_id_str, fwd_from_name, fwd_from_username])
+
+                            # Fetching, parsing, entity lookups and writes overlap, joined by bounded queues
+                            await pipeline.run(
+                                messages,
+                                [('parse', parse_message), ('resolve', resolve_forward), ('write', write_forward)],
+                                read_ahead=scan.checkpoint if stored is None else None,
+                            )
+
+                        if stored is None:
+                            scan_policy.finish(scan)
+                        if histogram is not None:
+                            histograms.save(histogram, histogram_scope)
+                        if archive is not None:
+                            archive.flush_channel(channel_id)
+                        scanning = None
+                        negative_cache.discard(channel_id_str)
+
+                    except ChannelPrivateError as e:
+                        negative_cache.add(channel_id_str, e, name=channel_name)
+                        logger.warning(f"Cannot access private channel: {channel}")
+                        continue
+
+                    except BudgetExhausted:
+                        raise
+
+                    except Exception as ex:
+                        logger.error(f"Unexpected error processing channel {channel}: {ex}")
+                        if Config.DEBUG:
+                            import traceback
+                            logger.error(traceback.format_exc())
+
+            except ChannelPrivateError as e:
+                negative_cache.add(registry.key(channel), e)
+                logger.warning(f"Cannot access private channel or banned from channel: {channel}")
+                continue
+
+            except BudgetExhausted:
+                # Keep a channel that could not be scanned or was cut short; the loop condition ends the crawl
+                if scanning is not None:
+                    processed_channel_ids.discard(scanning)
+                if registry.resolve_id(channel) not in processed_channel_ids:
+                    channels_to_process.add(channel)
+                continue
+
+            except Exception as ex:
+                logger.error(f"Unexpected error with channel {channel}: {ex}")
+                if Config.DEBUG:
+                    import traceback
+                    logger.error(traceback.format_exc())
+
+        # Store data for this iteration
+        iteration_data = [(cid, current_iteration_channel_names[cid]) for cid in current_iteration_channels]
+        iteration_results.append(iteration_data)
+
+        # Add new channels to process for next iteration - use actual entities if available
+        for new_channel_id in current_iteration_channels:
+            if new_channel_id not in processed_channel_ids:
+                # Use the entity if we have it, otherwise use the ID with PeerChannel
+                new_channel = registry.entity(new_channel_id) or PeerChannel(new_channel_id)
+                new_channel_key = registry.key(new_channel_id)
+                channels_to_process.add(new_channel, key=new_channel_key,
+                                        mentions=mention_counter.get(new_channel_key, 0),
+                                        referrers=referrer_counter.get(new_channel_key, 0))
+
+        # Calculate and store iteration metrics
+        iteration_end_time = time.time()
+        iteration_duration = iteration_end_time - iteration_start_time
+        iteration_durations.append(iteration_duration)
+        channel_counts.append(len(current_iteration_channels))
+
+        logger.info(f"Completed iteration {iteration_number}/{iterations} in {iteration_duration:.2f} seconds")
+        logger.info(f"Found {len(current_iteration_channels)} channels in this iteration")
+        logger.info(f"Pipeline stages: {pipeline.summary()}")
+
+    if budget.exhausted:
+        logger.warning(f"Crawl stopped early: {budget.reason}")
+
+    # Record the channels that were queued but never scanned
+    if channels_to_process:
+        unexplored_path = os.path.join(os.path.dirname(csv_file_path),
+                                       f"unexplored_{os.path.basename(csv_file_path)}")
+        count = save_frontier(channels_to_process, unexplored_path)
+        logger.info(f"{count} unexplored channels saved to {unexplored_path}")
+
+    if sweep is not None:
+        if budget.exhausted:
+            logger.warning("The crawl was cut short; sweep outputs only cover the channels it scanned")
+        # Drop the channels that run_crawl removes from the main results; edge store runs get derived runs
+        sweep.write(csv_file_path, compressed_path(Config.EDGE_LIST_FILENAME, Config.OUTPUT_COMPRESSION),
+                    exclude=negative_cache.blocked_ids(), store_run=partitions)
+
+    logger.info(f"Crawl budget used: {budget.summary()}")
+    logger.info(f"Channel scans: {scan_policy.summary()}")
+    logger.info(f"Entity resolution: {resolver.summary()}")
+    logger.info(f"Channel identities: {registry.summary()}")
+    logger.info(f"Inaccessible channels: {negative_cache.summary()}")
+    if histograms is not None:
+        logger.info(f"Forward histograms: {histograms.summary()}")
+    negative_cache.save()
+    if archive is not None:
+        archive.close()
+        logger.info(f"Archived {archive.written_messages} messages "
+                    f"({archive.written_bytes / 1e6:.1f} MB compressed) to {archive.directory}")
+
+    if extractor is not None:
+        logger.info(f"URL extraction: {extractor.summary()}")
+        extractor.close()
+
+    # Close URL store if it was opened
+    if url_file:
+        url_file.close()
+    if url_filter is not None and Config.URL_DEDUP_FILE:
+        url_filter.save(Config.URL_DEDUP_FILE)
+
+    return iteration_results, iteration_durations, channel_counts, total_messages_processed
+
+
+async def run_crawl(
+    client,
+    initial_channels: list[str],
+    iterations: int,
+    min_mentions: int,
+    sweep_thresholds: list[int] | None = None,
+    max_posts: int | None = None,
+    include_recommendations: bool = True,
+    recommendations_depth: int = 2,
+    include_urls: bool = True,
+    date_window: DateWindow | None = None,
+    deadline_minutes: float | None = None,
+) -> str | None:
+    """Run a complete crawl: open the outputs, process the channels and report.
+
+    The client is disconnected when the crawl ends, also after an error.
+
+    Args:
+        client (TelegramClient): Connected Telegram client
+        initial_channels (list[str]): Seed channels
+        iterations (int): Number of iterations to perform
+        min_mentions (int): Minimum number of mentions to include a channel
+        sweep_thresholds (list[int], optional): Further minimum mention counts derived from the same crawl
+        max_posts (int, optional): Maximum number of posts to check per channel
+        include_recommendations (bool): Whether to include channel recommendations
+        recommendations_depth (int): Maximum depth for recommendations
+        include_urls (bool): Whether to extract and process URLs
+        date_window (DateWindow, optional): Study period (default: unbounded)
+        deadline_minutes (float, optional): Runtime limit, overriding BUDGET_DEADLINE_MINUTES
+
+    Returns:
+        str | None: Path of the results file, or None if the crawl failed.
+    """
+    sweep_thresholds = sweep_thresholds or []
+    date_window = date_window or DateWindow()
+    budget = CrawlBudget.from_config(Config)
+    if deadline_minutes:
+        budget.deadline_seconds = deadline_minutes * 60
+
+    negative_cache = NegativeCache.from_config(Config)
+    histograms = HistogramStore.from_config(Config)
+    archive = None
+    if Config.ARCHIVE_FOLDER:
+        archive = MessageArchive(Config.ARCHIVE_FOLDER, segment_size=Config.ARCHIVE_SEGMENT_MB * 1024 * 1024)
+
+    # Record start time
+    start_time = time.time()
+
+    try:
+        # Writing results to CSV
+        datetimestamp = datetime.datetime.now().strftime('%Y_%m_%d_%H_%M_%S')
+
+        # Define the directory and filename
+        directory = Config.RESULTS_FOLDER
+        filename = f'snowball_sampler_results_{datetimestamp}.csv'
+        file_path = compressed_path(os.path.join(directory, filename), Config.OUTPUT_COMPRESSION)
+
+        # Create the directory if it does not exist
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+            logger.info(f"Created directory: {directory}")
+
+        # Create CSV with headers
+        with open_text(file_path, 'w', Config.OUTPUT_COMPRESSION_LEVEL or None) as file:
+            writer = csv.writer(file)
+            writer.writerow(['Channel ID', 'Channel Name', 'Channel Username'])
+
+        logger.info(f"Created output file: {file_path}")
+
+    except (IOError, ImportError) as e:
+        logger.error(f"IOError occurred: {e}")
+        await client.disconnect()
+        return None
+
+    # One writer task per output file; rows from concurrent lookups never interleave
+    outputs = OutputService.from_config(Config)
+    edge_store = EdgeStore.from_config(Config)
+    if edge_store is not None:
+        # This run's edges go to their own partitions, listed in the store manifest
+        try:
+            edge_list_writer = edge_store.begin_run(outputs, {
+                'seeds': initial_channels,
+                'iterations': iterations,
+                'min_mentions': min_mentions,
+                'sweep_thresholds': sweep_thresholds,
+                'max_posts': max_posts,
+                'include_recommendations': include_recommendations,
+                'recommendations_depth': recommendations_depth,
+                'include_urls': include_urls,
+                'date_window': str(date_window),
+                'results_file': file_path,
+            }, Config.EDGE_STORE_PARTITION)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error opening the edge store: {e}")
+            await client.disconnect()
+            return None
+    else:
+        edge_list_path = outputs.path(os.path.join(Config.EDGE_LIST_FOLDER, Config.EDGE_LIST_FILENAME))
+        edge_list_writer = outputs.open(edge_list_path, EDGE_LIST_COLUMNS)
+    results_writer = outputs.open(file_path, rotate=False)
+    run_status = 'interrupted'
+
+    # Run the snowball sampling process
+    try:
+        results, iteration_durations, channel_counts, total_messages_processed = await process_channels(
+            client,
+            file_path,
+            initial_channels,
+            iterations,
+            min_mentions,
+            max_posts,
+            include_recommendations,
+            recommendations_depth,
+            include_urls,
+            edge_list_writer=edge_list_writer,
+            frontier=Config.CRAWL_FRONTIER,
+            budget=budget,
+            scan_policy=ScanPolicy.from_config(Config, max_posts),
+            date_window=date_window,
+            negative_cache=negative_cache,
+            archive=archive,
+            sweep_thresholds=sweep_thresholds,
+            histograms=histograms,
+            results_writer=results_writer,
+        )
+        run_status = 'complete'
+    except Exception as e:
+        logger.error(f"Error during processing: {e}")
+        if Config.DEBUG:
+            import traceback
+            logger.error(traceback.format_exc())
+        await client.disconnect()
+        if archive is not None:
+            archive.close()
+        return None
+    finally:
+        # Flush and close the output files, also after an error or Ctrl-C
+        await outputs.close()
+        if isinstance(edge_list_writer, RunPartitions):
+            try:
+                edge_store.finish_run(edge_list_writer, run_status)
+            except OSError as e:
+                logger.error(f"Error updating the edge store manifest: {e}")
+        if histograms is not None:
+            histograms.close()
+
+    # Drop channels found inaccessible from this run's results
+    inaccessible_ids = negative_cache.blocked_ids()
+    if inaccessible_ids:
+        remove_inaccessible_channels(file_path, inaccessible_ids)
+
+    # Disconnect from Telegram
+    await client.disconnect()
+
+    # Show final results
+    final_message(start_time, total_messages_processed, iteration_durations, channel_counts,
+                  stopped_by=budget.reason)
+
+    # Create network visualization guide
+    create_network_visualization_guide()
+
+    return file_path
@@ -0,0 +1,94 @@
+"""Date windows restricting a crawl to messages from a study period.
+
+Telegram returns channel history newest first. ``DateWindow.iter_kwargs`` passes
+the end of the window as ``offset_date`` so reading starts at the window end
+instead of the newest message, and ``before_start`` tells the caller to stop at
+the first message older than the window, so history outside the window is never
+fetched beyond the page that crosses its start.
+"""
+
+import datetime
+import logging
+import re
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_RELATIVE_DAYS = re.compile(r'^(\d+)\s*d?$', re.IGNORECASE)
+
+
+def parse_date(value: str | None, end: bool = False, now: datetime.datetime | None = None) -> datetime.datetime | None:
+    """Parse a window boundary.
+
+    Accepts ``YYYY-MM-DD``, an ISO 8601 datetime, or a number of days before now
+    (``90`` or ``90d``). Naive values are taken as UTC. A plain date used as the
+    end of a window includes that whole day.
+
+    Args:
+        value (str, optional): Text to parse; empty or None means no boundary.
+        end (bool): Whether the value is the end of the window.
+        now (datetime, optional): Reference time for relative values. Defaults to now.
+
+    Returns:
+        datetime or None: Timezone-aware boundary.
+
+    Raises:
+        ValueError: If the value cannot be parsed.
+    """
+    if value is None or not str(value).strip():
+        return None
+    value = str(value).strip()
+
+    relative = _RELATIVE_DAYS.match(value)
+    if relative:
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        return now - datetime.timedelta(days=int(relative.group(1)))
+
+    parsed = datetime.datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    if end and len(value) == 10:
+        parsed += datetime.timedelta(days=1)
+    return parsed
+
+
+class DateWindow:
+    """Half-open period ``[start, end)`` of messages to read; either side may be open.
+
+    Args:
+        start (datetime, optional): Oldest message date to read.
+        end (datetime, optional): Messages from this moment on are skipped.
+    """
+
+    def __init__(self, start: datetime.datetime | None = None, end: datetime.datetime | None = None) -> None:
+        if start is not None and end is not None and start >= end:
+            raise ValueError(f"Window start {start:%Y-%m-%d %H:%M} is not before its end {end:%Y-%m-%d %H:%M}")
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def parse(cls, start: str | None = None, end: str | None = None) -> 'DateWindow':
+        """Create a window from text boundaries (see ``parse_date``)."""
+        return cls(parse_date(start), parse_date(end, end=True))
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'DateWindow':
+        """Create the window set by ``DEFAULT_START_DATE`` and ``DEFAULT_END_DATE``."""
+        return cls.parse(config.DEFAULT_START_DATE, config.DEFAULT_END_DATE)
+
+    def iter_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for ``client.iter_messages`` starting at the window end."""
+        return {'offset_date': self.end} if self.end is not None else {}
+
+    def before_start(self, message: Any) -> bool:
+        """Whether ``message`` is older than the window, i.e. iteration can stop."""
+        date = getattr(message, 'date', None)
+        return self.start is not None and date is not None and date < self.start
+
+    def __bool__(self) -> bool:
+        return self.start is not None or self.end is not None
+
+    def __str__(self) -> str:
+        start = f"{self.start:%Y-%m-%d %H:%M}" if self.start else "the beginning"
+        end = f"{self.end:%Y-%m-%d %H:%M}" if self.end else "now"
+        return f"{start} to {end}"
@@ -0,0 +1,167 @@
+"""Run-wide deduplication of URLs and URL edges.
+
+A crawl can see tens of millions of links, most of them repeats. ``Deduplicator``
+keeps an exact set while it is small and switches to a Bloom filter sized for
+the expected number of keys and false-positive rate once it grows past
+``exact_limit``, so memory stays flat. A false positive only means a new URL is
+treated as already seen; nothing is ever reported twice. The filter can be
+saved and loaded to deduplicate across runs.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Bloom filter over strings using double hashing of a 128-bit BLAKE2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.bit_count / capacity * math.log(2))))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bit_count for i in range(self.hash_count)]
+
+    def add(self, key: str) -> bool:
+        """Add ``key`` and return True if it was (probably) not present before."""
+        new = False
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+
+class Deduplicator:
+    """Set of seen keys: exact up to ``exact_limit`` entries, a Bloom filter beyond.
+
+    Args:
+        capacity (int): Expected number of distinct keys; sizes the Bloom filter.
+        error_rate (float): Target false-positive rate of the Bloom filter at capacity.
+        exact_limit (int): Number of keys kept exactly before switching to the filter.
+    """
+
+    VERSION = 1
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001, exact_limit: int = 100_000) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.exact_limit = exact_limit
+        self.exact: set[str] | None = set()
+        self.bloom: BloomFilter | None = None
+        self.duplicates = 0
+
+    def add(self, key: str) -> bool:
+        """Record ``key`` and return True if it had not been seen before."""
+        if self.exact is not None:
+            if key in self.exact:
+                self.duplicates += 1
+                return False
+            self.exact.add(key)
+            if len(self.exact) > self.exact_limit:
+                self._switch_to_bloom()
+            return True
+
+        if self.bloom.add(key):
+            if self.bloom.count == self.capacity + 1:
+                logger.warning("URL deduplication filter exceeded its capacity of %d; "
+                               "the false-positive rate will rise", self.capacity)
+            return True
+        self.duplicates += 1
+        return False
+
+    def __contains__(self, key: str) -> bool:
+        if self.exact is not None:
+            return key in self.exact
+        return key in self.bloom
+
+    def __len__(self) -> int:
+        return len(self.exact) if self.exact is not None else self.bloom.count
+
+    def _switch_to_bloom(self) -> None:
+        self.bloom = BloomFilter(max(self.capacity, len(self.exact)), self.error_rate)
+        for key in self.exact:
+            self.bloom.add(key)
+        logger.info("Switched URL deduplication to a %.1f MB Bloom filter after %d keys",
+                    self.bloom.nbytes / 1e6, len(self.exact))
+        self.exact = None
+
+    @classmethod
+    def load(cls, path: str, capacity: int = 10_000_000, error_rate: float = 0.001,
+             exact_limit: int = 100_000) -> 'Deduplicator':
+        """Load a saved filter, or return an empty one if none can be read."""
+        dedup = cls(capacity, error_rate, exact_limit)
+        if not os.path.exists(path):
+            return dedup
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('version') != cls.VERSION:
+                    logger.warning("Ignoring URL filter %s with unsupported version", path)
+                    return dedup
+                if meta['mode'] == 'exact':
+                    dedup.exact = set(data['keys'].tolist())
+                    if len(dedup.exact) > exact_limit:
+                        dedup._switch_to_bloom()
+                else:
+                    bloom = BloomFilter(meta['capacity'], meta['error_rate'])
+                    bloom.bits = bytearray(data['bits'].tobytes())
+                    bloom.count = meta['count']
+                    dedup.capacity, dedup.error_rate = bloom.capacity, bloom.error_rate
+                    dedup.bloom, dedup.exact = bloom, None
+        except Exception as e:
+            logger.error("Error loading URL filter from %s: %s", path, e)
+            return cls(capacity, error_rate, exact_limit)
+
+        logger.info("Loaded URL filter with %d keys from %s", len(dedup), path)
+        return dedup
+
+    def save(self, path: str) -> None:
+        """Write the filter atomically to ``path`` (an ``.npz`` file)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = path + '.tmp.npz'
+        if self.exact is not None:
+            meta = {'version': self.VERSION, 'mode': 'exact'}
+            np.savez_compressed(temp_path, meta=np.asarray(json.dumps(meta)),
+                                keys=np.asarray(sorted(self.exact), dtype=str))
+        else:
+            meta = {
+                'version': self.VERSION,
+                'mode': 'bloom',
+                'capacity': self.bloom.capacity,
+                'error_rate': self.bloom.error_rate,
+                'count': self.bloom.count,
+            }
+            np.savez_compressed(temp_path, meta=np.asarray(json.dumps(meta)),
+                                bits=np.frombuffer(bytes(self.bloom.bits), dtype=np.uint8))
+        os.replace(temp_path, path)
@@ -3,6 +3,7 @@ import logging
 from pathlib import Path
 from typing import TextIO, Union
 
+from .compression import open_text
 from .config import Config
 
 # Set up logging
@@ -23,14 +24,16 @@ def create_edge_list(
     """Write a channel relationship to an edge list CSV file.
 
     Args:
-        writer_or_path: CSV writer, open file handle, or path to the edge list file.
+        writer_or_path: CSV writer, open file handle, or path to the edge list file
+            (gzip or zstd compressed if it ends in ``.gz`` or ``.zst``).
         from_channel_id: ID of the source channel.
         from_channel_name: Name of the source channel.
         from_channel_username: Username of the source channel.
-        to_channel_id: ID of the target channel or URL.
-        to_channel_name: Name of the target channel or URL type.
-        to_channel_username: Username of the target channel or ``None`` for URLs.
-        connection_type: Type of connection ("forward", "recommendation", "outbound_link").
+        to_channel_id: ID of the target channel or linked domain.
+        to_channel_name: Name of the target channel or linked domain.
+        to_channel_username: Username of the target channel or ``None`` for domains.
+        connection_type: Type of connection ("forward", "recommendation", "outbound_link",
+            "telegram_link").
         weight: Weight of the edge (number of occurrences).
     """
     # Provide default values for missing parameters
@@ -44,7 +47,7 @@ def create_edge_list(
             path = Path(writer_or_path)
             path.parent.mkdir(parents=True, exist_ok=True)
             write_header = not path.exists() or path.stat().st_size == 0
-            with path.open("a", newline="", encoding="utf-8") as file:
+            with open_text(path, "a") as file:
                 csv_writer = csv.writer(file)
                 if write_header:
                     csv_writer.writerow([
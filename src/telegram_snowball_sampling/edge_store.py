@@ -0,0 +1,365 @@
+"""Partitioned edge store with a run manifest.
+
+Instead of appending every run to one ``Edge_List.csv``, ``EdgeStore`` writes
+each run's edges to its own partition (or one partition per iteration) under
+``partitions/`` and lists them in ``manifest.json``, together with the run's
+parameters, start and end time, status and row counts. Analyses pick the
+partitions of the runs or iterations they need from the manifest and never
+open the others.
+
+``EdgeStore.compact`` folds the raw partitions of finished runs into one
+weight-aggregated segment per run under ``segments/`` (see
+``compaction.aggregate_edges``), so the graph loaded from a segment is the one
+loaded from its partitions. Manifest updates are made under a lock file and
+swapped in atomically, so compaction can run in the background, e.g. from
+cron, while a crawl writes new partitions.
+
+Partitions are ordinary edge list CSV files and may be gzip or zstd
+compressed (see ``compression``).
+"""
+
+import contextlib
+import csv
+import datetime
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterable, Iterator
+
+from .compact_graph import EDGE_LIST_COLUMNS
+from .compaction import aggregate_edges
+from .compression import compressed_path, open_text, strip_compression
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+PARTITION_MODES = ('run', 'iteration')
+RUN_STATUSES = ('running', 'complete', 'interrupted')
+
+_LOCK_TIMEOUT = 60.0
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec='seconds')
+
+
+@dataclass
+class Partition:
+    """One edge list file of the store.
+
+    Attributes:
+        name (str): Unique name, e.g. ``run_2024_05_01_10_00_00_it02``.
+        path (str): File path relative to the store folder.
+        kind (str): "raw" (rows as written by a crawl) or "segment" (weight-aggregated).
+        run (str): ID of the run the rows come from.
+        iteration (int, optional): Crawl iteration of a per-iteration raw partition.
+        rows (int): Data rows in the file.
+        created (str): ISO time the partition was listed.
+        sources (list[str]): Raw partitions folded into a segment.
+    """
+
+    name: str
+    path: str
+    kind: str
+    run: str
+    iteration: int | None = None
+    rows: int = 0
+    created: str = ''
+    sources: list[str] = field(default_factory=list)
+
+
+class EdgeStore:
+    """Folder of edge list partitions described by ``manifest.json``.
+
+    Args:
+        root (str): Store folder; created if missing.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        os.makedirs(os.path.join(root, 'partitions'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'segments'), exist_ok=True)
+        self.manifest_path = os.path.join(root, MANIFEST)
+        self.lock_path = self.manifest_path + '.lock'
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'EdgeStore | None':
+        """Open the store at ``EDGE_STORE_FOLDER``, or return None if it is unset."""
+        return cls(config.EDGE_STORE_FOLDER) if config.EDGE_STORE_FOLDER else None
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+    def read_manifest(self) -> dict[str, Any]:
+        """Return the manifest: ``{'runs': {run_id: {...}}, 'partitions': [Partition, ...]}``."""
+        if not os.path.exists(self.manifest_path):
+            return {'runs': {}, 'partitions': []}
+        with open(self.manifest_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        return {'runs': data.get('runs', {}),
+                'partitions': [Partition(**entry) for entry in data.get('partitions', [])]}
+
+    def _write_manifest(self, manifest: dict[str, Any]) -> None:
+        data = {'version': 1, 'runs': manifest['runs'],
+                'partitions': [asdict(partition) for partition in manifest['partitions']]}
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[dict[str, Any]]:
+        """Hold the manifest lock; yields the current manifest, which is written back on exit."""
+        deadline = time.monotonic() + _LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Edge store manifest is locked: remove {self.lock_path} "
+                                       "if no crawl or compaction is running")
+                time.sleep(0.1)
+        try:
+            os.close(fd)
+            manifest = self.read_manifest()
+            yield manifest
+            self._write_manifest(manifest)
+        finally:
+            os.remove(self.lock_path)
+
+    # ------------------------------------------------------------------
+    # Writing runs
+    # ------------------------------------------------------------------
+    def begin_run(self, outputs: Any, params: dict[str, Any] | None = None, mode: str = 'run',
+                  run_id: str | None = None) -> 'RunPartitions':
+        """Register a new run and return the edge list writer feeding its partitions.
+
+        Args:
+            outputs (OutputService): Opens the partition files; its compression setting applies.
+            params (dict, optional): Run parameters recorded in the manifest (JSON-serializable).
+            mode (str): "run" for one partition per run, "iteration" for one per iteration.
+            run_id (str, optional): Defaults to ``run_<timestamp>``.
+        """
+        if mode not in PARTITION_MODES:
+            raise ValueError(f"Unknown partition mode {mode!r}; expected one of {PARTITION_MODES}")
+        run_id = run_id or f"run_{datetime.datetime.now():%Y_%m_%d_%H_%M_%S}"
+        with self._locked() as manifest:
+            if run_id in manifest['runs']:
+                raise ValueError(f"Run {run_id} is already in the edge store")
+            manifest['runs'][run_id] = {'status': 'running', 'started': _now(), 'finished': None,
+                                        'mode': mode, 'params': params or {}, 'rows': 0}
+        logger.info("Writing edges of %s to %s (one partition per %s)", run_id, self.root, mode)
+        return RunPartitions(self, outputs, run_id, mode)
+
+    def finish_run(self, run: 'RunPartitions', status: str = 'complete') -> None:
+        """List the partitions of ``run`` with their row counts; call after its files are closed."""
+        if status not in RUN_STATUSES:
+            raise ValueError(f"Unknown run status {status!r}; expected one of {RUN_STATUSES}")
+        with self._locked() as manifest:
+            for partition in run.partitions:
+                partition.created = _now()
+                manifest['partitions'].append(partition)
+            manifest['runs'][run.run_id].update(
+                status=status, finished=_now(), rows=sum(partition.rows for partition in run.partitions))
+        logger.info("Run %s %s: %d edge rows in %d partitions", run.run_id, status,
+                    sum(partition.rows for partition in run.partitions), len(run.partitions))
+
+    def write_run(self, run_id: str, rows: Iterable[Iterable[Any]], params: dict[str, Any] | None = None,
+                  compression: str = 'none') -> Partition:
+        """Write a complete run in one partition, e.g. the edges a sweep derives from a crawl.
+
+        Args:
+            run_id (str): ID of the new run.
+            rows (Iterable): Its edge list rows.
+            params (dict, optional): Run parameters recorded in the manifest (JSON-serializable).
+            compression (str): Codec of the partition file.
+        """
+        path = compressed_path(os.path.join(self.root, 'partitions', f"{run_id}.csv"), compression)
+        with self._locked() as manifest:
+            if run_id in manifest['runs']:
+                raise ValueError(f"Run {run_id} is already in the edge store")
+            partition = Partition(run_id, os.path.relpath(path, self.root), 'raw', run_id, created=_now())
+            with open_text(path, 'w') as file:
+                writer = csv.writer(file)
+                writer.writerow(EDGE_LIST_COLUMNS)
+                for row in rows:
+                    writer.writerow(row)
+                    partition.rows += 1
+            manifest['partitions'].append(partition)
+            manifest['runs'][run_id] = {'status': 'complete', 'started': partition.created,
+                                        'finished': partition.created, 'mode': 'run',
+                                        'params': params or {}, 'rows': partition.rows}
+        return partition
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def select(self, runs: Iterable[str] | None = None, iterations: Iterable[int] | None = None,
+               since: str | None = None, until: str | None = None) -> list[Partition]:
+        """Return the partitions of finished runs matching every given filter.
+
+        Args:
+            runs: Run IDs to include (None: all).
+            iterations: Iterations to include. Only per-iteration raw partitions can be
+                sliced; compacted runs are skipped with a warning.
+            since (str, optional): Only runs started on or after this ISO date or time.
+            until (str, optional): Only runs started before this ISO date or time.
+        """
+        manifest = self.read_manifest()
+        wanted_runs = set(runs) if runs is not None else None
+        wanted_iterations = set(iterations) if iterations is not None else None
+        if wanted_runs is not None and wanted_runs - set(manifest['runs']):
+            logger.warning("Runs not in the edge store: %s", sorted(wanted_runs - set(manifest['runs'])))
+
+        selected = []
+        for partition in manifest['partitions']:
+            run = manifest['runs'].get(partition.run, {})
+            if run.get('status') == 'running':
+                continue
+            if wanted_runs is not None and partition.run not in wanted_runs:
+                continue
+            if since and run.get('started', '') < since:
+                continue
+            if until and run.get('started', '') >= until:
+                continue
+            if wanted_iterations is not None:
+                if partition.iteration is None:
+                    logger.warning("Skipping %s: it is not split by iteration", partition.name)
+                    continue
+                if partition.iteration not in wanted_iterations:
+                    continue
+            selected.append(partition)
+        return selected
+
+    def path(self, partition: Partition) -> str:
+        return os.path.join(self.root, partition.path)
+
+    def iter_rows(self, partitions: Iterable[Partition]) -> Iterator[list[str]]:
+        """Stream the data rows of ``partitions``, in order, without their headers."""
+        for partition in partitions:
+            with open_text(self.path(partition), 'r') as file:
+                reader = csv.reader(file)
+                next(reader, None)
+                yield from reader
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+    def compact(self, runs: Iterable[str] | None = None) -> list[Partition]:
+        """Fold the raw partitions of each finished run into one weight-aggregated segment.
+
+        Args:
+            runs: Run IDs to compact (None: every finished run with raw partitions).
+
+        Returns:
+            list[Partition]: The segments written.
+        """
+        manifest = self.read_manifest()
+        wanted = set(runs) if runs is not None else None
+        by_run: dict[str, list[Partition]] = {}
+        for partition in manifest['partitions']:
+            if partition.kind != 'raw' or (wanted is not None and partition.run not in wanted):
+                continue
+            if manifest['runs'].get(partition.run, {}).get('status') in (None, 'running'):
+                continue
+            by_run.setdefault(partition.run, []).append(partition)
+
+        segments = []
+        for run_id, partitions in by_run.items():
+            segment = self._compact_run(run_id, partitions)
+            if segment is not None:
+                segments.append(segment)
+        return segments
+
+    def _compact_run(self, run_id: str, partitions: list[Partition]) -> Partition | None:
+        suffix = strip_compression(partitions[0].path)[1]
+        relative = os.path.join('segments', f"{run_id}.csv{suffix}")
+        temp_path = os.path.join(self.root, 'segments', f"{run_id}.tmp.csv{suffix}")
+        started = time.perf_counter()
+        rows_in = sum(partition.rows for partition in partitions)
+        with open_text(temp_path, 'w') as file:
+            writer = csv.writer(file)
+            writer.writerow(EDGE_LIST_COLUMNS)
+            rows_out = 0
+            for row in aggregate_edges(self.iter_rows(partitions), temp_dir=os.path.join(self.root, 'segments')):
+                writer.writerow(row)
+                rows_out += 1
+
+        segment = Partition(run_id, relative, 'segment', run_id, rows=rows_out,
+                            sources=[partition.name for partition in partitions])
+        names = {partition.name for partition in partitions}
+        with self._locked() as manifest:
+            current = [partition for partition in manifest['partitions'] if partition.name in names]
+            if len(current) != len(partitions):
+                # Compacted by another process meanwhile
+                os.remove(temp_path)
+                return None
+            os.replace(temp_path, self.path(segment))
+            segment.created = _now()
+            manifest['partitions'] = [partition for partition in manifest['partitions']
+                                      if partition.name not in names] + [segment]
+        for partition in partitions:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.path(partition))
+
+        logger.info("Compacted %s: %d partitions, %d rows -> %d rows in %.1fs", run_id, len(partitions),
+                    rows_in, rows_out, time.perf_counter() - started)
+        return segment
+
+    def summary(self) -> dict[str, int]:
+        manifest = self.read_manifest()
+        partitions = manifest['partitions']
+        return {'runs': len(manifest['runs']),
+                'raw_partitions': sum(partition.kind == 'raw' for partition in partitions),
+                'segments': sum(partition.kind == 'segment' for partition in partitions),
+                'rows': sum(partition.rows for partition in partitions)}
+
+
+class RunPartitions:
+    """Edge list writer of one run, feeding the run's partition files.
+
+    Created by ``EdgeStore.begin_run``; pass it to ``process_channels`` as the
+    ``edge_list_writer``. The partitions are listed in the manifest by
+    ``EdgeStore.finish_run`` once the output files are closed.
+    """
+
+    def __init__(self, store: EdgeStore, outputs: Any, run_id: str, mode: str) -> None:
+        self.store = store
+        self.outputs = outputs
+        self.run_id = run_id
+        self.mode = mode
+        self.partitions: list[Partition] = []
+        self.iteration = 1
+        self._partition: Partition | None = None
+        self._sink = None
+
+    def start_iteration(self, iteration: int) -> None:
+        """Send the rows written from now on to the partition of ``iteration``."""
+        if self.mode == 'iteration' and iteration != self.iteration:
+            self._partition = self._sink = None
+        self.iteration = iteration
+
+    def _open(self) -> None:
+        if self.mode == 'iteration':
+            name = f"{self.run_id}_it{self.iteration:02d}"
+            iteration = self.iteration
+        else:
+            name, iteration = self.run_id, None
+        self._sink = self.outputs.open(os.path.join(self.store.root, 'partitions', f"{name}.csv"),
+                                       EDGE_LIST_COLUMNS, rotate=False)
+        relative = os.path.relpath(self._sink.path, self.store.root)
+        self._partition = Partition(name, relative, 'raw', self.run_id, iteration)
+        self.partitions.append(self._partition)
+
+    def writerow(self, row: Iterable[Any]) -> None:
+        if self._sink is None:
+            self._open()
+        self._sink.writerow(row)
+        self._partition.rows += 1
+
+    def writerows(self, rows: Iterable[Iterable[Any]]) -> None:
+        for row in rows:
+            self.writerow(row)
@@ -0,0 +1,118 @@
+"""URL extraction off the event loop.
+
+Extracting, canonicalizing and classifying the URLs of every message is the
+CPU-heavy part of a scan, and it shares the event loop thread with Telethon's
+own decryption. ``ExtractionExecutor`` collects message payloads (the text
+and URL entities, see ``urls.message_payload``) into batches and runs
+``extract_batch`` on them in a process pool, or a thread pool for work that
+releases the GIL. While a batch is being extracted the next messages keep
+arriving; results are yielded in message order, so counters and writers see
+exactly what an inline extraction would produce.
+
+With no workers the batches are extracted inline, as before.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterable, AsyncIterator
+
+from .urls import MessagePayload, classify_url, payload_urls
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_TYPES = ('process', 'thread')
+
+# Extracted URL of a message: (canonical URL, linked channel, linked domain)
+ExtractedUrl = tuple[str, str | None, str | None]
+
+
+def extract_batch(payloads: list[MessagePayload]) -> list[list[ExtractedUrl]]:
+    """Extract and classify the URLs of each payload; runs in the worker processes."""
+    results = []
+    for payload in payloads:
+        urls = (classify_url(url) for url in payload_urls(payload))
+        results.append([url for url in urls if url is not None])
+    return results
+
+
+class ExtractionExecutor:
+    """Batches message payloads and extracts their URLs in a worker pool.
+
+    Args:
+        workers (int): Pool size; 0 extracts inline on the event loop.
+        kind (str): "process" for a ``ProcessPoolExecutor``, "thread" for a ``ThreadPoolExecutor``.
+        batch_size (int): Messages sent to a worker at a time.
+    """
+
+    def __init__(self, workers: int = 0, kind: str = 'process', batch_size: int = 256) -> None:
+        if kind not in EXECUTOR_TYPES:
+            raise ValueError(f"Unknown extraction executor {kind!r}; expected one of {EXECUTOR_TYPES}")
+        self.workers = max(0, workers)
+        self.kind = kind
+        self.batch_size = max(1, batch_size)
+        # Batches in flight; keeps every worker busy without reading far ahead
+        self.max_pending = max(1, 2 * self.workers)
+        self._pool: Executor | None = None
+        self.batches = 0
+        self.messages = 0
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'ExtractionExecutor':
+        """Create the executor selected by the ``EXTRACTION_*`` settings of ``Config``."""
+        return cls(config.EXTRACTION_WORKERS, config.EXTRACTION_EXECUTOR, config.EXTRACTION_BATCH_SIZE)
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            if self.kind == 'process':
+                # Forking a process that runs an event loop and Telethon's threads is unsafe
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            else:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='extraction')
+            logger.info("Started %d %s workers for URL extraction", self.workers, self.kind)
+        return self._pool
+
+    def _submit(self, batch: list[MessagePayload]) -> asyncio.Future:
+        self.batches += 1
+        self.messages += len(batch)
+        if not self.workers:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(extract_batch(batch))
+            return future
+        return asyncio.get_running_loop().run_in_executor(self._executor(), extract_batch, batch)
+
+    async def extract(self, payloads: AsyncIterable[MessagePayload]) -> AsyncIterator[list[ExtractedUrl]]:
+        """Yield the extracted URLs of each payload, in the order the payloads arrive."""
+        pending: deque[asyncio.Future] = deque()
+        batch: list[MessagePayload] = []
+        try:
+            async for payload in payloads:
+                batch.append(payload)
+                if len(batch) < self.batch_size:
+                    continue
+                pending.append(self._submit(batch))
+                batch = []
+                while len(pending) > self.max_pending:
+                    for urls in await pending.popleft():
+                        yield urls
+
+            if batch:
+                pending.append(self._submit(batch))
+            while pending:
+                for urls in await pending.popleft():
+                    yield urls
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        """Shut the worker pool down."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def summary(self) -> dict[str, Any]:
+        return {'executor': self.kind if self.workers else 'inline', 'workers': self.workers,
+                'batches': self.batches, 'messages': self.messages}
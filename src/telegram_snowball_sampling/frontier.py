@@ -0,0 +1,274 @@
+"""Crawl frontiers deciding which channel is scanned next.
+
+Every queued channel is keyed by its channel ID (or lowercased username when
+the ID is not known yet), so a channel discovered several times is queued once
+and its statistics are merged. Two implementations share the same interface:
+
+* ``FifoFrontier`` scans channels in discovery order (the original behaviour);
+* ``PriorityFrontier`` always scans the highest-scoring channel first, so with a
+  limited budget the most central part of the network is mapped first.
+"""
+
+import csv
+import heapq
+import itertools
+import logging
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from .compression import open_text
+
+logger = logging.getLogger(__name__)
+
+FRONTIER_TYPES = ('priority', 'fifo')
+
+
+@dataclass
+class FrontierEntry:
+    """A queued channel and the evidence for scanning it."""
+
+    key: str
+    item: Any
+    mentions: int = 0
+    referrers: int = 0
+    depth: int = 0
+
+
+def default_score(entry: FrontierEntry) -> float:
+    """Score a channel by forward mentions and distinct referrers, preferring shallow recommendations."""
+    return math.log1p(entry.mentions) + 2.0 * math.log1p(entry.referrers) - 0.5 * entry.depth
+
+
+def channel_key(item: Any) -> str:
+    """Return the deduplication key of a channel entity, peer, ID or username."""
+    for attribute in ('id', 'channel_id'):
+        value = getattr(item, attribute, None)
+        if isinstance(value, int):
+            return str(value)
+    if isinstance(item, int):
+        return str(item)
+    return str(item).lstrip('@').lower()
+
+
+class Frontier(ABC):
+    """Common interface of the crawl frontiers.
+
+    Args:
+        key (Callable[[Any], str], optional): Deduplication key of an item.
+            Defaults to ``channel_key``.
+        exclude (Callable[[str], bool], optional): Predicate on keys; matching
+            channels are never queued (e.g. ``NegativeCache.blocked``).
+    """
+
+    def __init__(
+        self,
+        key: Callable[[Any], str] | None = None,
+        exclude: Callable[[str], bool] | None = None,
+    ) -> None:
+        self._key = key or channel_key
+        self._exclude = exclude
+        self._entries: dict[str, FrontierEntry] = {}
+
+    def add(
+        self,
+        item: Any,
+        key: str | None = None,
+        mentions: int = 0,
+        referrers: int = 0,
+        depth: int = 0,
+    ) -> bool:
+        """Queue a channel or update the statistics of an already queued one.
+
+        Statistics are merged with the existing entry: the largest mention and
+        referrer counts and the smallest depth are kept.
+
+        Args:
+            item (Any): Channel entity, peer, ID or username to scan.
+            key (str, optional): Deduplication key. Defaults to the frontier's key of ``item``.
+            mentions (int): Number of forwards from the channel seen so far.
+            referrers (int): Number of distinct channels that forwarded from it.
+            depth (int): Recommendation depth at which it was found (0 for forwards and seeds).
+
+        Returns:
+            bool: True if the channel was not queued before and is not excluded.
+        """
+        key = key if key is not None else self._key(item)
+        if self._exclude is not None and key not in self._entries and self._exclude(key):
+            return False
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = FrontierEntry(key, item, mentions, referrers, depth)
+            self._push(entry)
+            return True
+
+        changed = mentions > entry.mentions or referrers > entry.referrers or depth < entry.depth
+        entry.mentions = max(entry.mentions, mentions)
+        entry.referrers = max(entry.referrers, referrers)
+        entry.depth = min(entry.depth, depth)
+        if changed:
+            self._update(entry)
+        return False
+
+    def pop(self) -> Any:
+        """Remove and return the next channel to scan."""
+        entry = self._pop()
+        del self._entries[entry.key]
+        return entry.item
+
+    def remove(self, key: str) -> None:
+        """Drop a queued channel, if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._discard(entry)
+
+    def replace(self, key: str, item: Any) -> None:
+        """Replace the item of a queued channel, e.g. with its resolved entity."""
+        self._entries[key].item = item
+
+    def entries(self) -> list[FrontierEntry]:
+        """Return the queued entries (in no particular order)."""
+        return list(self._entries.values())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (entry.item for entry in self._entries.values())
+
+    # Implementation hooks
+    @abstractmethod
+    def _push(self, entry: FrontierEntry) -> None:
+        """Queue a new entry."""
+
+    @abstractmethod
+    def _update(self, entry: FrontierEntry) -> None:
+        """Reorder an entry whose statistics changed."""
+
+    @abstractmethod
+    def _pop(self) -> FrontierEntry:
+        """Remove and return the next entry to scan."""
+
+    @abstractmethod
+    def _discard(self, entry: FrontierEntry) -> None:
+        """Forget an entry removed from the frontier."""
+
+
+class FifoFrontier(Frontier):
+    """First-in, first-out frontier; updates do not change the order."""
+
+    def __init__(
+        self,
+        key: Callable[[Any], str] | None = None,
+        exclude: Callable[[str], bool] | None = None,
+    ) -> None:
+        super().__init__(key, exclude)
+        self._queue: deque[FrontierEntry] = deque()
+
+    def _push(self, entry: FrontierEntry) -> None:
+        self._queue.append(entry)
+
+    def _update(self, entry: FrontierEntry) -> None:
+        pass
+
+    def _pop(self) -> FrontierEntry:
+        while self._queue:
+            entry = self._queue.popleft()
+            if self._entries.get(entry.key) is entry:
+                return entry
+        raise IndexError('pop from an empty frontier')
+
+    def _discard(self, entry: FrontierEntry) -> None:
+        # Removed lazily by _pop
+        pass
+
+
+class PriorityFrontier(Frontier):
+    """Max-score frontier backed by a binary heap with lazy invalidation.
+
+    A score change pushes a new heap record and marks the old one as stale, so
+    updates cost O(log n); outdated records are skipped when they surface.
+
+    Args:
+        score (Callable[[FrontierEntry], float], optional): Scoring function.
+            Defaults to ``default_score``.
+        key (Callable[[Any], str], optional): Deduplication key of an item.
+        exclude (Callable[[str], bool], optional): Predicate on keys of channels never to queue.
+    """
+
+    def __init__(
+        self,
+        score: Callable[[FrontierEntry], float] | None = None,
+        key: Callable[[Any], str] | None = None,
+        exclude: Callable[[str], bool] | None = None,
+    ) -> None:
+        super().__init__(key, exclude)
+        self.score = score or default_score
+        self._heap: list[tuple[float, int, str]] = []
+        self._versions: dict[str, int] = {}
+        self._counter = itertools.count()
+
+    def _push(self, entry: FrontierEntry) -> None:
+        # The sequence number identifies the live record and breaks ties by age
+        sequence = next(self._counter)
+        self._versions[entry.key] = sequence
+        heapq.heappush(self._heap, (-self.score(entry), sequence, entry.key))
+        if len(self._heap) > 4 * len(self._entries) + 64:
+            self._compact()
+
+    def _update(self, entry: FrontierEntry) -> None:
+        self._push(entry)
+
+    def _pop(self) -> FrontierEntry:
+        while self._heap:
+            _, sequence, key = heapq.heappop(self._heap)
+            if self._versions.get(key) == sequence:
+                del self._versions[key]
+                return self._entries[key]
+        raise IndexError('pop from an empty frontier')
+
+    def _discard(self, entry: FrontierEntry) -> None:
+        self._versions.pop(entry.key, None)
+
+    def _compact(self) -> None:
+        """Drop outdated heap records once they dominate the heap."""
+        self._heap = [record for record in self._heap if self._versions.get(record[2]) == record[1]]
+        heapq.heapify(self._heap)
+
+
+def save_frontier(frontier: Frontier, path: str) -> int:
+    """Write the queued channels to a CSV file, most mentioned first.
+
+    Args:
+        frontier (Frontier): The frontier left at the end of a crawl.
+        path (str): CSV file to write, compressed if it ends in ``.gz`` or ``.zst``.
+
+    Returns:
+        int: Number of channels written.
+    """
+    entries = sorted(frontier.entries(), key=lambda entry: (-entry.mentions, -entry.referrers, entry.depth))
+    with open_text(path, 'w') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Channel Key', 'Channel', 'Mentions', 'Referrers', 'Depth'])
+        for entry in entries:
+            name = getattr(entry.item, 'title', None) or getattr(entry.item, 'username', None) or str(entry.item)
+            writer.writerow([entry.key, name, entry.mentions, entry.referrers, entry.depth])
+    return len(entries)
+
+
+def create_frontier(
+    kind: str = 'priority',
+    key: Callable[[Any], str] | None = None,
+    exclude: Callable[[str], bool] | None = None,
+) -> Frontier:
+    """Create a frontier by name ("priority" or "fifo") with optional key and exclusion functions."""
+    if kind == 'priority':
+        return PriorityFrontier(key=key, exclude=exclude)
+    if kind == 'fifo':
+        return FifoFrontier(key, exclude)
+    raise ValueError(f"Unknown frontier type: {kind}")
@@ -0,0 +1,265 @@
+"""Persistent per-channel forward-source histograms.
+
+Scanning a channel only matters to the sampler for the channels it forwards
+from and how often. ``HistogramStore`` keeps that summary in a SQLite file:
+one row per (channel, source channel) with the forward count and the first and
+last message (ID and date) forwarding from the source, plus the time and scope
+of the scan it came from. A channel's histogram is built up message by message
+while it is scanned and replaces the stored one when the scan completes.
+
+A later crawl reaching a channel whose histogram is younger than the freshness
+bound and was taken with the same scan limits and date window replays the
+histogram instead of fetching the channel's messages again. The mention
+counts, edges and discovered channels are the same as from a fresh scan of
+unchanged history; only the order of the forwards within the channel differs.
+"""
+
+import datetime
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from telethon.tl import types
+
+from .date_window import DateWindow
+from .scan_policy import ScanPolicy
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    channel_id INTEGER PRIMARY KEY,
+    scope TEXT NOT NULL,
+    scanned_at REAL NOT NULL,
+    messages INTEGER NOT NULL,
+    newest_id INTEGER,
+    oldest_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS forwards (
+    channel_id INTEGER NOT NULL,
+    source_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    first_id INTEGER,
+    first_date TEXT,
+    last_id INTEGER,
+    last_date TEXT,
+    PRIMARY KEY (channel_id, source_id)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    source_id INTEGER PRIMARY KEY,
+    title TEXT,
+    username TEXT,
+    access_hash INTEGER,
+    is_min INTEGER NOT NULL DEFAULT 0,
+    broadcast INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS forwards_by_source ON forwards (source_id);
+"""
+
+
+def scan_scope(scan_policy: ScanPolicy, date_window: DateWindow | None = None) -> str:
+    """Describe the scan limits a histogram was taken with; only matching histograms are reused."""
+    window = date_window or DateWindow()
+    start = f"{window.start:%Y-%m-%d}" if window.start else ''
+    end = f"{window.end:%Y-%m-%d}" if window.end else ''
+    return (f"max_posts={scan_policy.max_posts};adaptive={scan_policy.adaptive};"
+            f"window={scan_policy.window};from={start};to={end}")
+
+
+def _date(value: Any) -> str | None:
+    return value.isoformat() if isinstance(value, datetime.datetime) else None
+
+
+@dataclass
+class SourceCount:
+    """Forwards of one channel from one source channel."""
+
+    source_id: int
+    count: int = 0
+    first_id: int | None = None
+    first_date: str | None = None
+    last_id: int | None = None
+    last_date: str | None = None
+
+
+class ChannelHistogram:
+    """Forward sources of one channel, as counted during a scan.
+
+    Args:
+        channel_id (int): The scanned channel.
+    """
+
+    def __init__(self, channel_id: int) -> None:
+        self.channel_id = channel_id
+        self.sources: dict[int, SourceCount] = {}
+        self.entities: dict[int, Any] = {}
+        self.messages = 0
+        self.newest_id: int | None = None
+        self.oldest_id: int | None = None
+        self.scanned_at: float | None = None
+
+    def add_message(self, message: Any) -> None:
+        """Count a scanned message, forwarded or not."""
+        self.messages += 1
+        message_id = getattr(message, 'id', None)
+        if isinstance(message_id, int):
+            self.newest_id = message_id if self.newest_id is None else max(self.newest_id, message_id)
+            self.oldest_id = message_id if self.oldest_id is None else min(self.oldest_id, message_id)
+
+    def add_forward(self, source: Any, message: Any) -> None:
+        """Count a message forwarded from the ``source`` channel entity."""
+        source_id = source.id
+        entry = self.sources.get(source_id)
+        if entry is None:
+            entry = self.sources[source_id] = SourceCount(source_id)
+            self.entities[source_id] = source
+        entry.count += 1
+
+        message_id = getattr(message, 'id', None)
+        date = _date(getattr(message, 'date', None))
+        if entry.first_id is None or (message_id is not None and message_id < entry.first_id):
+            entry.first_id, entry.first_date = message_id, date
+        if entry.last_id is None or (message_id is not None and message_id > entry.last_id):
+            entry.last_id, entry.last_date = message_id, date
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def replay(self, registry: Any = None) -> Iterator['HistogramForward']:
+        """Yield one forwarded message stand-in per counted forward, newest sources first.
+
+        Source entities come from ``registry`` when known, else from the stored metadata.
+        """
+        for entry in sorted(self.sources.values(), key=lambda entry: entry.last_id or 0, reverse=True):
+            known = registry.entity(entry.source_id) if registry is not None else None
+            source = known or self.entities.get(entry.source_id)
+            if source is None:
+                continue
+            for _ in range(entry.count):
+                yield HistogramForward(entry, source)
+
+
+class HistogramForward:
+    """Stand-in for a forwarded message, rebuilt from a histogram entry."""
+
+    def __init__(self, entry: SourceCount, source: Any) -> None:
+        self.id = entry.last_id
+        self.date = datetime.datetime.fromisoformat(entry.last_date) if entry.last_date else None
+        self.forward = _Forward(source)
+        self.fwd_from = types.MessageFwdHeader(date=self.date or _EPOCH, from_id=types.PeerChannel(entry.source_id))
+
+
+class _Forward:
+    def __init__(self, chat: Any) -> None:
+        self.chat = chat
+
+
+class HistogramStore:
+    """SQLite store of the forward-source histogram of every scanned channel.
+
+    Args:
+        path (str): SQLite database file; created if missing.
+        max_age_days (float): Freshness bound. Histograms older than this are not reused;
+            0 keeps recording them but never reuses one.
+    """
+
+    def __init__(self, path: str, max_age_days: float = 7) -> None:
+        self.path = path
+        self.max_age = max_age_days * DAY
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        self.saved = 0
+        self.reused = 0
+        self.stale = 0
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'HistogramStore | None':
+        """Open the store at ``HISTOGRAM_FILE``, or return None if it is unset or cannot be opened."""
+        if not config.HISTOGRAM_FILE:
+            return None
+        try:
+            return cls(config.HISTOGRAM_FILE, config.HISTOGRAM_MAX_AGE_DAYS)
+        except sqlite3.Error as e:
+            logger.error("Error opening forward histograms %s: %s", config.HISTOGRAM_FILE, e)
+            return None
+
+    def save(self, histogram: ChannelHistogram, scope: str, now: float | None = None) -> None:
+        """Replace the stored histogram of a channel with one from a completed scan."""
+        histogram.scanned_at = time.time() if now is None else now
+        with self._connection:
+            self._connection.execute("DELETE FROM forwards WHERE channel_id = ?", (histogram.channel_id,))
+            self._connection.execute(
+                "INSERT OR REPLACE INTO channels VALUES (?, ?, ?, ?, ?, ?)",
+                (histogram.channel_id, scope, histogram.scanned_at, histogram.messages,
+                 histogram.newest_id, histogram.oldest_id))
+            self._connection.executemany(
+                "INSERT INTO forwards VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(histogram.channel_id, entry.source_id, entry.count, entry.first_id, entry.first_date,
+                  entry.last_id, entry.last_date) for entry in histogram.sources.values()])
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?)",
+                [(source_id, getattr(source, 'title', None), getattr(source, 'username', None),
+                  getattr(source, 'access_hash', None), int(bool(getattr(source, 'min', False))),
+                  int(bool(getattr(source, 'broadcast', True))))
+                 for source_id, source in histogram.entities.items()])
+        self.saved += 1
+
+    def load(self, channel_id: int) -> ChannelHistogram | None:
+        """Return the stored histogram of a channel, or None if it was never scanned."""
+        row = self._connection.execute(
+            "SELECT messages, newest_id, oldest_id, scanned_at FROM channels WHERE channel_id = ?",
+            (channel_id,)).fetchone()
+        if row is None:
+            return None
+
+        histogram = ChannelHistogram(channel_id)
+        histogram.messages, histogram.newest_id, histogram.oldest_id, histogram.scanned_at = row
+        for (source_id, count, first_id, first_date, last_id, last_date,
+             title, username, access_hash, is_min, broadcast) in self._connection.execute(
+                "SELECT f.source_id, f.count, f.first_id, f.first_date, f.last_id, f.last_date, "
+                "s.title, s.username, s.access_hash, s.is_min, s.broadcast "
+                "FROM forwards f LEFT JOIN sources s ON s.source_id = f.source_id WHERE f.channel_id = ?",
+                (channel_id,)):
+            histogram.sources[source_id] = SourceCount(source_id, count, first_id, first_date, last_id, last_date)
+            histogram.entities[source_id] = types.Channel(
+                id=source_id, title=title or '', photo=types.ChatPhotoEmpty(), date=_EPOCH,
+                username=username, access_hash=access_hash, min=bool(is_min), broadcast=bool(broadcast))
+        return histogram
+
+    def fresh(self, channel_id: int, scope: str, now: float | None = None) -> ChannelHistogram | None:
+        """Return the stored histogram of a channel if it is fresh and was taken with ``scope``."""
+        if self.max_age <= 0:
+            return None
+        row = self._connection.execute(
+            "SELECT scope, scanned_at FROM channels WHERE channel_id = ?", (channel_id,)).fetchone()
+        if row is None:
+            return None
+        stored_scope, scanned_at = row
+        if stored_scope != scope or (time.time() if now is None else now) - scanned_at > self.max_age:
+            self.stale += 1
+            return None
+        self.reused += 1
+        return self.load(channel_id)
+
+    def inbound(self, source_id: int) -> dict[int, int]:
+        """Forward counts of ``source_id`` per channel that forwarded from it."""
+        return dict(self._connection.execute(
+            "SELECT channel_id, count FROM forwards WHERE source_id = ?", (source_id,)))
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM channels").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def summary(self) -> dict[str, int]:
+        return {'channels': len(self), 'saved': self.saved, 'reused': self.reused, 'stale': self.stale}
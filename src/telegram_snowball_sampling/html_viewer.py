@@ -0,0 +1,423 @@
+"""Self-contained HTML/WebGL viewer for large channel networks.
+
+The exported page embeds precomputed positions, colors and sizes as base64
+encoded little-endian typed arrays and renders them with plain WebGL, so it
+opens offline in any browser and stays responsive on 100k+ nodes.
+"""
+
+import base64
+import json
+import logging
+import os
+from typing import Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Colors (hex) for the largest communities; smaller ones share OTHER_COLOR
+COMMUNITY_PALETTE = [
+    '#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2',
+    '#17becf', '#bcbd22', '#393b79', '#637939', '#8c6d31', '#843c39', '#7b4173',
+    '#3182bd', '#e6550d', '#31a354', '#756bb1', '#636363', '#fd8d3c',
+]
+OTHER_COLOR = '#b0b0b0'
+
+CONNECTION_TYPE_HEX = {
+    'forward': '#1f4dd9',
+    'recommendation': '#1a9933',
+    'outbound_link': '#d92626',
+    'telegram_link': '#9940bf',
+}
+
+
+def _encode(array: np.ndarray, dtype: str) -> str:
+    """Encode an array as base64 of its little-endian bytes."""
+    return base64.b64encode(np.ascontiguousarray(array, dtype=dtype).tobytes()).decode('ascii')
+
+
+def build_viewer_payload(
+    labels: Sequence[str],
+    positions: np.ndarray,
+    src: np.ndarray,
+    dst: np.ndarray,
+    connection_types: Sequence[str],
+    communities: np.ndarray,
+    centrality: np.ndarray,
+    edge_weights: np.ndarray | None = None,
+    max_edges: int | None = None,
+) -> dict:
+    """Pack the graph into the compact structure embedded in the viewer.
+
+    Args:
+        labels (Sequence[str]): Display label per node.
+        positions (np.ndarray): Node positions of shape (n, 2).
+        src (np.ndarray): Source node indices.
+        dst (np.ndarray): Target node indices.
+        connection_types (Sequence[str]): Connection type per edge.
+        communities (np.ndarray): Community index per node, 0 being the largest.
+        centrality (np.ndarray): Centrality score per node, used for node size.
+        edge_weights (np.ndarray, optional): Edge weights, used to keep the
+            heaviest edges when ``max_edges`` is exceeded.
+        max_edges (int, optional): Maximum number of edges to embed.
+
+    Returns:
+        dict: JSON-serialisable payload with base64 encoded arrays.
+    """
+    n = len(labels)
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+
+    type_names = sorted(set(connection_types))
+    type_index = {name: i for i, name in enumerate(type_names)}
+    edge_type = np.fromiter((type_index[t] for t in connection_types), dtype=np.uint8,
+                            count=len(connection_types))
+
+    if max_edges is not None and len(src) > max_edges:
+        if edge_weights is None:
+            edge_weights = np.ones(len(src))
+        keep = np.sort(np.argsort(-np.asarray(edge_weights), kind='stable')[:max_edges])
+        logger.info("Viewer keeps the %d heaviest of %d edges", max_edges, len(src))
+        src, dst, edge_type = src[keep], dst[keep], edge_type[keep]
+
+    # Node type: the most common connection type among the node's edges
+    counts = np.zeros((n, max(len(type_names), 1)))
+    if len(src):
+        np.add.at(counts, (src, edge_type), 1)
+        np.add.at(counts, (dst, edge_type), 1)
+    node_type = counts.argmax(axis=1).astype(np.uint8)
+
+    community_index = np.minimum(np.asarray(communities), len(COMMUNITY_PALETTE)).astype(np.uint8)
+
+    centrality = np.asarray(centrality, dtype=float)
+    if n and centrality.max() > centrality.min():
+        sizes = np.sqrt((centrality - centrality.min()) / (centrality.max() - centrality.min()))
+    else:
+        sizes = np.zeros(n)
+
+    label_bytes = '\n'.join(str(label).replace('\n', ' ') for label in labels).encode('utf-8')
+
+    return {
+        'nodeCount': n,
+        'edgeCount': int(len(src)),
+        'positions': _encode(positions, '<f4'),
+        'sizes': _encode(sizes, '<f4'),
+        'community': _encode(community_index, 'u1'),
+        'nodeType': _encode(node_type, 'u1'),
+        'edges': _encode(np.column_stack([src, dst]), '<u4'),
+        'edgeType': _encode(edge_type, 'u1'),
+        'labels': base64.b64encode(label_bytes).decode('ascii'),
+        'typeNames': type_names,
+        'typeColors': [CONNECTION_TYPE_HEX.get(name, '#808080') for name in type_names],
+        'communityPalette': COMMUNITY_PALETTE + [OTHER_COLOR],
+    }
+
+
+def write_html_viewer(output_path: str, payload: dict, title: str = 'Telegram Channel Network') -> None:
+    """Write the viewer HTML page with the payload embedded.
+
+    Args:
+        output_path (str): Path of the HTML file to write.
+        payload (dict): Result of :func:`build_viewer_payload`.
+        title (str): Page title.
+    """
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Escaping "</" keeps the payload from closing the script element
+    data = json.dumps(payload, separators=(',', ':')).replace('</', '<\\/')
+    html = (_TEMPLATE
+            .replace('__TITLE__', title.replace('<', '&lt;'))
+            .replace('__DATA__', data))
+
+    with open(output_path, 'w', encoding='utf-8') as file:
+        file.write(html)
+
+    logger.info("Generated interactive viewer at %s (%.1f MB)", output_path,
+                os.path.getsize(output_path) / 1e6)
+
+
+_TEMPLATE = r'''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  html, body { margin: 0; height: 100%; overflow: hidden; font: 13px sans-serif; background: #fff; }
+  #canvas { width: 100%; height: 100%; display: block; cursor: grab; }
+  #panel { position: absolute; top: 10px; left: 10px; background: rgba(255,255,255,0.92);
+           border: 1px solid #ccc; border-radius: 4px; padding: 8px 10px; max-width: 280px; }
+  #panel h1 { font-size: 14px; margin: 0 0 6px; }
+  #panel label { display: block; margin: 2px 0; }
+  #tooltip { position: absolute; pointer-events: none; background: #222; color: #fff;
+             padding: 3px 6px; border-radius: 3px; display: none; white-space: nowrap; }
+  .swatch { display: inline-block; width: 10px; height: 10px; margin-right: 4px; }
+</style>
+</head>
+<body>
+<canvas id="canvas"></canvas>
+<div id="panel">
+  <h1>__TITLE__</h1>
+  <div id="stats"></div>
+  <label>Color nodes by
+    <select id="colorMode">
+      <option value="community">community</option>
+      <option value="type">connection type</option>
+    </select>
+  </label>
+  <div id="edgeToggles"></div>
+  <label>Edge opacity <input id="edgeAlpha" type="range" min="0" max="100" value="25"></label>
+  <label>Search <input id="search" type="text" placeholder="name or @username"></label>
+</div>
+<div id="tooltip"></div>
+<script id="graph-data" type="application/json">__DATA__</script>
+<script>
+(function () {
+  'use strict';
+  var data = JSON.parse(document.getElementById('graph-data').textContent);
+
+  function decode(b64, Type) {
+    var raw = atob(b64), bytes = new Uint8Array(raw.length);
+    for (var i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+    return new Type(bytes.buffer);
+  }
+  function hexToRgb(hex) {
+    return [parseInt(hex.substr(1, 2), 16), parseInt(hex.substr(3, 2), 16), parseInt(hex.substr(5, 2), 16)];
+  }
+
+  var n = data.nodeCount, m = data.edgeCount;
+  var pos = decode(data.positions, Float32Array);
+  var sizes = decode(data.sizes, Float32Array);
+  var community = decode(data.community, Uint8Array);
+  var nodeType = decode(data.nodeType, Uint8Array);
+  var edges = decode(data.edges, Uint32Array);
+  var edgeType = decode(data.edgeType, Uint8Array);
+  var labels = new TextDecoder('utf-8').decode(decode(data.labels, Uint8Array)).split('\n');
+  var typeColors = data.typeColors.map(hexToRgb);
+  var palette = data.communityPalette.map(hexToRgb);
+
+  document.getElementById('stats').textContent = n.toLocaleString() + ' nodes, ' + m.toLocaleString() + ' edges';
+
+  var canvas = document.getElementById('canvas');
+  var gl = canvas.getContext('webgl', { antialias: false, preserveDrawingBuffer: false });
+  if (!gl) { document.body.textContent = 'WebGL is not available in this browser.'; return; }
+
+  function compile(vs, fs) {
+    function shader(type, src) {
+      var s = gl.createShader(type);
+      gl.shaderSource(s, src); gl.compileShader(s);
+      if (!gl.getShaderParameter(s, gl.COMPILE_STATUS)) throw new Error(gl.getShaderInfoLog(s));
+      return s;
+    }
+    var p = gl.createProgram();
+    gl.attachShader(p, shader(gl.VERTEX_SHADER, vs));
+    gl.attachShader(p, shader(gl.FRAGMENT_SHADER, fs));
+    gl.linkProgram(p);
+    return p;
+  }
+
+  var transformGlsl =
+    'uniform vec2 u_center; uniform vec2 u_scale;' +
+    'vec4 project(vec2 p) { return vec4((p - u_center) * u_scale, 0.0, 1.0); }';
+
+  var nodeProgram = compile(
+    'attribute vec2 a_pos; attribute vec3 a_color; attribute float a_size;' +
+    'uniform float u_pointScale; varying vec3 v_color;' + transformGlsl +
+    'void main() { gl_Position = project(a_pos); gl_PointSize = (2.0 + 14.0 * a_size) * u_pointScale; v_color = a_color; }',
+    'precision mediump float; varying vec3 v_color;' +
+    'void main() { vec2 d = gl_PointCoord - 0.5; if (dot(d, d) > 0.25) discard; gl_FragColor = vec4(v_color, 0.9); }');
+
+  var edgeProgram = compile(
+    'attribute vec2 a_pos; attribute vec3 a_color; varying vec3 v_color;' + transformGlsl +
+    'void main() { gl_Position = project(a_pos); v_color = a_color; }',
+    'precision mediump float; varying vec3 v_color; uniform float u_alpha;' +
+    'void main() { gl_FragColor = vec4(v_color, u_alpha); }');
+
+  var nodeSizeBuffer = gl.createBuffer();
+  gl.bindBuffer(gl.ARRAY_BUFFER, nodeSizeBuffer);
+  gl.bufferData(gl.ARRAY_BUFFER, sizes, gl.STATIC_DRAW);
+  var nodePosBuffer = gl.createBuffer();
+  gl.bindBuffer(gl.ARRAY_BUFFER, nodePosBuffer);
+  gl.bufferData(gl.ARRAY_BUFFER, pos, gl.STATIC_DRAW);
+  var nodeColorBuffer = gl.createBuffer();
+
+  function uploadNodeColors(mode) {
+    var colors = new Uint8Array(n * 3);
+    for (var i = 0; i < n; i++) {
+      var c = mode === 'type' ? typeColors[nodeType[i]] || [128, 128, 128] : palette[community[i]];
+      colors[i * 3] = c[0]; colors[i * 3 + 1] = c[1]; colors[i * 3 + 2] = c[2];
+    }
+    gl.bindBuffer(gl.ARRAY_BUFFER, nodeColorBuffer);
+    gl.bufferData(gl.ARRAY_BUFFER, colors, gl.STATIC_DRAW);
+  }
+
+  // Edges are grouped by connection type so each type can be toggled with one draw call
+  var typeCount = data.typeNames.length, edgeGroups = [];
+  var counts = new Uint32Array(typeCount), offsets = new Uint32Array(typeCount);
+  for (var e = 0; e < m; e++) counts[edgeType[e]]++;
+  for (var t = 1; t < typeCount; t++) offsets[t] = offsets[t - 1] + counts[t - 1];
+  var edgePos = new Float32Array(m * 4), edgeColor = new Uint8Array(m * 6), cursor = offsets.slice();
+  for (e = 0; e < m; e++) {
+    var slot = cursor[edgeType[e]]++, a = edges[e * 2], b = edges[e * 2 + 1], c = typeColors[edgeType[e]];
+    edgePos[slot * 4] = pos[a * 2]; edgePos[slot * 4 + 1] = pos[a * 2 + 1];
+    edgePos[slot * 4 + 2] = pos[b * 2]; edgePos[slot * 4 + 3] = pos[b * 2 + 1];
+    for (var k = 0; k < 2; k++) {
+      edgeColor[slot * 6 + k * 3] = c[0]; edgeColor[slot * 6 + k * 3 + 1] = c[1]; edgeColor[slot * 6 + k * 3 + 2] = c[2];
+    }
+  }
+  for (t = 0; t < typeCount; t++) edgeGroups.push({ first: offsets[t] * 2, count: counts[t] * 2, visible: true });
+  var edgePosBuffer = gl.createBuffer();
+  gl.bindBuffer(gl.ARRAY_BUFFER, edgePosBuffer);
+  gl.bufferData(gl.ARRAY_BUFFER, edgePos, gl.STATIC_DRAW);
+  var edgeColorBuffer = gl.createBuffer();
+  gl.bindBuffer(gl.ARRAY_BUFFER, edgeColorBuffer);
+  gl.bufferData(gl.ARRAY_BUFFER, edgeColor, gl.STATIC_DRAW);
+  edgePos = null; edgeColor = null;
+
+  var toggles = document.getElementById('edgeToggles');
+  data.typeNames.forEach(function (name, t) {
+    var label = document.createElement('label'), box = document.createElement('input'), swatch = document.createElement('span');
+    box.type = 'checkbox'; box.checked = true;
+    box.onchange = function () { edgeGroups[t].visible = box.checked; requestDraw(); };
+    swatch.className = 'swatch'; swatch.style.background = data.typeColors[t];
+    label.appendChild(box); label.appendChild(swatch);
+    label.appendChild(document.createTextNode(name + ' (' + counts[t].toLocaleString() + ')'));
+    toggles.appendChild(label);
+  });
+
+  var view = { x: 0.5, y: 0.5, zoom: 1.8 }, dpr = window.devicePixelRatio || 1;
+
+  function bind(program, name, buffer, size, type, normalized) {
+    var loc = gl.getAttribLocation(program, name);
+    gl.bindBuffer(gl.ARRAY_BUFFER, buffer);
+    gl.enableVertexAttribArray(loc);
+    gl.vertexAttribPointer(loc, size, type, normalized, 0, 0);
+    return loc;
+  }
+  function setView(program) {
+    var aspect = canvas.width / canvas.height;
+    gl.uniform2f(gl.getUniformLocation(program, 'u_center'), view.x, view.y);
+    gl.uniform2f(gl.getUniformLocation(program, 'u_scale'), view.zoom / Math.max(aspect, 1), view.zoom * Math.min(aspect, 1));
+  }
+
+  var pending = false;
+  function requestDraw() { if (!pending) { pending = true; requestAnimationFrame(draw); } }
+  function draw() {
+    pending = false;
+    gl.viewport(0, 0, canvas.width, canvas.height);
+    gl.clearColor(1, 1, 1, 1);
+    gl.clear(gl.COLOR_BUFFER_BIT);
+    gl.enable(gl.BLEND);
+    gl.blendFunc(gl.SRC_ALPHA, gl.ONE_MINUS_SRC_ALPHA);
+
+    gl.useProgram(edgeProgram);
+    setView(edgeProgram);
+    gl.uniform1f(gl.getUniformLocation(edgeProgram, 'u_alpha'), document.getElementById('edgeAlpha').value / 100);
+    var l1 = bind(edgeProgram, 'a_pos', edgePosBuffer, 2, gl.FLOAT, false);
+    var l2 = bind(edgeProgram, 'a_color', edgeColorBuffer, 3, gl.UNSIGNED_BYTE, true);
+    edgeGroups.forEach(function (g) { if (g.visible && g.count) gl.drawArrays(gl.LINES, g.first, g.count); });
+    gl.disableVertexAttribArray(l1); gl.disableVertexAttribArray(l2);
+
+    gl.useProgram(nodeProgram);
+    setView(nodeProgram);
+    gl.uniform1f(gl.getUniformLocation(nodeProgram, 'u_pointScale'), dpr * Math.min(Math.sqrt(view.zoom), 4));
+    var l3 = bind(nodeProgram, 'a_pos', nodePosBuffer, 2, gl.FLOAT, false);
+    var l4 = bind(nodeProgram, 'a_color', nodeColorBuffer, 3, gl.UNSIGNED_BYTE, true);
+    var l5 = bind(nodeProgram, 'a_size', nodeSizeBuffer, 1, gl.FLOAT, false);
+    gl.drawArrays(gl.POINTS, 0, n);
+    gl.disableVertexAttribArray(l3); gl.disableVertexAttribArray(l4); gl.disableVertexAttribArray(l5);
+  }
+
+  function resize() {
+    canvas.width = canvas.clientWidth * dpr;
+    canvas.height = canvas.clientHeight * dpr;
+    requestDraw();
+  }
+
+  function toWorld(clientX, clientY) {
+    var aspect = canvas.width / canvas.height, rect = canvas.getBoundingClientRect();
+    var cx = ((clientX - rect.left) / rect.width) * 2 - 1, cy = 1 - ((clientY - rect.top) / rect.height) * 2;
+    return [view.x + cx / (view.zoom / Math.max(aspect, 1)), view.y + cy / (view.zoom * Math.min(aspect, 1))];
+  }
+
+  // Spatial hash for hover picking
+  var GRID = 256, cellStart = new Uint32Array(GRID * GRID + 1), cellNodes = new Uint32Array(n), nodeCell = new Uint32Array(n);
+  for (var i = 0; i < n; i++) {
+    var gx = Math.min(GRID - 1, Math.max(0, Math.floor(pos[i * 2] * GRID)));
+    var gy = Math.min(GRID - 1, Math.max(0, Math.floor(pos[i * 2 + 1] * GRID)));
+    nodeCell[i] = gx * GRID + gy; cellStart[nodeCell[i] + 1]++;
+  }
+  for (i = 0; i < GRID * GRID; i++) cellStart[i + 1] += cellStart[i];
+  var fill = cellStart.slice(0, GRID * GRID);
+  for (i = 0; i < n; i++) cellNodes[fill[nodeCell[i]]++] = i;
+
+  function pick(clientX, clientY) {
+    var w = toWorld(clientX, clientY), rect = canvas.getBoundingClientRect();
+    var radius = 8 / (rect.width * view.zoom / 2), best = -1, bestDist = radius * radius;
+    var span = Math.ceil(radius * GRID);
+    var gx = Math.floor(w[0] * GRID), gy = Math.floor(w[1] * GRID);
+    for (var x = gx - span; x <= gx + span; x++) {
+      if (x < 0 || x >= GRID) continue;
+      for (var y = gy - span; y <= gy + span; y++) {
+        if (y < 0 || y >= GRID) continue;
+        for (var j = cellStart[x * GRID + y]; j < cellStart[x * GRID + y + 1]; j++) {
+          var node = cellNodes[j], dx = pos[node * 2] - w[0], dy = pos[node * 2 + 1] - w[1], d = dx * dx + dy * dy;
+          if (d < bestDist) { bestDist = d; best = node; }
+        }
+      }
+    }
+    return best;
+  }
+
+  var dragging = null, tooltip = document.getElementById('tooltip');
+  canvas.addEventListener('mousedown', function (ev) { dragging = [ev.clientX, ev.clientY]; canvas.style.cursor = 'grabbing'; });
+  window.addEventListener('mouseup', function () { dragging = null; canvas.style.cursor = 'grab'; });
+  canvas.addEventListener('mousemove', function (ev) {
+    if (dragging) {
+      var a = toWorld(dragging[0], dragging[1]), b = toWorld(ev.clientX, ev.clientY);
+      view.x += a[0] - b[0]; view.y += a[1] - b[1];
+      dragging = [ev.clientX, ev.clientY];
+      requestDraw();
+      return;
+    }
+    var node = pick(ev.clientX, ev.clientY);
+    if (node >= 0) {
+      tooltip.textContent = labels[node];
+      tooltip.style.left = (ev.clientX + 12) + 'px'; tooltip.style.top = (ev.clientY + 12) + 'px';
+      tooltip.style.display = 'block';
+    } else {
+      tooltip.style.display = 'none';
+    }
+  });
+  canvas.addEventListener('wheel', function (ev) {
+    ev.preventDefault();
+    var before = toWorld(ev.clientX, ev.clientY);
+    view.zoom *= Math.exp(-ev.deltaY * 0.0015);
+    var after = toWorld(ev.clientX, ev.clientY);
+    view.x += before[0] - after[0]; view.y += before[1] - after[1];
+    requestDraw();
+  }, { passive: false });
+
+  document.getElementById('colorMode').onchange = function (ev) { uploadNodeColors(ev.target.value); requestDraw(); };
+  document.getElementById('edgeAlpha').oninput = requestDraw;
+  document.getElementById('search').onchange = function (ev) {
+    var query = ev.target.value.toLowerCase();
+    if (!query) return;
+    for (var i = 0; i < n; i++) {
+      if (labels[i].toLowerCase().indexOf(query) >= 0) {
+        view.x = pos[i * 2]; view.y = pos[i * 2 + 1]; view.zoom = Math.max(view.zoom, 20);
+        requestDraw();
+        return;
+      }
+    }
+  };
+
+  uploadNodeColors('community');
+  window.addEventListener('resize', resize);
+  resize();
+})();
+</script>
+</body>
+</html>
+'''
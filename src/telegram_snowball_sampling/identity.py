@@ -0,0 +1,101 @@
+"""Canonical channel identities.
+
+The same channel reaches the crawler as a username (seeds, recommendations,
+t.me links), a ``Channel`` entity, a ``PeerChannel``, a bare ``int`` or an ID
+string. ``ChannelRegistry`` maps every alias it has seen to the channel's
+integer ID and keeps the resolved entity, so the frontier, the processed sets,
+the counters and the writers all agree on one identity per channel and a
+channel is only fetched once however it is referred to.
+"""
+
+import logging
+from typing import Any
+
+from .frontier import channel_key
+
+logger = logging.getLogger(__name__)
+
+
+def _alias(value: Any) -> str:
+    return str(value).strip().lstrip('@').lower()
+
+
+class ChannelRegistry:
+    """Alias → channel ID map with the resolved entity of every known channel."""
+
+    def __init__(self) -> None:
+        self._aliases: dict[str, int] = {}
+        self._entities: dict[int, Any] = {}
+        self.duplicates_prevented = 0
+
+    def register(self, entity: Any, *aliases: Any) -> int | None:
+        """Record an entity and the aliases it was reached by.
+
+        Min entities (without an access hash) only record their aliases, since
+        they cannot be used for further requests.
+
+        Args:
+            entity (Channel): Entity returned by Telegram.
+            *aliases: Other references to the same channel, e.g. the username it was queued as.
+                Only strings are recorded; entities, peers and IDs resolve by their ID.
+
+        Returns:
+            int or None: The channel ID, or None if the entity has none.
+        """
+        channel_id = getattr(entity, 'id', None)
+        if not isinstance(channel_id, int):
+            return None
+
+        if not getattr(entity, 'min', False):
+            self._entities[channel_id] = entity
+        self._aliases[str(channel_id)] = channel_id
+        username = getattr(entity, 'username', None)
+        for alias in (username, *aliases):
+            if isinstance(alias, str):
+                self._aliases[_alias(alias)] = channel_id
+        return channel_id
+
+    def resolve_id(self, item: Any) -> int | None:
+        """Return the channel ID of any alias, or None if it is not known yet."""
+        for attribute in ('id', 'channel_id'):
+            value = getattr(item, attribute, None)
+            if isinstance(value, int):
+                return value
+        if isinstance(item, int):
+            return item
+        alias = _alias(item)
+        return int(alias) if alias.isdigit() else self._aliases.get(alias)
+
+    def key(self, item: Any) -> str:
+        """Return the canonical key of ``item``: its ID when known, ``channel_key`` otherwise."""
+        channel_id = self.resolve_id(item)
+        return str(channel_id) if channel_id is not None else channel_key(item)
+
+    def entity(self, item: Any) -> Any | None:
+        """Return the known entity of any alias, without making a request."""
+        channel_id = self.resolve_id(item)
+        return self._entities.get(channel_id) if channel_id is not None else None
+
+    def cached(self, item: Any) -> Any | None:
+        """Like ``entity``, but count a hit as a prevented fetch."""
+        entity = self.entity(item)
+        if entity is not None:
+            self.duplicates_prevented += 1
+        return entity
+
+    def skip(self) -> None:
+        """Count a fetch prevented because the channel is already processed or queued."""
+        self.duplicates_prevented += 1
+
+    def __contains__(self, item: Any) -> bool:
+        return self.resolve_id(item) is not None
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def summary(self) -> dict[str, int]:
+        return {
+            'channels': len(self._entities),
+            'aliases': len(self._aliases),
+            'duplicate_fetches_prevented': self.duplicates_prevented,
+        }
@@ -0,0 +1,548 @@
+"""Scalable graph layout and raster rendering for large channel networks.
+
+The layout is a multilevel force-directed scheme: the graph is repeatedly
+coarsened by collapsing matched node pairs and leaves, the coarsest graph is
+laid out first and the positions are refined on the way back up. Repulsive
+forces are approximated Barnes-Hut style with a hierarchy of uniform grids so
+each refinement step costs O(n log n) instead of O(n²).
+
+The renderer aggregates edges and nodes directly into a pixel buffer, so
+drawing hundreds of thousands of elements costs a few array passes rather than
+one matplotlib artist per element.
+"""
+
+import logging
+import os
+from typing import Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Default colors (RGB, 0-1) used for each connection type when rendering
+CONNECTION_TYPE_COLORS: dict[str, tuple[float, float, float]] = {
+    'forward': (0.12, 0.30, 0.85),
+    'recommendation': (0.10, 0.60, 0.20),
+    'outbound_link': (0.85, 0.15, 0.15),
+    'telegram_link': (0.60, 0.25, 0.75),
+}
+DEFAULT_EDGE_COLOR = (0.5, 0.5, 0.5)
+
+_EPSILON = 1e-9
+
+
+def _symmetric_edges(src: np.ndarray, dst: np.ndarray,
+                     weights: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return both directions of every non-loop edge."""
+    mask = src != dst
+    src, dst, weights = src[mask], dst[mask], weights[mask]
+    return (np.concatenate([src, dst]),
+            np.concatenate([dst, src]),
+            np.concatenate([weights, weights]))
+
+
+def _aggregate_edges(src: np.ndarray, dst: np.ndarray, weights: np.ndarray,
+                     n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merge parallel edges by summing their weights and drop self loops."""
+    mask = src != dst
+    src, dst, weights = src[mask], dst[mask], weights[mask]
+    lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+    keys = lo.astype(np.int64) * n + hi
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    summed = np.bincount(inverse, weights=weights, minlength=len(unique_keys))
+    return unique_keys // n, unique_keys % n, summed
+
+
+def coarsen_graph(src: np.ndarray, dst: np.ndarray, weights: np.ndarray, n: int,
+                  rng: np.random.Generator) -> tuple[np.ndarray, int]:
+    """Compute one coarsening step of the graph.
+
+    A maximal independent set is chosen with Luby's algorithm, preferring high
+    degree nodes, and every other node is merged into its heaviest neighbour in
+    the set. Hubs therefore absorb their fringe, which collapses the star-shaped
+    regions typical of forward networks in a single step.
+
+    Args:
+        src (np.ndarray): Source node indices.
+        dst (np.ndarray): Target node indices.
+        weights (np.ndarray): Edge weights.
+        n (int): Number of nodes.
+        rng (np.random.Generator): Random generator used to break ties.
+
+    Returns:
+        tuple[np.ndarray, int]: Mapping from fine to coarse node index and the
+        number of coarse nodes.
+    """
+    u, v, w = _symmetric_edges(src, dst, weights)
+    if len(u) == 0:
+        return np.arange(n), n
+
+    degree = np.bincount(u, minlength=n)
+    priority = degree + rng.random(n)
+
+    undecided, selected = 0, 1
+    state = np.zeros(n, dtype=np.int8)
+    while True:
+        open_nodes = state == undecided
+        if not open_nodes.any():
+            break
+        active = open_nodes[u] & open_nodes[v]
+        neighbour_max = np.full(n, -1.0)
+        np.maximum.at(neighbour_max, u[active], priority[v[active]])
+        winners = open_nodes & (priority > neighbour_max)
+        state[winners] = selected
+        losers = v[winners[u]]
+        state[losers[state[losers] == undecided]] = 2
+
+    in_set = state == selected
+    target = np.arange(n)
+    candidate = in_set[v] & ~in_set[u]
+    cu, cv, cw = u[candidate], v[candidate], w[candidate]
+    order = np.lexsort((-cw, cu))
+    cu, cv = cu[order], cv[order]
+    first = np.ones(len(cu), dtype=bool)
+    first[1:] = cu[1:] != cu[:-1]
+    target[cu[first]] = cv[first]
+
+    unique_targets, mapping = np.unique(target, return_inverse=True)
+    return mapping, len(unique_targets)
+
+
+def _cell_repulsion(targets: np.ndarray, cx: np.ndarray, cy: np.ndarray, grid: int,
+                    mass: np.ndarray, sums: np.ndarray, k_squared: float,
+                    softening: float, far_only: bool, exclude_self: bool = False) -> np.ndarray:
+    """Sum the repulsion exerted by grid cells on a set of target points.
+
+    With ``far_only`` the targets interact with the children of their parent's
+    neighbourhood that are not adjacent to their own cell (the Barnes-Hut
+    interaction list); otherwise they interact with their own and adjacent cells.
+    """
+    forces = np.zeros_like(targets)
+    if far_only:
+        offsets = [(ox, oy) for ox in range(6) for oy in range(6)]
+        base_x, base_y = (cx // 2) * 2 - 2, (cy // 2) * 2 - 2
+    else:
+        offsets = [(ox, oy) for ox in (-1, 0, 1) for oy in (-1, 0, 1)]
+        base_x, base_y = cx, cy
+
+    for offset_x, offset_y in offsets:
+        tx, ty = base_x + offset_x, base_y + offset_y
+        valid = (tx >= 0) & (tx < grid) & (ty >= 0) & (ty < grid)
+        if far_only:
+            valid &= (np.abs(tx - cx) > 1) | (np.abs(ty - cy) > 1)
+        index = np.where(valid, tx * grid + ty, 0)
+        cell_mass = np.where(valid, mass[index], 0.0)
+        cell_sum = sums[index] * valid[:, None]
+        if exclude_self and offset_x == 0 and offset_y == 0:
+            cell_mass = cell_mass - 1.0
+            cell_sum = cell_sum - targets
+        populated = cell_mass > 0.5
+        delta = targets - cell_sum / np.where(populated, cell_mass, 1.0)[:, None]
+        dist_sq = (delta * delta).sum(axis=1) + softening
+        scale = np.where(populated, cell_mass * k_squared / dist_sq, 0.0)
+        forces += delta * scale[:, None]
+    return forces
+
+
+def _repulsive_forces(positions: np.ndarray, k: float) -> np.ndarray:
+    """Approximate all-pairs repulsion with a Barnes-Hut style grid hierarchy.
+
+    At each level the interaction list of a cell covers the children of its
+    parent's neighbourhood that are not adjacent to it, so every pair of nodes
+    is accounted for exactly once across levels. Coarse levels evaluate the
+    force once per occupied cell; the finest level evaluates it per node and
+    also adds the adjacent cells directly.
+    """
+    n = len(positions)
+    forces = np.zeros_like(positions)
+    if n < 2:
+        return forces
+
+    lower = positions.min(axis=0)
+    extent = max(float((positions.max(axis=0) - lower).max()), _EPSILON)
+    depth = int(np.clip(np.ceil(np.log(max(n, 16) / 4) / np.log(4)), 2, 11))
+    k_squared = k * k
+    softening = (0.01 * k) ** 2
+
+    for level in range(2, depth + 1):
+        grid = 2 ** level
+        cells = np.minimum(((positions - lower) / extent * grid).astype(np.int64), grid - 1)
+        flat = cells[:, 0] * grid + cells[:, 1]
+        mass = np.bincount(flat, minlength=grid * grid).astype(float)
+        sums = np.stack([
+            np.bincount(flat, weights=positions[:, 0], minlength=grid * grid),
+            np.bincount(flat, weights=positions[:, 1], minlength=grid * grid),
+        ], axis=1)
+
+        if level == depth:
+            forces += _cell_repulsion(positions, cells[:, 0], cells[:, 1], grid, mass, sums,
+                                      k_squared, softening, far_only=True)
+        else:
+            occupied = np.flatnonzero(mass)
+            centroids = sums[occupied] / mass[occupied, None]
+            cell_forces = np.zeros((grid * grid, 2))
+            cell_forces[occupied] = _cell_repulsion(centroids, occupied // grid, occupied % grid,
+                                                    grid, mass, sums, k_squared, softening,
+                                                    far_only=True)
+            forces += cell_forces[flat]
+
+        if level == depth:
+            forces += _cell_repulsion(positions, cells[:, 0], cells[:, 1], grid, mass, sums,
+                                      k_squared, softening, far_only=False, exclude_self=True)
+
+    return forces
+
+
+def _attractive_forces(positions: np.ndarray, src: np.ndarray, dst: np.ndarray,
+                       weights: np.ndarray, k: float) -> np.ndarray:
+    """Compute spring forces pulling connected nodes together."""
+    n = len(positions)
+    delta = positions[dst] - positions[src]
+    distance = np.sqrt((delta * delta).sum(axis=1)) + _EPSILON
+    magnitude = distance * weights / k
+    fx = delta[:, 0] * magnitude
+    fy = delta[:, 1] * magnitude
+    forces = np.empty_like(positions)
+    forces[:, 0] = np.bincount(src, weights=fx, minlength=n) - np.bincount(dst, weights=fx, minlength=n)
+    forces[:, 1] = np.bincount(src, weights=fy, minlength=n) - np.bincount(dst, weights=fy, minlength=n)
+    return forces
+
+
+def force_directed_layout(
+    src: np.ndarray,
+    dst: np.ndarray,
+    n: int,
+    weights: np.ndarray | None = None,
+    iterations: int = 50,
+    initial_positions: np.ndarray | None = None,
+    initial_temperature: float = 0.1,
+    seed: int = 42,
+) -> np.ndarray:
+    """Lay out a graph with a Fruchterman-Reingold style force model.
+
+    Args:
+        src (np.ndarray): Source node indices.
+        dst (np.ndarray): Target node indices.
+        n (int): Number of nodes.
+        weights (np.ndarray, optional): Edge weights. Defaults to 1 for every edge.
+        iterations (int): Number of force iterations.
+        initial_positions (np.ndarray, optional): Starting positions of shape (n, 2).
+        initial_temperature (float): Maximum step at the first iteration, relative
+            to the layout extent.
+        seed (int): Random seed for the initial placement.
+
+    Returns:
+        np.ndarray: Node positions of shape (n, 2).
+    """
+    rng = np.random.default_rng(seed)
+    if initial_positions is None:
+        positions = rng.random((n, 2))
+    else:
+        positions = np.array(initial_positions, dtype=float, copy=True)
+    if n < 2 or iterations <= 0:
+        return positions
+
+    if weights is None:
+        weights = np.ones(len(src))
+    src, dst, weights = _aggregate_edges(np.asarray(src), np.asarray(dst),
+                                         np.asarray(weights, dtype=float), n)
+    weights = np.log1p(weights)
+
+    k = 1.0 / np.sqrt(n)
+    extent = max(float((positions.max(axis=0) - positions.min(axis=0)).max()), k)
+    temperature = initial_temperature * extent
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        forces = _repulsive_forces(positions, k)
+        forces += _attractive_forces(positions, src, dst, weights, k)
+        # Weak gravity keeps disconnected components from drifting apart forever
+        forces -= (positions - positions.mean(axis=0)) * (0.05 / k)
+
+        length = np.sqrt((forces * forces).sum(axis=1)) + _EPSILON
+        step = np.minimum(length, temperature) / length
+        positions += forces * step[:, None]
+        temperature -= cooling
+
+    return positions
+
+
+def multilevel_layout(
+    src: np.ndarray,
+    dst: np.ndarray,
+    n: int,
+    weights: np.ndarray | None = None,
+    iterations: int = 50,
+    coarsest_size: int = 200,
+    initial_positions: np.ndarray | None = None,
+    seed: int = 42,
+) -> np.ndarray:
+    """Lay out a large graph by coarsening, solving and refining.
+
+    When ``initial_positions`` is given (for example from a layout cache) the
+    coarsening is skipped and the positions are only refined.
+
+    Args:
+        src (np.ndarray): Source node indices.
+        dst (np.ndarray): Target node indices.
+        n (int): Number of nodes.
+        weights (np.ndarray, optional): Edge weights.
+        iterations (int): Force iterations per level.
+        coarsest_size (int): Stop coarsening once the graph has this many nodes.
+        initial_positions (np.ndarray, optional): Positions to refine instead of
+            computing a layout from scratch.
+        seed (int): Random seed.
+
+    Returns:
+        np.ndarray: Node positions of shape (n, 2), normalised to the unit square.
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    weights = np.ones(len(src)) if weights is None else np.asarray(weights, dtype=float)
+
+    if initial_positions is not None:
+        positions = force_directed_layout(src, dst, n, weights, iterations=max(iterations // 2, 1),
+                                          initial_positions=initial_positions,
+                                          initial_temperature=0.02, seed=seed)
+        return normalize_positions(positions)
+
+    rng = np.random.default_rng(seed)
+    # Each level keeps its own edges and the mapping to the next coarser level
+    levels: list[tuple[np.ndarray, np.ndarray, np.ndarray, int, np.ndarray]] = []
+    level_src, level_dst, level_weights, level_n = src, dst, weights, n
+    while level_n > coarsest_size and len(levels) < 30:
+        mapping, coarse_n = coarsen_graph(level_src, level_dst, level_weights, level_n, rng)
+        if coarse_n > 0.95 * level_n:
+            break
+        levels.append((level_src, level_dst, level_weights, level_n, mapping))
+        level_src, level_dst, level_weights = _aggregate_edges(
+            mapping[level_src], mapping[level_dst], level_weights, coarse_n)
+        level_n = coarse_n
+
+    logger.info("Multilevel layout: %d levels, coarsest graph has %d nodes", len(levels) + 1, level_n)
+
+    positions = force_directed_layout(level_src, level_dst, level_n, level_weights,
+                                      iterations=iterations * 2, seed=seed)
+
+    for level_src, level_dst, level_weights, fine_n, mapping in reversed(levels):
+        k = 1.0 / np.sqrt(fine_n)
+        positions = positions[mapping] + rng.normal(scale=0.1 * k, size=(fine_n, 2))
+        positions = force_directed_layout(level_src, level_dst, fine_n, level_weights,
+                                          iterations=iterations, initial_positions=positions,
+                                          initial_temperature=0.05, seed=seed)
+
+    return normalize_positions(positions)
+
+
+def normalize_positions(positions: np.ndarray) -> np.ndarray:
+    """Scale positions into the unit square while preserving the aspect ratio."""
+    if len(positions) == 0:
+        return positions
+    lower = positions.min(axis=0)
+    extent = max(float((positions.max(axis=0) - lower).max()), _EPSILON)
+    return (positions - lower) / extent
+
+
+def graph_fingerprint(node_ids: Sequence[str], edge_count: int) -> str:
+    """Return a short fingerprint identifying a node set and edge count."""
+    import hashlib
+
+    digest = hashlib.blake2b(digest_size=16)
+    for node_id in node_ids:
+        digest.update(str(node_id).encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(str(edge_count).encode('ascii'))
+    return digest.hexdigest()
+
+
+def save_layout_cache(path: str, node_ids: Sequence[str], positions: np.ndarray,
+                      fingerprint: str = '') -> None:
+    """Save layout coordinates keyed by node ID to a compressed ``.npz`` file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    np.savez_compressed(
+        path,
+        node_ids=np.asarray([str(node_id) for node_id in node_ids]),
+        positions=np.asarray(positions, dtype=np.float32),
+        fingerprint=np.asarray(fingerprint),
+    )
+    logger.info("Saved layout cache for %d nodes to %s", len(node_ids), path)
+
+
+def load_layout_cache(path: str, node_ids: Sequence[str]) -> tuple[np.ndarray | None, float, str]:
+    """Load cached coordinates for the given nodes.
+
+    Nodes missing from the cache are placed next to a random cached node so the
+    layout can be refined instead of recomputed.
+
+    Args:
+        path (str): Path of the ``.npz`` cache file.
+        node_ids (Sequence[str]): Nodes of the graph being rendered, in index order.
+
+    Returns:
+        tuple: Positions of shape (n, 2) or ``None`` if there is no usable cache,
+        the fraction of nodes found in the cache, and the cached fingerprint.
+    """
+    if not os.path.exists(path):
+        return None, 0.0, ''
+
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            cached_ids = data['node_ids']
+            cached_positions = data['positions'].astype(float)
+            fingerprint = str(data['fingerprint'])
+    except Exception as e:
+        logger.warning("Could not read layout cache %s: %s", path, e)
+        return None, 0.0, ''
+
+    if len(cached_ids) == 0 or len(node_ids) == 0:
+        return None, 0.0, fingerprint
+
+    index = {node_id: i for i, node_id in enumerate(cached_ids.tolist())}
+    lookup = np.fromiter((index.get(str(node_id), -1) for node_id in node_ids),
+                         dtype=np.int64, count=len(node_ids))
+    found = lookup >= 0
+    coverage = float(found.mean())
+    if not found.any():
+        return None, 0.0, fingerprint
+
+    rng = np.random.default_rng(0)
+    anchors = rng.choice(np.flatnonzero(found), size=int((~found).sum()))
+    positions = np.empty((len(node_ids), 2))
+    positions[found] = cached_positions[lookup[found]]
+    positions[~found] = positions[anchors] + rng.normal(scale=0.01, size=(len(anchors), 2))
+    return positions, coverage, fingerprint
+
+
+def _to_pixels(positions: np.ndarray, width: int, height: int, margin: int) -> np.ndarray:
+    """Map positions to pixel coordinates, clipping far outliers to the frame."""
+    lower = np.percentile(positions, 0.5, axis=0)
+    upper = np.percentile(positions, 99.5, axis=0)
+    normalized = normalize_positions(np.clip(positions, lower, upper))
+    usable = min(width, height) - 2 * margin
+    offset = np.array([(width - usable) / 2, (height - usable) / 2])
+    return normalized * usable + offset
+
+
+def _accumulate_edges(
+    edge_layer: np.ndarray,
+    edge_density: np.ndarray,
+    p0: np.ndarray,
+    p1: np.ndarray,
+    samples: np.ndarray,
+    colors: np.ndarray,
+    width: int,
+    height: int,
+) -> None:
+    """Add the ink of a batch of edges, ``samples`` points each, to the pixel buffers."""
+    size = width * height
+    edge_index = np.repeat(np.arange(len(samples)), samples)
+    # Position of every sample along its edge, in [0, 1]
+    sample_offsets = np.arange(len(edge_index)) - np.repeat(np.cumsum(samples) - samples, samples)
+    t = (sample_offsets + 0.5) / samples[edge_index]
+    points = p0[edge_index] + (p1 - p0)[edge_index] * t[:, None]
+    px = np.clip(points[:, 0].astype(np.int64), 0, width - 1)
+    py = np.clip(points[:, 1].astype(np.int64), 0, height - 1)
+    flat = (height - 1 - py) * width + px
+    # Each edge contributes the same total ink regardless of its length
+    ink = 1.0 / samples[edge_index]
+    edge_density += np.bincount(flat, weights=ink, minlength=size)
+    for channel in range(3):
+        edge_layer[channel] += np.bincount(flat, weights=ink * colors[edge_index, channel], minlength=size)
+
+
+def rasterize_graph(
+    positions: np.ndarray,
+    src: np.ndarray,
+    dst: np.ndarray,
+    edge_colors: np.ndarray | None = None,
+    node_sizes: np.ndarray | None = None,
+    node_color: tuple[float, float, float] = (0.05, 0.05, 0.05),
+    width: int = 3000,
+    height: int = 3000,
+    margin: int = 40,
+    max_samples_per_edge: int = 256,
+    chunk_size: int = 200_000,
+    max_samples_per_batch: int = 2_000_000,
+) -> np.ndarray:
+    """Render a graph by accumulating edges and nodes into a pixel buffer.
+
+    Edges are sampled along their length and summed per pixel, so overlapping
+    edges build up density instead of overdrawing each other. The result is tone
+    mapped onto a white background.
+
+    Args:
+        positions (np.ndarray): Node positions of shape (n, 2).
+        src (np.ndarray): Source node indices.
+        dst (np.ndarray): Target node indices.
+        edge_colors (np.ndarray, optional): RGB color per edge, shape (m, 3).
+        node_sizes (np.ndarray, optional): Relative node size in [0, 1].
+        node_color (tuple): RGB color used for nodes.
+        width (int): Output width in pixels.
+        height (int): Output height in pixels.
+        margin (int): Blank border in pixels.
+        max_samples_per_edge (int): Upper bound on samples drawn along one edge.
+        chunk_size (int): Number of edges whose lengths are measured at once.
+        max_samples_per_batch (int): Upper bound on the samples drawn at once; long edges
+            split a chunk into several batches, which bounds the peak memory.
+
+    Returns:
+        np.ndarray: RGB image of shape (height, width, 3) with values in [0, 1].
+    """
+    n = len(positions)
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    if edge_colors is None:
+        edge_colors = np.tile(DEFAULT_EDGE_COLOR, (len(src), 1))
+
+    pixels = _to_pixels(positions, width, height, margin) if n else np.zeros((0, 2))
+    size = width * height
+    edge_layer = np.zeros((3, size))
+    edge_density = np.zeros(size)
+
+    for start in range(0, len(src), chunk_size):
+        chunk_src = src[start:start + chunk_size]
+        chunk_dst = dst[start:start + chunk_size]
+        colors = edge_colors[start:start + chunk_size]
+        p0, p1 = pixels[chunk_src], pixels[chunk_dst]
+        length = np.sqrt(((p1 - p0) ** 2).sum(axis=1))
+        samples = np.clip(np.ceil(length), 1, max_samples_per_edge).astype(np.int64)
+
+        # Cut the chunk where the running sample count passes the batch budget
+        ends = np.cumsum(samples)
+        batch_start = 0
+        while batch_start < len(samples):
+            drawn = ends[batch_start - 1] if batch_start else 0
+            batch_end = max(int(np.searchsorted(ends, drawn + max_samples_per_batch, side='right')), batch_start + 1)
+            batch = slice(batch_start, batch_end)
+            _accumulate_edges(edge_layer, edge_density, p0[batch], p1[batch], samples[batch], colors[batch],
+                              width, height)
+            batch_start = batch_end
+
+    image = np.ones((3, size))
+    covered = edge_density > 0
+    if covered.any():
+        reference = np.percentile(edge_density[covered], 99) or 1.0
+        alpha = 1.0 - np.exp(-2.0 * edge_density / reference)
+        mean_color = edge_layer / np.maximum(edge_density, _EPSILON)
+        image = image * (1.0 - alpha) + mean_color * alpha
+
+    if n:
+        if node_sizes is None:
+            node_sizes = np.zeros(n)
+        radius = np.rint(np.clip(node_sizes, 0.0, 1.0) * 4).astype(np.int64)
+        node_layer = np.zeros(size)
+        for r in np.unique(radius):
+            members = pixels[radius == r]
+            for ox in range(-r, r + 1):
+                for oy in range(-r, r + 1):
+                    if ox * ox + oy * oy > r * r:
+                        continue
+                    px = np.clip(members[:, 0].astype(np.int64) + ox, 0, width - 1)
+                    py = np.clip(members[:, 1].astype(np.int64) + oy, 0, height - 1)
+                    node_layer += np.bincount((height - 1 - py) * width + px, minlength=size)
+        node_alpha = 1.0 - np.exp(-0.8 * node_layer)
+        image = image * (1.0 - node_alpha) + np.asarray(node_color)[:, None] * node_alpha
+
+    return image.reshape(3, height, width).transpose(1, 2, 0)
@@ -3,6 +3,8 @@ import logging
 from pathlib import Path
 from typing import Iterable, List, Sequence, Set, Tuple
 
+from .compression import open_text, strip_compression
+
 logger = logging.getLogger(__name__)
 
 _HEADER: Sequence[str] = ["Channel ID", "Channel Name", "Channel Username"]
@@ -31,16 +33,27 @@ def _load_existing_records(path: Path) -> Tuple[List[List[str]], Set[Tuple[str,
 
 
 def _iter_new_rows(results_dir: Path) -> Iterable[List[str]]:
-    """Yield rows from all CSV files in the results directory."""
+    """Yield rows from all CSV files in the results directory, gzip or zstd compressed or not."""
 
     if not results_dir.exists():
         logger.warning("Results directory %s does not exist", results_dir)
         return
 
-    for csv_path in sorted(results_dir.glob("*.csv")):
-        with csv_path.open("r", newline="", encoding="utf-8") as file:
+    for csv_path in sorted(results_dir.glob("*.csv*")):
+        if not strip_compression(str(csv_path))[0].endswith(".csv"):
+            continue
+        try:
+            file = open_text(csv_path, "r")
+        except ImportError as e:
+            logger.warning("Skipping %s: %s", csv_path, e)
+            continue
+        with file:
             reader = csv.reader(file)
-            next(reader, None)  # Skip header
+            header = next(reader, None)
+            if header is not None and header != list(_HEADER):
+                # Other outputs (e.g. unexplored channels) share the results folder
+                logger.debug("Skipping %s: not a results file", csv_path)
+                continue
             for row in reader:
                 if row:
                     yield row
@@ -57,8 +70,7 @@ def merge_csv_files(results_folder: str, merged_folder: str, merged_filename: st
 
     records, seen = _load_existing_records(merged_path)
 
-    new_rows = list(_iter_new_rows(Path(results_folder)))
-    for row in new_rows:
+    for row in _iter_new_rows(Path(results_folder)):
         record = tuple(row)
         if record not in seen:
             seen.add(record)
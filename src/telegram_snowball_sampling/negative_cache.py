@@ -0,0 +1,180 @@
+"""Persistent cache of channels that could not be accessed.
+
+Private, banned and non-existent channels keep being rediscovered through
+forwards and recommendations. ``NegativeCache`` records each failure with its
+error type and time, and the frontier refuses to queue a cached channel until
+its retry-after period has passed, so dead channels cost no requests in later
+iterations or later runs. A channel that is reached again after its retry
+period is dropped from the cache. The cache is a small JSON file written
+atomically.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any
+
+from telethon.errors import (
+    ChannelBannedError,
+    ChannelInvalidError,
+    ChannelPrivateError,
+    ChannelPublicGroupNaError,
+    ChatForbiddenError,
+    UserBannedInChannelError,
+    UsernameInvalidError,
+    UsernameNotOccupiedError,
+)
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+
+# Seconds before a channel is tried again, per error type (None: never)
+DEFAULT_RETRY_AFTER: dict[str, float | None] = {
+    'private': 30 * DAY,
+    'banned': 30 * DAY,
+    'invalid': None,
+    'not_found': 7 * DAY,
+    'inaccessible': 7 * DAY,
+}
+
+
+def classify_error(error: BaseException) -> str | None:
+    """Return the cache error type of an exception, or None if it may be transient."""
+    if isinstance(error, (ChannelPrivateError, ChannelPublicGroupNaError, ChatForbiddenError)):
+        return 'private'
+    if isinstance(error, (ChannelBannedError, UserBannedInChannelError)):
+        return 'banned'
+    if isinstance(error, (ChannelInvalidError, UsernameInvalidError)):
+        return 'invalid'
+    if isinstance(error, UsernameNotOccupiedError):
+        return 'not_found'
+    if isinstance(error, ValueError) and error.__cause__ is not None:
+        # get_entity wraps the RPC error of a username lookup; other ValueErrors
+        # (e.g. an ID missing from the session) say nothing about the channel
+        return classify_error(error.__cause__)
+    return None
+
+
+class NegativeCache:
+    """Inaccessible channels keyed by canonical channel key.
+
+    Args:
+        path (str, optional): JSON file the cache is saved to; None keeps it in memory.
+        retry_after (dict, optional): Seconds before retrying each error type
+            (None: never). Missing types use ``DEFAULT_RETRY_AFTER``.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str | None = None, retry_after: dict[str, float | None] | None = None) -> None:
+        self.path = path
+        self.retry_after = {**DEFAULT_RETRY_AFTER, **(retry_after or {})}
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.hits = 0
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'NegativeCache':
+        """Load the cache at ``NEGATIVE_CACHE_FILE`` (or create an in-memory one if unset)."""
+        retry = config.NEGATIVE_CACHE_RETRY_DAYS * DAY
+        retry_after = {'private': retry, 'banned': retry}
+        if config.NEGATIVE_CACHE_FILE:
+            return cls.load(config.NEGATIVE_CACHE_FILE, retry_after)
+        return cls(retry_after=retry_after)
+
+    @classmethod
+    def load(cls, path: str, retry_after: dict[str, float | None] | None = None) -> 'NegativeCache':
+        """Load the cache saved at ``path``, or return an empty one if none can be read."""
+        cache = cls(path, retry_after)
+        if not os.path.exists(path):
+            return cache
+
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get('version') != cls.VERSION:
+                logger.warning("Ignoring negative cache %s with unsupported version", path)
+                return cache
+            cache.entries = data['channels']
+        except Exception as e:
+            logger.error("Error loading negative cache from %s: %s", path, e)
+            return cls(path, retry_after)
+
+        logger.info("Loaded %d inaccessible channels from %s", len(cache.entries), path)
+        return cache
+
+    def save(self) -> None:
+        """Write the cache atomically to its path, if it has one."""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': self.VERSION, 'channels': self.entries}, file, indent=2)
+        os.replace(temp_path, self.path)
+
+    def add(self, key: str, error: str | BaseException, name: str | None = None, now: float | None = None) -> bool:
+        """Record a failed channel.
+
+        Args:
+            key (str): Canonical channel key.
+            error (str or Exception): Error type or the exception raised.
+            name (str, optional): Channel name, kept for reference.
+            now (float, optional): Time of the failure. Defaults to now.
+
+        Returns:
+            bool: False if the exception looks transient and was not recorded.
+        """
+        error_type = error if isinstance(error, str) else classify_error(error)
+        if error_type is None:
+            return False
+
+        now = time.time() if now is None else now
+        retry_after = self.retry_after.get(error_type, DAY)
+        entry = {
+            'error': error_type,
+            'timestamp': now,
+            'retry_after': None if retry_after is None else now + retry_after,
+        }
+        name = name or self.entries.get(key, {}).get('name')
+        if name:
+            entry['name'] = name
+        self.entries[key] = entry
+        return True
+
+    def discard(self, *keys: str) -> None:
+        """Forget channels that turned out to be accessible."""
+        for key in keys:
+            self.entries.pop(key, None)
+
+    def _due(self, entry: dict[str, Any], now: float | None) -> bool:
+        retry_at = entry.get('retry_after')
+        return retry_at is not None and (time.time() if now is None else now) >= retry_at
+
+    def blocked(self, key: str, now: float | None = None) -> bool:
+        """Whether ``key`` is cached and not due for a retry; counts a hit if so."""
+        entry = self.entries.get(key)
+        if entry is None or self._due(entry, now):
+            return False
+        self.hits += 1
+        return True
+
+    def blocked_ids(self, now: float | None = None) -> list[str]:
+        """Channel IDs cached and not due for a retry, for cleaning up results files."""
+        return [key for key, entry in self.entries.items() if key.isdigit() and not self._due(entry, now)]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def summary(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for entry in self.entries.values():
+            counts[entry['error']] = counts.get(entry['error'], 0) + 1
+        return {'channels': len(self.entries), 'requests_avoided': self.hits, **counts}
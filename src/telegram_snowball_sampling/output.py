@@ -0,0 +1,280 @@
+"""Output service: one writer task per output file.
+
+The edge list is written from ``process_channels``, from ``process_urls`` and
+from the concurrent recommendation lookups. ``OutputService`` gives every
+output file (a "sink") a single writer coroutine fed by a queue: callers hand
+whole rows to ``SinkWriter.writerow``, which never blocks, and only the writer
+task touches the file. It writes rows in batches with ``writerows``, flushes
+after each batch, applies the fsync policy and starts a new file once the
+current one reaches the rotation size. Sinks whose path ends in ``.gz`` or
+``.zst`` are compressed as they are written (see ``compression``); these are
+only flushed when a flush is awaited, a fsync is due or the file is closed,
+since every flush ends a compression block.
+
+``OutputService.close`` is the flush-and-close handshake: it waits until every
+queued row is on disk and the files are closed. ``main()`` awaits it on normal
+exit, on errors and on Ctrl-C.
+
+Fsync policies:
+
+* ``never``: leave it to the operating system;
+* ``close``: fsync when a file is closed or rotated (default);
+* ``interval``: also fsync at most every ``fsync_interval`` seconds;
+* ``batch``: fsync after every batch.
+"""
+
+import asyncio
+import csv
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from .compression import COMPRESSIONS, compressed_path, compression_of, open_text, strip_compression
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ('never', 'close', 'interval', 'batch')
+
+_CLOSE = object()
+
+
+def rotated_path(path: str, number: int) -> str:
+    """Name of the ``number``-th full file rotated out of ``path``: ``Edge_List.001.csv(.gz)``."""
+    name, compression_suffix = strip_compression(path)
+    stem, suffix = os.path.splitext(name)
+    return f"{stem}.{number:03d}{suffix}{compression_suffix}"
+
+
+def rotated_parts(path: str) -> list[str]:
+    """The files rotated out of ``path``, oldest first, followed by ``path`` itself.
+
+    ``path`` is left out if it was rotated away and no row has been written since.
+    """
+    parts = []
+    while os.path.exists(rotated_path(path, len(parts) + 1)):
+        parts.append(rotated_path(path, len(parts) + 1))
+    if os.path.exists(path) or not parts:
+        parts.append(path)
+    return parts
+
+
+class SinkWriter:
+    """Queue-fed CSV writer owning one output file.
+
+    Create it through ``OutputService.open`` inside a running event loop.
+
+    Args:
+        path (str): CSV file, appended to; compressed if it ends in ``.gz`` or ``.zst``.
+        header (list[str], optional): Written at the top of every new or empty file.
+        batch_size (int): Most rows written per ``writerows`` call.
+        fsync (str): One of ``FSYNC_POLICIES``.
+        fsync_interval (float): Seconds between fsyncs with the ``interval`` policy.
+        rotate_bytes (int): Size on disk after which the file is rotated (0: never).
+        compression_level (int, optional): Level of a compressed file (None: the codec default).
+    """
+
+    def __init__(self, path: str, header: list[str] | None = None, batch_size: int = 500,
+                 fsync: str = 'close', fsync_interval: float = 5.0, rotate_bytes: int = 0,
+                 compression_level: int | None = None) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync!r}; expected one of {FSYNC_POLICIES}")
+        self.path = path
+        self.header = header
+        self.batch_size = max(1, batch_size)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.rotate_bytes = rotate_bytes
+        self.compressed = compression_of(path) != 'none'
+        self.compression_level = compression_level
+        self.rows = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._file = None
+        self._writer = None
+        self._last_fsync = time.monotonic()
+        self._closed = False
+        self._open()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    # Producer side
+    def writerow(self, row: Iterable[Any]) -> None:
+        """Queue a row; the writer task writes it with the next batch."""
+        if self._closed:
+            raise ValueError(f"Output {self.path} is closed")
+        self._queue.put_nowait(list(row))
+
+    def writerows(self, rows: Iterable[Iterable[Any]]) -> None:
+        for row in rows:
+            self.writerow(row)
+
+    async def flush(self) -> None:
+        """Wait until every row queued so far is written and flushed."""
+        done = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(done)
+        await done
+
+    async def close(self) -> None:
+        """Write the queued rows, then fsync (unless the policy is ``never``) and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put_nowait(_CLOSE)
+        await self._task
+
+    # Writer task
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            batch = []
+            markers = []
+            closing = False
+            while True:
+                if item is _CLOSE:
+                    closing = True
+                elif isinstance(item, asyncio.Future):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if closing or len(batch) >= self.batch_size or self._queue.empty():
+                    break
+                item = self._queue.get_nowait()
+
+            if batch:
+                await self._write(batch)
+            if markers and self.compressed and self._file is not None:
+                self._file.flush()
+            for marker in markers:
+                if not marker.done():
+                    marker.set_result(None)
+            if closing:
+                await self._close_file()
+                return
+
+    async def _write(self, batch: list[list[Any]]) -> None:
+        try:
+            self._writer.writerows(batch)
+            self.rows += len(batch)
+            self.batches += 1
+            now = time.monotonic()
+            if self.fsync == 'batch' or (self.fsync == 'interval' and now - self._last_fsync >= self.fsync_interval):
+                self._file.flush()
+                await asyncio.to_thread(self._fsync)
+                self._last_fsync = now
+            elif not self.compressed:
+                self._file.flush()
+            if self.rotate_bytes and os.path.getsize(self.path) >= self.rotate_bytes:
+                await self._rotate()
+        except Exception as e:
+            self.errors += 1
+            logger.error("Error writing %d rows to %s: %s", len(batch), self.path, e)
+            if Config.DEBUG:
+                import traceback
+                logger.error(traceback.format_exc())
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        empty = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open_text(self.path, 'a', self.compression_level)
+        self._writer = csv.writer(self._file)
+        if self.header and empty:
+            self._writer.writerow(self.header)
+
+    def _fsync(self) -> None:
+        # Compressed streams have no fileno of their own; sync the file by name
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    async def _close_file(self) -> None:
+        if self._file is None:
+            return
+        # Closing also writes the end of a gzip member or zstd frame
+        self._file.close()
+        self._file = None
+        if self.fsync != 'never':
+            await asyncio.to_thread(self._fsync)
+
+    async def _rotate(self) -> None:
+        await self._close_file()
+        number = 1
+        while os.path.exists(rotated_path(self.path, number)):
+            number += 1
+        os.replace(self.path, rotated_path(self.path, number))
+        self.rotations += 1
+        logger.info("Rotated %s to %s", self.path, rotated_path(self.path, number))
+        self._open()
+
+    def summary(self) -> dict[str, int]:
+        return {'rows': self.rows, 'batches': self.batches, 'rotations': self.rotations, 'errors': self.errors}
+
+
+class OutputService:
+    """Opens the output sinks of a run and closes them all in one handshake.
+
+    Args:
+        batch_size (int): Most rows per write.
+        fsync (str): Fsync policy, one of ``FSYNC_POLICIES``.
+        fsync_interval (float): Seconds between fsyncs with the ``interval`` policy.
+        rotate_mb (float): Size in MB after which a file is rotated (0: never).
+        compression (str): "none", "gzip" or "zstd"; its suffix is added to the paths passed to ``open``.
+        compression_level (int): Compression level (0: the codec default).
+    """
+
+    def __init__(self, batch_size: int = 500, fsync: str = 'close', fsync_interval: float = 5.0,
+                 rotate_mb: float = 0, compression: str = 'none', compression_level: int = 0) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}")
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.rotate_bytes = int(rotate_mb * 1024 * 1024)
+        self.compression = compression
+        self.compression_level = compression_level or None
+        self.sinks: dict[str, SinkWriter] = {}
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'OutputService':
+        """Create the service configured by the ``OUTPUT_*`` settings of ``Config``."""
+        return cls(config.OUTPUT_BATCH_SIZE, config.OUTPUT_FSYNC, config.OUTPUT_FSYNC_INTERVAL,
+                   config.OUTPUT_ROTATE_MB, config.OUTPUT_COMPRESSION, config.OUTPUT_COMPRESSION_LEVEL)
+
+    def path(self, path: str | Path) -> str:
+        """Return ``path`` with the suffix of the configured compression."""
+        return compressed_path(str(path), self.compression)
+
+    def open(self, path: str | Path, header: list[str] | None = None, rotate: bool = True) -> SinkWriter:
+        """Return the writer of ``path`` (with the compression suffix added), starting it on first use."""
+        path = self.path(path)
+        key = os.path.abspath(path)
+        sink = self.sinks.get(key)
+        if sink is None:
+            sink = SinkWriter(path, header, self.batch_size, self.fsync, self.fsync_interval,
+                              self.rotate_bytes if rotate else 0, self.compression_level)
+            self.sinks[key] = sink
+        return sink
+
+    async def flush(self) -> None:
+        """Wait until every sink has written the rows queued so far."""
+        await asyncio.gather(*(sink.flush() for sink in self.sinks.values()))
+
+    async def close(self) -> None:
+        """Write all queued rows and close every sink."""
+        await asyncio.gather(*(sink.close() for sink in self.sinks.values()))
+        for sink in self.sinks.values():
+            logger.info("Closed %s: %s", sink.path, sink.summary())
+
+    async def __aenter__(self) -> 'OutputService':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
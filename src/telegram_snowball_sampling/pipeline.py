@@ -0,0 +1,192 @@
+"""Staged processing of a channel's messages.
+
+Reading a channel used to fetch a message, inspect it, resolve the forwarded
+channel and write the CSV rows one after the other, so every network wait held
+up parsing and every file write held up fetching. ``Pipeline`` runs these steps
+as concurrent stages joined by bounded ``asyncio`` queues: a producer that
+prefetches messages, then handler stages such as parse, resolve and write.
+Each stage handles its items in order. A full queue makes the stage feeding it
+wait, so a slow stage throttles the ones before it instead of buffering
+without bound.
+
+The producer only reads ahead up to the next point where a stage may stop the
+scan (see ``ChannelScan.checkpoint``), so prefetching never fetches a page of
+history a serial scan would not have fetched. ``Pipeline.summary`` reports, per
+stage, the items handled, their throughput while busy and the depth of the
+queue feeding the stage.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterable, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Returned by a stage handler to stop reading further input; queued items downstream are still handled
+STOP = object()
+
+_DONE = object()
+
+Emit = Callable[[Any], Awaitable[None]]
+Handler = Callable[[Any, Emit], Awaitable[Any]]
+
+
+class StageStats:
+    """Counters of one pipeline stage."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.max_depth = 0
+        self.depth_total = 0
+
+    def record(self, seconds: float, depth: int) -> None:
+        self.items += 1
+        self.busy += seconds
+        self.max_depth = max(self.max_depth, depth)
+        self.depth_total += depth
+
+    def summary(self) -> dict[str, float]:
+        return {
+            'items': self.items,
+            'per_second': round(self.items / self.busy, 1) if self.busy else 0.0,
+            'mean_queue': round(self.depth_total / self.items, 1) if self.items else 0.0,
+            'max_queue': self.max_depth,
+        }
+
+
+class Pipeline:
+    """Runs a message source through handler stages joined by bounded queues.
+
+    Statistics accumulate over every ``run``, so one pipeline can serve a whole crawl.
+
+    Args:
+        queue_size (int): Capacity of each queue between stages.
+        source_name (str): Name of the producer stage in the statistics.
+    """
+
+    def __init__(self, queue_size: int = 100, source_name: str = 'fetch') -> None:
+        self.queue_size = max(1, queue_size)
+        self.source_name = source_name
+        self.stats: dict[str, StageStats] = {source_name: StageStats(source_name)}
+
+    async def run(
+        self,
+        source: AsyncIterable[Any],
+        stages: list[tuple[str, Handler]],
+        read_ahead: Callable[[], int | None] | None = None,
+    ) -> None:
+        """Feed every item of ``source`` through ``stages`` and wait until all are handled.
+
+        Args:
+            source: Async iterable of input items, e.g. ``client.iter_messages(...)``.
+            stages: ``(name, handler)`` pairs. A handler is called as ``await handler(item, emit)``
+                for each input item in order; ``await emit(output)`` passes an output to the next
+                stage (waiting while its queue is full). Returning ``STOP`` ends the input: the
+                producer and earlier stages are cancelled, later stages finish their queues.
+            read_ahead: Returns how many source items may be read in total before the first
+                stage has to catch up (None: no limit).
+
+        Raises:
+            Exception: The first error raised by the source or a handler. An error of the source
+                is raised once the items read before it have been handled.
+        """
+        for name, _ in stages:
+            self.stats.setdefault(name, StageStats(name))
+        queues = [asyncio.Queue(self.queue_size) for _ in stages]
+        source_error: list[BaseException] = []
+        tasks: list[asyncio.Task] = []
+
+        def stop_upstream(index: int) -> None:
+            for task in tasks[:index + 1]:
+                task.cancel()
+
+        tasks.append(asyncio.ensure_future(self._produce(source, queues[0], read_ahead, source_error)))
+        for index, (name, handler) in enumerate(stages):
+            output = queues[index + 1] if index + 1 < len(queues) else None
+            tasks.append(asyncio.ensure_future(
+                self._consume(index, name, handler, queues[index], output, stop_upstream)))
+
+        try:
+            await self._wait(tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        if source_error:
+            raise source_error[0]
+
+    @staticmethod
+    async def _wait(tasks: list[asyncio.Task]) -> None:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+
+    async def _produce(self, source: AsyncIterable[Any], queue: asyncio.Queue,
+                       read_ahead: Callable[[], int | None] | None, error: list[BaseException]) -> None:
+        stats = self.stats[self.source_name]
+        iterator = source.__aiter__()
+        count = 0
+        try:
+            while True:
+                limit = read_ahead() if read_ahead is not None else None
+                if limit is not None and count >= limit:
+                    # Let the first stage catch up; it may stop the scan or move the limit
+                    await queue.join()
+                    limit = read_ahead()
+                    if limit is not None and count >= limit:
+                        break
+
+                started = time.perf_counter()
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                stats.record(time.perf_counter() - started, queue.qsize())
+                count += 1
+                await queue.put(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error.append(e)
+        finally:
+            aclose = getattr(iterator, 'aclose', None)
+            if aclose is not None:
+                try:
+                    await aclose()
+                except Exception:
+                    pass
+        await queue.put(_DONE)
+
+    async def _consume(self, index: int, name: str, handler: Handler, queue: asyncio.Queue,
+                       output: asyncio.Queue | None, stop_upstream: Callable[[int], None]) -> None:
+        stats = self.stats[name]
+        emit = output.put if output is not None else _discard
+        while True:
+            depth = queue.qsize()
+            item = await queue.get()
+            if item is _DONE:
+                queue.task_done()
+                break
+            started = time.perf_counter()
+            result = await handler(item, emit)
+            stats.record(time.perf_counter() - started, depth)
+            if result is STOP:
+                stop_upstream(index)
+                queue.task_done()
+                break
+            queue.task_done()
+        if output is not None:
+            await output.put(_DONE)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Items, busy throughput and feeding queue depth of every stage."""
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+
+async def _discard(item: Any) -> None:
+    pass
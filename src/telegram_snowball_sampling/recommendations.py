@@ -1,13 +1,18 @@
 import logging
 import asyncio
-import re
 from typing import Any
 
 from telethon.errors import FloodWaitError
 from telethon.tl.functions.channels import GetChannelRecommendationsRequest
+from telethon.tl.types import Channel, PeerChannel
 
+from .budget import BudgetExhausted
 from .config import Config
+from .date_window import DateWindow
 from .edge_list import create_edge_list
+from .extraction import ExtractionExecutor
+from .identity import ChannelRegistry
+from .urls import UrlAggregator, extract_urls, message_payload
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +25,8 @@ async def get_channel_recommendations(
     max_depth: int = 2,
     processed_channels: set | None = None,
     edge_list_writer: Any | None = None,
+    discovered: dict | None = None,
+    registry: ChannelRegistry | None = None,
 ) -> set:
     """Recursively fetch Telegram channel recommendations starting from a given channel.
 
@@ -31,6 +38,10 @@ async def get_channel_recommendations(
         max_depth (int): Maximum recursion depth.
         processed_channels (set, optional): Set of processed channel usernames/IDs.
         edge_list_writer (csv.writer or TextIO, optional): Writer for edge list entries.
+        discovered (dict, optional): Filled with the channel ID (or None) and the
+            recommendation depth (1 for direct recommendations) of each new identifier.
+        registry (ChannelRegistry, optional): Records every recommended entity, so the
+            returned identifiers can be turned back into entities without a request.
 
     Returns:
         set: Newly discovered channel entities.
@@ -92,10 +103,14 @@ async def get_channel_recommendations(
                         continue
 
                     channel_identifier = username if username else channel_id
+                    if registry is not None:
+                        registry.register(recommended_channel)
 
                     if channel_identifier not in processed_channels:
                         processed_channels.add(channel_identifier)
                         new_channels.add(channel_identifier)
+                        if discovered is not None:
+                            discovered[channel_identifier] = (channel_id, depth + 1)
 
                         logger.info(f"Depth {depth}: Recommendation - Title: {title}, Username: @{username}")
 
@@ -123,7 +138,9 @@ async def get_channel_recommendations(
                                     depth + 1,
                                     max_depth,
                                     processed_channels,
-                                    edge_list_writer
+                                    edge_list_writer,
+                                    discovered,
+                                    registry,
                                 )
                             )
                 except Exception as ex:
@@ -136,13 +153,16 @@ async def get_channel_recommendations(
             for result in results:
                 new_channels.update(result)
 
+    except BudgetExhausted:
+        raise
+
     except FloodWaitError as e:
         logger.warning(f"Flood wait error for channel {current_channel_username}. Sleeping for {e.seconds} seconds.")
         await asyncio.sleep(e.seconds)
         # Retry after the wait period
         additional_channels = await get_channel_recommendations(
             client, channel_entity, initial_channel, depth, max_depth,
-            processed_channels, edge_list_writer
+            processed_channels, edge_list_writer, discovered, registry
         )
         new_channels.update(additional_channels)
 
@@ -156,10 +176,30 @@ async def get_channel_recommendations(
 
 
 async def extract_urls_from_message(message):
-    """Extract all URLs from a message."""
-    if message and message.message:
-        return re.findall(r'(https?://\S+)', message.message)
-    return []
+    """Extract all URLs from a message, including hyperlink targets."""
+    return extract_urls(message)
+
+
+async def _resolve_linked_channel(client, reference: str, resolved_channels: dict,
+                                  registry: ChannelRegistry | None = None):
+    """Resolve a username or ID from a t.me link once per run; None if it is not a channel."""
+    if reference not in resolved_channels:
+        known = registry.cached(reference) if registry is not None else None
+        if known is not None:
+            resolved_channels[reference] = known
+            return known
+        try:
+            target = PeerChannel(int(reference)) if reference.isdigit() else reference
+            entity = await client.get_entity(target)
+            resolved_channels[reference] = entity if isinstance(entity, Channel) else None
+            if registry is not None and isinstance(entity, Channel):
+                registry.register(entity, reference)
+        except BudgetExhausted:
+            raise
+        except Exception as e:
+            logger.debug("Could not resolve linked channel %s: %s", reference, e)
+            resolved_channels[reference] = None
+    return resolved_channels[reference]
 
 
 async def process_urls(
@@ -167,17 +207,32 @@ async def process_urls(
     channel_entity,
     edge_list_writer: Any,
     url_file: Any | None = None,
+    resolved_channels: dict | None = None,
+    date_window: DateWindow | None = None,
+    registry: ChannelRegistry | None = None,
+    extractor: ExtractionExecutor | None = None,
 ) -> set:
     """Process messages in a channel to extract and log outbound URLs.
 
+    URLs are canonicalized and aggregated before anything is written: each
+    linked domain becomes a single ``outbound_link`` edge and each linked
+    Telegram channel a ``telegram_link`` edge, weighted by the number of links.
+
     Args:
         client (TelegramClient): The initialized Telegram client.
         channel_entity (str/Channel): The channel entity to process.
         edge_list_writer (csv.writer or TextIO): Writer for edge list entries.
-        url_file (file, optional): Open file handle to write URLs to.
+        url_file (UrlStore or file, optional): Store for the canonical URLs.
+        resolved_channels (dict, optional): Cache of t.me usernames already resolved
+            during this run, shared between channels.
+        date_window (DateWindow, optional): Only read messages from this period.
+        registry (ChannelRegistry, optional): Known channels; linked channels it already
+            knows are not requested again.
+        extractor (ExtractionExecutor, optional): Pool extracting the URLs of batches of
+            messages while the next ones are fetched. Defaults to inline extraction.
 
     Returns:
-        set: Set of extracted URLs.
+        set: Set of canonical URLs.
     """
     # Extract channel attributes safely
     try:
@@ -202,33 +257,67 @@ async def process_urls(
         current_channel_title = str(channel_entity)
         current_channel_username = str(channel_entity)
 
-    url_set = set()
+    if resolved_channels is None:
+        resolved_channels = {}
+    date_window = date_window or DateWindow()
+    aggregator = UrlAggregator()
+    extractor = extractor or ExtractionExecutor()
+
+    async def payloads():
+        async for message in client.iter_messages(channel_entity, limit=Config.DEFAULT_MAX_POSTS,
+                                                  **date_window.iter_kwargs()):
+            if date_window.before_start(message):
+                break
+            payload = message_payload(message)
+            if payload is not None:
+                yield payload
 
     try:
-        async for message in client.iter_messages(channel_entity, limit=Config.DEFAULT_MAX_POSTS):
-            urls = await extract_urls_from_message(message)
-
+        # URLs come back in message order, whichever worker extracted them
+        async for urls in extractor.extract(payloads()):
             for url in urls:
-                url_set.add(url)
-
-                # Write to edge list if writer exists and IDs are valid
-                if edge_list_writer and current_channel_id:
-                    # For URLs, use the URL as the target ID and "External URL" as the target name
-                    create_edge_list(
-                        edge_list_writer,
-                        current_channel_id,
-                        current_channel_title,
-                        current_channel_username,
-                        url,  # URL as ID
-                        "External URL",  # Generic name
-                        None,  # No username for external URLs
-                        connection_type="outbound_link",
-                    )
-
-                # Write to URL file if provided
+                canonical = aggregator.add_classified(*url)
+
+                # Write to URL store if provided
                 if url_file:
-                    url_file.write(f"{url}\n")
-                    url_file.flush()
+                    if hasattr(url_file, 'add'):
+                        url_file.add(canonical)
+                    else:
+                        url_file.write(f"{canonical}\n")
+
+        # Write aggregated edges if writer exists and IDs are valid
+        if edge_list_writer and current_channel_id:
+            for domain, count in aggregator.domains.items():
+                create_edge_list(
+                    edge_list_writer,
+                    current_channel_id,
+                    current_channel_title,
+                    current_channel_username,
+                    domain,  # Domain as ID
+                    domain,
+                    None,  # No username for external websites
+                    connection_type="outbound_link",
+                    weight=count,
+                )
+
+            for reference, count in aggregator.telegram_channels.items():
+                linked = await _resolve_linked_channel(client, reference, resolved_channels, registry)
+                if linked is None or str(linked.id) == current_channel_id:
+                    continue
+                create_edge_list(
+                    edge_list_writer,
+                    current_channel_id,
+                    current_channel_title,
+                    current_channel_username,
+                    str(linked.id),
+                    getattr(linked, 'title', None),
+                    getattr(linked, 'username', None),
+                    connection_type="telegram_link",
+                    weight=count,
+                )
+
+    except BudgetExhausted:
+        raise
 
     except Exception as e:
         logger.error(f"Error processing URLs for channel {current_channel_username}: {e}")
@@ -236,4 +325,4 @@ async def process_urls(
             import traceback
             logger.error(traceback.format_exc())
 
-    return url_set
+    return aggregator.canonical_urls
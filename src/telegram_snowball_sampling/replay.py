@@ -0,0 +1,234 @@
+"""Offline replay of a crawl from a message archive.
+
+``ArchiveRecorder`` wraps the Telegram client during a crawl and stores every
+channel entity and recommendation list it sees in the ``MessageArchive`` (the
+messages themselves are archived by ``process_channels``).
+
+``ReplayClient`` serves the same calls from the archive: ``get_entity``,
+``iter_messages`` and the raw requests the crawler makes
+(``GetChannelRecommendationsRequest``, ``GetChannelsRequest`` and
+``ResolveUsernameRequest``). Passed to ``process_channels`` in place of a
+``TelegramClient`` it re-runs the snowball sampler at disk speed, without rate
+limits, so parameters like ``min_mentions`` or the number of iterations can be
+tuned without contacting Telegram. Channels whose history was never archived
+simply yield no messages; they are counted in ``missing_channels``.
+"""
+
+import datetime
+import logging
+from typing import Any, AsyncIterator
+
+from telethon import helpers
+from telethon.tl import types
+from telethon.tl.functions.channels import GetChannelRecommendationsRequest, GetChannelsRequest
+from telethon.tl.functions.contacts import ResolveUsernameRequest
+
+from .archive import MessageArchive
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _parse_date(value: str | None) -> datetime.datetime | None:
+    return datetime.datetime.fromisoformat(value) if value else None
+
+
+def _request_channel_id(request: Any) -> int | None:
+    channel = getattr(request, 'channel', None)
+    for attribute in ('channel_id', 'id'):
+        value = getattr(channel, attribute, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+class ArchiveRecorder:
+    """Client proxy recording channel entities and recommendations into an archive.
+
+    Args:
+        client (TelegramClient): The client to wrap.
+        archive (MessageArchive): Archive receiving the entities and recommendations.
+    """
+
+    def __init__(self, client: Any, archive: MessageArchive) -> None:
+        self._client = client
+        self.archive = archive
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    async def get_entity(self, entity: Any, *args, **kwargs) -> Any:
+        result = await self._client.get_entity(entity, *args, **kwargs)
+        self.archive.add_channel(result)
+        return result
+
+    async def __call__(self, request: Any, *args, **kwargs) -> Any:
+        result = await self._client(request, *args, **kwargs)
+        chats = [chat for chat in getattr(result, 'chats', None) or [] if isinstance(chat, types.Channel)]
+        channel_id = _request_channel_id(request)
+        if isinstance(request, GetChannelRecommendationsRequest) and channel_id is not None:
+            self.archive.add_recommendations(channel_id, chats)
+        else:
+            for chat in chats:
+                self.archive.add_channel(chat)
+        return result
+
+
+class ArchivedMessage:
+    """Read-only stand-in for a Telethon ``Message`` rebuilt from an archive record."""
+
+    def __init__(self, record: dict[str, Any], replay: 'ReplayClient') -> None:
+        self.id = record['id']
+        self.date = _parse_date(record.get('date'))
+        self.message = record.get('text') or ''
+        self.grouped_id = record.get('grouped_id')
+        entities = (replay.message_entity(entity) for entity in record.get('entities') or [])
+        self.entities = [entity for entity in entities if entity is not None] or None
+        self.fwd_from = None
+        self.forward = None
+
+        forward = record.get('forward')
+        if forward:
+            self.fwd_from = types.MessageFwdHeader(
+                date=_parse_date(forward.get('date')) or _EPOCH,
+                from_id=types.PeerChannel(forward['from_id']) if forward.get('from_id') else None,
+                from_name=forward.get('from_name'),
+                channel_post=forward.get('channel_post'),
+            )
+            chat = forward.get('chat')
+            self.forward = _Forward(replay.channel_entity(chat['id'], chat) if chat else None)
+
+    @property
+    def text(self) -> str:
+        return self.message
+
+    def get_entities_text(self) -> list[tuple[Any, str]]:
+        text = helpers.add_surrogate(self.message)
+        return [(entity, helpers.del_surrogate(text[entity.offset:entity.offset + entity.length]))
+                for entity in self.entities or []]
+
+
+class _Forward:
+    def __init__(self, chat: Any) -> None:
+        self.chat = chat
+
+
+class ReplayClient:
+    """Drop-in replacement for ``TelegramClient`` serving calls from a ``MessageArchive``.
+
+    Args:
+        archive (MessageArchive): Archive recorded during an earlier crawl.
+    """
+
+    session = None
+
+    def __init__(self, archive: MessageArchive) -> None:
+        self.archive = archive
+        self.missing_channels: set[int] = set()
+        self.messages_served = 0
+        self._entities: dict[int, types.Channel] = {}
+
+    def channel_entity(self, channel_id: int, fallback: dict[str, Any] | None = None) -> types.Channel | None:
+        """Build a ``Channel`` from archived metadata (or ``fallback``), cached per ID."""
+        entity = self._entities.get(channel_id)
+        if entity is None:
+            meta = self.archive.channel(channel_id) or fallback
+            if meta is None:
+                return None
+            entity = types.Channel(
+                id=channel_id,
+                title=meta.get('title') or '',
+                photo=types.ChatPhotoEmpty(),
+                date=_EPOCH,
+                username=meta.get('username'),
+                broadcast=meta.get('broadcast', True),
+                megagroup=meta.get('megagroup', False),
+                access_hash=0,
+            )
+            self._entities[channel_id] = entity
+        return entity
+
+    @staticmethod
+    def message_entity(entity: dict[str, Any]) -> Any | None:
+        """Rebuild a Telethon message entity (URL entities keep their target)."""
+        kind = getattr(types, entity.get('type', ''), None)
+        if kind is None:
+            return None
+        try:
+            if 'url' in entity:
+                return kind(offset=entity['offset'], length=entity['length'], url=entity['url'])
+            return kind(offset=entity['offset'], length=entity['length'])
+        except TypeError:
+            # Entity types with further required fields are not needed offline
+            return None
+
+    def _resolve(self, reference: Any) -> types.Channel:
+        channel_id = None
+        for attribute in ('channel_id', 'id'):
+            value = getattr(reference, attribute, None)
+            if isinstance(value, int):
+                channel_id = value
+                break
+        else:
+            if isinstance(reference, int):
+                channel_id = reference
+            elif isinstance(reference, str):
+                text = reference.strip()
+                if text.lstrip('-').isdigit():
+                    channel_id = int(text)
+                else:
+                    meta = self.archive.channel(text.rstrip('/').rsplit('/', 1)[-1])
+                    channel_id = meta['id'] if meta else None
+
+        entity = self.channel_entity(channel_id) if channel_id is not None else None
+        if entity is None:
+            raise ValueError(f'No archived channel matches "{reference}"')
+        return entity
+
+    async def get_entity(self, entity: Any, *args, **kwargs) -> types.Channel:
+        return self._resolve(entity)
+
+    async def iter_messages(self, entity: Any, limit: int | None = None, offset_date: datetime.datetime | None = None,
+                            offset_id: int = 0, **kwargs) -> AsyncIterator[ArchivedMessage]:
+        """Yield archived messages newest first, honouring ``limit``, ``offset_date`` and ``offset_id``."""
+        channel = self._resolve(entity)
+        if channel.id not in self.archive:
+            self.missing_channels.add(channel.id)
+            return
+
+        count = 0
+        for record in self.archive.iter_channel(channel.id):
+            if limit is not None and count >= limit:
+                return
+            if offset_id and record['id'] >= offset_id:
+                continue
+            message = ArchivedMessage(record, self)
+            if offset_date is not None and message.date is not None and message.date >= offset_date:
+                continue
+            count += 1
+            self.messages_served += 1
+            yield message
+
+    async def __call__(self, request: Any, *args, **kwargs) -> Any:
+        if isinstance(request, GetChannelRecommendationsRequest):
+            recommended = self.archive.recommendations(self._resolve(request.channel).id) or []
+            chats = [self.channel_entity(channel_id) for channel_id in recommended]
+            return types.messages.Chats(chats=[chat for chat in chats if chat is not None])
+        if isinstance(request, GetChannelsRequest):
+            chats = [self.channel_entity(getattr(channel, 'channel_id', None)) for channel in request.id]
+            return types.messages.Chats(chats=[chat for chat in chats if chat is not None])
+        if isinstance(request, ResolveUsernameRequest):
+            channel = self._resolve(request.username)
+            return types.contacts.ResolvedPeer(peer=types.PeerChannel(channel.id), chats=[channel], users=[])
+        raise NotImplementedError(f"{type(request).__name__} is not available offline")
+
+    async def disconnect(self) -> None:
+        pass
+
+    def summary(self) -> dict[str, int]:
+        return {
+            'archived_channels': len(self.archive.channels()),
+            'messages_served': self.messages_served,
+            'missing_channels': len(self.missing_channels),
+        }
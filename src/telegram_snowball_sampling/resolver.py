@@ -0,0 +1,225 @@
+"""Bulk resolution of queued channels into Telegram entities.
+
+Resolving every queued channel with its own ``get_entity`` call costs one
+request per channel. ``EntityResolver`` resolves the whole frontier at once:
+channel IDs whose access hash is known to the session are fetched with
+``GetChannelsRequest`` in chunks of up to 100, and usernames are resolved in
+concurrent batches. Channels that are already processed are dropped before any
+request is made. Anything the bulk path cannot resolve is left in the frontier
+unchanged and resolved individually when it is scanned.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from telethon import utils
+from telethon.errors import RPCError
+from telethon.tl.functions.channels import GetChannelsRequest
+from telethon.tl.functions.contacts import ResolveUsernameRequest
+from telethon.tl.types import Channel, ChannelForbidden, PeerChannel
+
+from .budget import BudgetExhausted
+from .config import Config
+from .frontier import Frontier, channel_key
+from .identity import ChannelRegistry
+from .negative_cache import NegativeCache, classify_error
+
+logger = logging.getLogger(__name__)
+
+# Largest number of channels Telegram returns for one GetChannelsRequest
+CHANNELS_PER_REQUEST = 100
+
+
+class EntityResolver:
+    """Resolves frontier items to ``Channel`` entities with as few requests as possible.
+
+    Args:
+        client (TelegramClient): The initialized Telegram client.
+        chunk_size (int): Channel IDs per ``GetChannelsRequest``.
+        username_concurrency (int): Usernames resolved concurrently.
+        registry (ChannelRegistry, optional): Identity registry; channels it already
+            knows are not requested again and every resolved channel is registered.
+        negative_cache (NegativeCache, optional): Records channels found inaccessible.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        chunk_size: int = CHANNELS_PER_REQUEST,
+        username_concurrency: int = 10,
+        registry: ChannelRegistry | None = None,
+        negative_cache: NegativeCache | None = None,
+    ) -> None:
+        self.client = client
+        self.registry = registry
+        self.negative_cache = negative_cache
+        self.chunk_size = max(1, min(chunk_size, CHANNELS_PER_REQUEST))
+        self.username_concurrency = max(1, username_concurrency)
+        self.attempted: set[str] = set()  # Keys never sent to the bulk path twice
+        self.errors: dict[str, BaseException] = {}  # Lookup errors that say the channel is gone
+
+        self.requests = 0
+        self.resolved = 0
+        self.inaccessible = 0
+        self.skipped_processed = 0
+
+    async def resolve(self, items: list[Any]) -> dict[str, Channel | None]:
+        """Resolve channel entities, peers, IDs and usernames in bulk.
+
+        Args:
+            items (list): Frontier items to resolve.
+
+        Returns:
+            dict: Entity (or None if the channel is inaccessible or does not exist)
+            keyed by ``channel_key`` of each item. Items that could not be resolved
+            in bulk are missing from the result.
+        """
+        results: dict[str, Channel | None] = {}
+        input_channels, usernames = {}, {}
+
+        for item in items:
+            key = channel_key(item)
+            if isinstance(item, Channel):
+                results[key] = item
+                continue
+            known = self.registry.cached(item) if self.registry is not None else None
+            if known is not None:
+                results[key] = known
+            elif key in self.attempted:
+                continue
+            elif key.isdigit():
+                input_channel = self._cached_input_channel(int(key))
+                if input_channel is not None:
+                    input_channels[key] = input_channel
+            else:
+                username, is_invite = utils.parse_username(key)
+                if username and not is_invite:
+                    usernames[key] = username
+            self.attempted.add(key)
+
+        keys = list(input_channels)
+        for start in range(0, len(keys), self.chunk_size):
+            chunk = keys[start:start + self.chunk_size]
+            results.update(await self._get_channels(chunk, [input_channels[key] for key in chunk]))
+
+        names = list(usernames)
+        for start in range(0, len(names), self.username_concurrency):
+            batch = names[start:start + self.username_concurrency]
+            entities = await asyncio.gather(*(self._resolve_username(usernames[key]) for key in batch),
+                                            return_exceptions=True)
+            for key, entity in zip(batch, entities):
+                if isinstance(entity, BudgetExhausted):
+                    raise entity
+                if isinstance(entity, BaseException):
+                    if classify_error(entity) is None:
+                        # Possibly transient: left for the individual lookup when the channel is scanned
+                        logger.debug("Could not resolve @%s in bulk: %s", key, entity)
+                        continue
+                    self.errors[key] = entity
+                    entity = None
+                results[key] = entity
+
+        for key, entity in results.items():
+            if entity is None:
+                self.inaccessible += 1
+            else:
+                self.resolved += 1
+                if self.registry is not None:
+                    self.registry.register(entity, key)
+                if self.negative_cache is not None:
+                    self.negative_cache.discard(key, str(entity.id))
+        return results
+
+    async def resolve_frontier(self, frontier: Frontier, processed_ids: set[int]) -> None:
+        """Drop processed channels from the frontier and resolve the rest in place.
+
+        Args:
+            frontier (Frontier): Queued channels; resolved items are replaced by their entities.
+            processed_ids (set): IDs of the channels already scanned.
+        """
+        for entry in frontier.entries():
+            if entry.key.isdigit() and int(entry.key) in processed_ids:
+                frontier.remove(entry.key)
+                self.skipped_processed += 1
+
+        pending = [entry for entry in frontier.entries() if not isinstance(entry.item, Channel)]
+        if not pending:
+            return
+
+        entities = await self.resolve([entry.item for entry in pending])
+        for entry in pending:
+            item_key = channel_key(entry.item)
+            if item_key not in entities:
+                continue
+            entity = entities[item_key]
+            if entity is None:
+                logger.warning(f"Cannot access channel: {entry.item}")
+                frontier.remove(entry.key)
+                if self.negative_cache is not None:
+                    # The lookup error if there was one, otherwise the channel is forbidden or not a channel
+                    self.negative_cache.add(entry.key, self.errors.pop(item_key, 'inaccessible'))
+            elif entity.id in processed_ids:
+                frontier.remove(entry.key)
+                self.skipped_processed += 1
+            elif entry.key != str(entity.id):
+                # Queued under an alias: merge it into the entry of the channel ID
+                frontier.remove(entry.key)
+                if not frontier.add(entity, key=str(entity.id), mentions=entry.mentions,
+                                    referrers=entry.referrers, depth=entry.depth) and self.registry is not None:
+                    self.registry.skip()
+                frontier.replace(str(entity.id), entity)
+            else:
+                frontier.replace(entry.key, entity)
+
+    def summary(self) -> dict[str, int]:
+        return {
+            'bulk_requests': self.requests,
+            'resolved': self.resolved,
+            'inaccessible': self.inaccessible,
+            'skipped_processed': self.skipped_processed,
+        }
+
+    def _cached_input_channel(self, channel_id: int) -> Any | None:
+        """Return the ``InputChannel`` of an ID if the session knows its access hash."""
+        session = getattr(self.client, 'session', None)
+        if session is None:
+            return None
+        try:
+            return utils.get_input_channel(session.get_input_entity(PeerChannel(channel_id)))
+        except (ValueError, TypeError):
+            return None
+
+    async def _get_channels(self, keys: list[str], input_channels: list[Any]) -> dict[str, Channel | None]:
+        self.requests += 1
+        try:
+            result = await self.client(GetChannelsRequest(input_channels))
+        except BudgetExhausted:
+            raise
+        except RPCError as e:
+            # A bad ID or a FloodWait fails the whole chunk; leave it to the individual lookups
+            logger.debug("Bulk channel lookup of %d IDs failed: %s", len(keys), e)
+            return {}
+        except Exception as e:
+            logger.error(f"Error resolving channels in bulk: {e}")
+            if Config.DEBUG:
+                import traceback
+                logger.error(traceback.format_exc())
+            return {}
+
+        entities = {str(chat.id): chat for chat in getattr(result, 'chats', [])}
+        return {
+            key: entities[key] if isinstance(entities[key], Channel) else None
+            for key in keys
+            if key in entities and isinstance(entities[key], (Channel, ChannelForbidden))
+        }
+
+    async def _resolve_username(self, username: str) -> Channel | None:
+        """Resolve a username; None if it belongs to a user or chat. Lookup errors are raised."""
+        self.requests += 1
+        result = await self.client(ResolveUsernameRequest(username))
+        peer_id = getattr(result.peer, 'channel_id', None)
+        for chat in getattr(result, 'chats', []):
+            if chat.id == peer_id:
+                return chat if isinstance(chat, Channel) else None
+        return None
@@ -0,0 +1,129 @@
+"""Per-channel scan depth policies.
+
+A fixed ``max_posts`` reads as many messages from a channel that stopped
+yielding new forward sources long ago as from one that keeps producing them.
+The adaptive policy watches the number of new forward sources per window of
+messages: a window without enough new sources means the channel is saturated
+and the scan stops; a channel still productive when it reaches ``max_posts``
+gets its scan extended, up to ``max_extension`` times the base limit.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCAN_POLICIES = ('adaptive', 'fixed')
+
+
+class ChannelScan:
+    """Scan state of one channel; call ``record`` for every message read."""
+
+    def __init__(self, policy: 'ScanPolicy') -> None:
+        self.policy = policy
+        self.limit = policy.max_posts
+        self.count = 0
+        self.window_new_sources = 0
+        self.last_window_productive = True
+        self.stop_reason: str | None = None
+
+    def record(self, new_source: bool = False) -> bool:
+        """Record a message and return whether the scan should continue.
+
+        Args:
+            new_source (bool): Whether the message is a forward from a source not
+                seen before in this channel.
+        """
+        policy = self.policy
+        self.count += 1
+        if new_source:
+            self.window_new_sources += 1
+
+        if policy.adaptive and self.count % policy.window == 0:
+            self.last_window_productive = self.window_new_sources >= policy.min_new_sources
+            self.window_new_sources = 0
+            if not self.last_window_productive:
+                return self._stop('saturated')
+
+        if self.limit and self.count >= self.limit:
+            productive = self.last_window_productive or self.window_new_sources >= policy.min_new_sources
+            if policy.adaptive and productive and self.limit < policy.max_limit:
+                self.limit = min(self.limit + policy.max_posts, policy.max_limit)
+                policy.extended += 1
+                return True
+            return self._stop('limit')
+        return True
+
+    def checkpoint(self) -> int | None:
+        """Message count at which the scan may stop next (None: not before the history ends).
+
+        Messages up to this count will be read whatever they contain, so they can be fetched ahead.
+        """
+        points = [self.limit] if self.limit else []
+        if self.policy.adaptive:
+            points.append((self.count // self.policy.window + 1) * self.policy.window)
+        return min(points) if points else None
+
+    def _stop(self, reason: str) -> bool:
+        self.stop_reason = reason
+        if reason == 'saturated':
+            self.policy.saturated += 1
+        return False
+
+
+class ScanPolicy:
+    """Factory of ``ChannelScan`` objects sharing one configuration and statistics.
+
+    Args:
+        max_posts (int, optional): Base number of messages scanned per channel (None: no limit).
+        adaptive (bool): Stop saturated channels early and extend productive ones.
+        window (int): Number of messages per saturation check.
+        min_new_sources (int): New forward sources a window needs to count as productive.
+        max_extension (float): Largest scan of a productive channel, as a multiple of ``max_posts``.
+    """
+
+    def __init__(
+        self,
+        max_posts: int | None = None,
+        adaptive: bool = False,
+        window: int = 100,
+        min_new_sources: int = 1,
+        max_extension: float = 4.0,
+    ) -> None:
+        self.max_posts = max_posts
+        self.adaptive = adaptive
+        self.window = max(1, window)
+        self.min_new_sources = min_new_sources
+        self.max_limit = int(max_posts * max_extension) if max_posts else None
+
+        self.channels = 0
+        self.messages = 0
+        self.saturated = 0
+        self.extended = 0
+
+    @classmethod
+    def from_config(cls, config, max_posts: int | None) -> 'ScanPolicy':
+        """Create the policy selected by the ``SCAN_*`` settings of ``Config``."""
+        return cls(
+            max_posts=max_posts,
+            adaptive=config.SCAN_POLICY == 'adaptive',
+            window=config.SCAN_WINDOW,
+            min_new_sources=config.SCAN_MIN_NEW_SOURCES,
+            max_extension=config.SCAN_MAX_EXTENSION,
+        )
+
+    def start(self) -> ChannelScan:
+        """Start scanning a channel."""
+        self.channels += 1
+        return ChannelScan(self)
+
+    def finish(self, scan: ChannelScan) -> None:
+        """Add a finished channel scan to the statistics."""
+        self.messages += scan.count
+
+    def summary(self) -> dict[str, int]:
+        return {
+            'channels': self.channels,
+            'messages': self.messages,
+            'stopped_saturated': self.saturated,
+            'extensions': self.extended,
+        }
@@ -0,0 +1,261 @@
+"""Multi-threshold sweeps from a single crawl.
+
+Choosing ``min_mentions`` usually takes several crawls, one per candidate
+threshold. A stricter threshold only ever reaches a subset of the channels a
+looser one reaches, so one crawl at the loosest threshold already reads every
+message the stricter crawls would read. ``SweepRecorder`` keeps what the
+sampler decided on for each scanned channel, in scan order: the forward source
+of every forwarded message (so mention counts stay exact), the recommended
+channels and the other edge rows written. ``derive`` replays the sampler's
+decisions for a stricter threshold over that record, and ``write`` produces a
+results CSV and edge list per threshold, as a crawl at that threshold would
+have written them. Channels found inaccessible are dropped from the derived
+results as from the crawl's own, and with an edge store the derived edges are
+written as runs of the store.
+
+Channels are taken in the order the sweep crawl scanned them. This is exact
+for the set of channels, counts and edges as long as the crawl was not cut
+short by a budget; with ``CRAWL_FRONTIER=priority`` the order of rows within an
+iteration can differ from a separate crawl.
+"""
+
+import csv
+import heapq
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from .compact_graph import EDGE_LIST_COLUMNS
+from .compression import compression_of, open_text
+from .edge_list import create_edge_list
+
+logger = logging.getLogger(__name__)
+
+RESULTS_COLUMNS = ['Channel ID', 'Channel Name', 'Channel Username']
+
+
+def parse_thresholds(value: str | None) -> list[int]:
+    """Parse comma-separated thresholds such as ``"5, 10,20"``; invalid entries raise ValueError."""
+    thresholds = set()
+    for item in (value or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        threshold = int(item)
+        if threshold < 1:
+            raise ValueError(f"Minimum mentions must be at least 1, got {threshold}")
+        thresholds.add(threshold)
+    return sorted(thresholds)
+
+
+def sweep_directory(csv_file_path: str, threshold: int) -> str:
+    """Folder receiving the outputs derived for ``threshold``, next to the crawl results."""
+    return os.path.join(os.path.dirname(csv_file_path), f'sweep_min{threshold}')
+
+
+@dataclass
+class ChannelRecord:
+    """Everything one channel scan contributed to the outputs."""
+
+    key: str
+    name: str
+    username: str
+    seed: bool
+    recommendations: list[str] = field(default_factory=list)
+    forwards: list[str] = field(default_factory=list)
+    rows: list[list[Any]] = field(default_factory=list)
+
+
+@dataclass
+class SweepOutput:
+    """Results and edge rows derived for one threshold."""
+
+    threshold: int
+    results: list[list[str]]
+    edges: list[list[Any]]
+    channel_counts: list[int]
+    channels_scanned: int
+    missing_channels: int
+
+
+class _RowList(list):
+    """List usable as a CSV writer, so ``create_edge_list`` formats derived rows."""
+
+    def writerow(self, row: list[Any]) -> None:
+        self.append(row)
+
+
+class _RecordingWriter:
+    """Edge list writer that records non-forward rows against the channel being scanned."""
+
+    def __init__(self, recorder: 'SweepRecorder', writer: Any) -> None:
+        self._recorder = recorder
+        self._writer = writer
+
+    def writerow(self, row: list[Any]) -> None:
+        if isinstance(self._writer, (str, Path)):
+            create_edge_list(self._writer, *row[:7], weight=row[7])
+        elif self._writer is not None:
+            writer = self._writer if hasattr(self._writer, 'writerow') else csv.writer(self._writer)
+            writer.writerow(row)
+        self._recorder.add_row(row)
+
+
+class SweepRecorder:
+    """Records a crawl at the loosest threshold and derives the outputs of stricter ones.
+
+    Args:
+        iterations (int): Iterations of the crawl, also used for the derived outputs.
+        thresholds (list[int]): Stricter minimum mention counts to derive.
+    """
+
+    def __init__(self, iterations: int, thresholds: list[int]) -> None:
+        self.iterations = iterations
+        self.thresholds = sorted(set(thresholds))
+        self.channels: list[ChannelRecord] = []
+        self.sources: dict[str, tuple[str, str]] = {}
+        self._keys: dict[str, str] = {}
+        self._current: ChannelRecord | None = None
+
+    def writer(self, edge_list_writer: Any) -> _RecordingWriter:
+        """Wrap the crawl's edge list writer so rows are also recorded."""
+        return _RecordingWriter(self, edge_list_writer)
+
+    def start_channel(self, key: str, name: str, username: str, seed: bool = False) -> None:
+        """Start recording the scan of a channel."""
+        self._current = ChannelRecord(self._intern(key), name, username, seed)
+        self.channels.append(self._current)
+
+    def add_recommendation(self, key: str) -> None:
+        """Record a channel recommended for the channel being scanned."""
+        if self._current is not None:
+            self._current.recommendations.append(self._intern(key))
+
+    def add_forward(self, source_key: str) -> None:
+        """Record a message of the channel being scanned forwarded from ``source_key``."""
+        if self._current is not None:
+            self._current.forwards.append(self._intern(source_key))
+
+    def add_source(self, source_key: str, name: str, username: str) -> None:
+        """Record the name of a forward source once its entity has been fetched."""
+        self.sources[self._intern(source_key)] = (name, username)
+
+    def add_row(self, row: list[Any]) -> None:
+        """Record a recommendation or URL edge row; forward rows are re-derived per threshold."""
+        if self._current is not None and row[6] != 'forward':
+            self._current.rows.append(row)
+
+    def derive(self, threshold: int) -> SweepOutput:
+        """Replay the sampler's decisions for ``threshold`` over the recorded crawl.
+
+        Iterations scan their channels in the order the crawl scanned them;
+        recommended channels join the current iteration and channels whose
+        forward count reaches the threshold are scanned in the next one.
+        """
+        order = {}
+        for index, record in enumerate(self.channels):
+            order.setdefault(record.key, (index, record))
+
+        results, edges = [], _RowList()
+        mentions: dict[str, int] = {}
+        scanned: set[str] = set()
+        missing: set[str] = set()
+        channel_counts = []
+        queued = {record.key for record in self.channels if record.seed}
+
+        for _ in range(self.iterations):
+            heap = [(order[key][0], key) for key in queued if key in order]
+            missing.update(key for key in queued if key not in order)
+            heapq.heapify(heap)
+            found: set[str] = set()
+
+            while heap:
+                _, key = heapq.heappop(heap)
+                if key in scanned:
+                    continue
+                scanned.add(key)
+                record = order[key][1]
+
+                edges.extend(record.rows)
+                for recommended in record.recommendations:
+                    if recommended in scanned:
+                        continue
+                    if recommended in order:
+                        heapq.heappush(heap, (order[recommended][0], recommended))
+                    else:
+                        missing.add(recommended)
+
+                for source in record.forwards:
+                    mentions[source] = mentions.get(source, 0) + 1
+                    if mentions[source] < threshold or source not in self.sources:
+                        continue
+                    source_name, source_username = self.sources[source]
+                    create_edge_list(edges, source, source_name, source_username,
+                                     record.key, record.name, record.username, connection_type='forward')
+                    results.append([source, source_name, source_username])
+                    found.add(source)
+
+            channel_counts.append(len(found))
+            queued = found - scanned
+
+        return SweepOutput(threshold, results, list(edges), channel_counts, len(scanned), len(missing - scanned))
+
+    def write(self, csv_file_path: str, edge_list_filename: str, exclude: Iterable[str] = (),
+              store_run: Any | None = None) -> list[SweepOutput]:
+        """Write a results CSV and edge list for every threshold into its ``sweep_min<N>`` folder.
+
+        Args:
+            csv_file_path (str): Results CSV of the crawl.
+            edge_list_filename (str): File name of the derived edge lists.
+            exclude (Iterable[str]): IDs of channels to drop from the derived results, as they
+                are dropped from the crawl's results CSV.
+            store_run (RunPartitions, optional): Edge store run of the crawl. The derived edges
+                then go to the store as runs ``<run_id>_min<N>`` instead of flat edge lists.
+        """
+        exclude = set(exclude)
+        outputs = []
+        for threshold in self.thresholds:
+            output = self.derive(threshold)
+            output.results = [row for row in output.results if row[0] not in exclude]
+            directory = sweep_directory(csv_file_path, threshold)
+            try:
+                os.makedirs(directory, exist_ok=True)
+                with open_text(os.path.join(directory, os.path.basename(csv_file_path)), 'w') as file:
+                    writer = csv.writer(file)
+                    writer.writerow(RESULTS_COLUMNS)
+                    writer.writerows(output.results)
+                if store_run is not None:
+                    edges_path = self._write_store_run(store_run, threshold, output.edges,
+                                                       compression_of(edge_list_filename))
+                else:
+                    edges_path = os.path.join(directory, edge_list_filename)
+                    with open_text(edges_path, 'w') as file:
+                        writer = csv.writer(file)
+                        writer.writerow(EDGE_LIST_COLUMNS)
+                        writer.writerows(output.edges)
+            except (OSError, ValueError) as e:
+                logger.error("Error writing sweep outputs for min mentions %d: %s", threshold, e)
+                continue
+
+            logger.info("Min mentions %d: %d channels scanned, channels found per iteration %s, %d edges -> %s",
+                        threshold, output.channels_scanned, output.channel_counts, len(output.edges), edges_path)
+            if output.missing_channels:
+                logger.warning("Min mentions %d reaches %d channels the crawl did not scan",
+                               threshold, output.missing_channels)
+            outputs.append(output)
+        return outputs
+
+    @staticmethod
+    def _write_store_run(store_run: Any, threshold: int, edges: list[list[Any]], compression: str) -> str:
+        """Write derived edges as a run of the crawl's edge store; returns the partition path."""
+        store = store_run.store
+        params = store.read_manifest()['runs'].get(store_run.run_id, {}).get('params', {})
+        partition = store.write_run(f"{store_run.run_id}_min{threshold}", edges,
+                                    {**params, 'min_mentions': threshold, 'sweep_of': store_run.run_id},
+                                    compression)
+        return store.path(partition)
+
+    def _intern(self, key: str) -> str:
+        return self._keys.setdefault(key, key)
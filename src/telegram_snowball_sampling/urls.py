@@ -0,0 +1,262 @@
+"""URL extraction, canonicalization and aggregation.
+
+Raw URLs in Telegram posts differ only by tracking parameters, fragments,
+letter case or trailing punctuation, so writing each one as its own
+``outbound_link`` node floods the network with near-duplicates. This module
+reduces every URL to a canonical form and aggregates links per channel:
+
+* links to websites become one channel -> domain edge weighted by count;
+* ``t.me`` links are unwrapped to the channel they point to;
+* the canonical URLs can optionally be kept in a separate deduplicated store
+  (see ``dedup.Deduplicator``).
+"""
+
+import logging
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, TextIO
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .compression import open_text
+from .dedup import Deduplicator
+
+logger = logging.getLogger(__name__)
+
+URL_PATTERN = re.compile(r'https?://[^\s<>"\'`]+', re.IGNORECASE)
+
+# Punctuation that ends a sentence rather than a URL
+TRAILING_PUNCTUATION = '.,;:!?\'"»…'
+BRACKETS = {')': '(', ']': '[', '}': '{'}
+
+TRACKING_PARAMETERS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'gclsrc', 'yclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref_src', 'ref_url', 'spm', 'si', 'feature',
+})
+TRACKING_PREFIXES = ('utm_', 'hsa_', 'pk_', 'mtm_')
+
+TELEGRAM_HOSTS = frozenset({'t.me', 'telegram.me', 'telegram.dog'})
+# First path segments of t.me links that are not channel usernames
+TELEGRAM_RESERVED_PATHS = frozenset({
+    'joinchat', 'addstickers', 'addemoji', 'addlist', 'addtheme', 'share', 'proxy', 'socks',
+    'setlanguage', 'login', 'invoice', 'iv', 'boost', 'contact', 'bg', 'confirmphone',
+})
+TELEGRAM_USERNAME = re.compile(r'^[A-Za-z][A-Za-z0-9_]{3,31}$')
+
+
+def _strip_trailing_punctuation(url: str) -> str:
+    """Remove sentence punctuation and unbalanced closing brackets from the end of a URL."""
+    while url:
+        last = url[-1]
+        if last in TRAILING_PUNCTUATION:
+            url = url[:-1]
+        elif last in BRACKETS and url.count(last) > url.count(BRACKETS[last]):
+            url = url[:-1]
+        else:
+            break
+    return url
+
+
+# Message entities that carry a URL
+URL_ENTITY_TYPES = ('MessageEntityUrl', 'MessageEntityTextUrl')
+
+# Text of a message and its URL entities as (type name, offset, length, url), safe to pickle
+MessagePayload = tuple[str, list[tuple[str, int, int, str | None]]]
+
+
+def message_payload(message) -> MessagePayload | None:
+    """Return the parts of a Telethon message that URL extraction needs, or None if it has no text.
+
+    The payload is made of plain strings and numbers, so it can be sent to another process.
+    """
+    text = getattr(message, 'message', None) if message else None
+    if not text:
+        return None
+    entities = [(type(entity).__name__, entity.offset, entity.length, getattr(entity, 'url', None))
+                for entity in getattr(message, 'entities', None) or []
+                if type(entity).__name__ in URL_ENTITY_TYPES]
+    return text, entities
+
+
+def payload_urls(payload: MessagePayload | None) -> list[str]:
+    """Extract the URLs of a message payload (see ``extract_urls``)."""
+    if payload is None:
+        return []
+
+    text, entities = payload
+    urls = []
+    if entities:
+        # Imported lazily so the canonicalization helpers work without Telethon
+        from telethon import helpers
+
+        # Entity offsets count UTF-16 code units
+        surrogate_text = helpers.add_surrogate(text)
+        for kind, offset, length, url in entities:
+            if kind == 'MessageEntityTextUrl':
+                urls.append(url)
+            else:
+                link = helpers.del_surrogate(surrogate_text[offset:offset + length])
+                urls.append(link if '://' in link else f'https://{link}')
+        if urls:
+            return urls
+
+    return [_strip_trailing_punctuation(url) for url in URL_PATTERN.findall(text)]
+
+
+def extract_urls(message) -> list[str]:
+    """Extract the URLs of a Telethon message.
+
+    Message entities are preferred: ``MessageEntityUrl`` gives the visible
+    link text and ``MessageEntityTextUrl`` the hidden target of a hyperlink,
+    which a plain-text search would miss. Messages without entities fall back
+    to the precompiled ``URL_PATTERN``.
+
+    Args:
+        message (Message): The Telethon message.
+
+    Returns:
+        list[str]: URLs in the order they appear.
+    """
+    return payload_urls(message_payload(message))
+
+
+def canonicalize_url(url: str) -> str | None:
+    """Return the canonical form of a URL, or None if it is not a valid web URL.
+
+    The scheme and host are lowercased, ``www.``, default ports, fragments,
+    tracking parameters (``utm_*``, ``fbclid``, ...) and trailing punctuation are
+    removed, and a trailing slash on an empty path is dropped.
+    """
+    url = _strip_trailing_punctuation(url.strip())
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if scheme not in ('http', 'https') or '.' not in host:
+        return None
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and (scheme, port) not in (('http', 80), ('https', 443)):
+        host = f'{host}:{port}'
+
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key.lower() not in TRACKING_PARAMETERS and not key.lower().startswith(TRACKING_PREFIXES)]
+    path = parts.path if parts.path != '/' else ''
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def url_domain(url: str) -> str | None:
+    """Return the domain of a canonical URL (without port)."""
+    host = urlsplit(url).hostname
+    return host or None
+
+
+def telegram_channel_from_url(url: str) -> str | None:
+    """Return the channel a ``t.me`` link points to.
+
+    Public links give the username (``t.me/name``, ``t.me/s/name``,
+    ``t.me/name/123``); private message links (``t.me/c/<id>/...``) give the
+    numeric channel ID. Invite, sticker, proxy and similar links return None.
+    """
+    parts = urlsplit(url)
+    if (parts.hostname or '').lower() not in TELEGRAM_HOSTS:
+        return None
+
+    segments = [segment for segment in parts.path.split('/') if segment]
+    if segments and segments[0] == 's':
+        segments = segments[1:]
+    if not segments:
+        return None
+    if segments[0] == 'c':
+        return segments[1] if len(segments) > 1 and segments[1].isdigit() else None
+    if segments[0].lower() in TELEGRAM_RESERVED_PATHS or segments[0].startswith('+'):
+        return None
+    return segments[0].lower() if TELEGRAM_USERNAME.match(segments[0]) else None
+
+
+def classify_url(url: str) -> tuple[str, str | None, str | None] | None:
+    """Canonicalize a raw URL and tell where it points.
+
+    Returns:
+        tuple or None: ``(canonical, channel, domain)`` where ``channel`` is the linked
+        Telegram channel and ``domain`` the linked website (None for Telegram links),
+        or None if the URL was discarded.
+    """
+    canonical = canonicalize_url(url)
+    if canonical is None:
+        return None
+
+    channel = telegram_channel_from_url(canonical)
+    host = url_domain(canonical)
+    # Invite and other non-channel Telegram links are only kept in the URL store
+    domain = host if channel is None and host not in TELEGRAM_HOSTS else None
+    return canonical, channel, domain
+
+
+class UrlAggregator:
+    """Count the domains and Telegram channels linked from one channel's messages."""
+
+    def __init__(self) -> None:
+        self.domains: Counter[str] = Counter()
+        self.telegram_channels: Counter[str] = Counter()
+        self.canonical_urls: set[str] = set()
+
+    def add(self, url: str) -> str | None:
+        """Add a raw URL and return its canonical form, or None if it was discarded."""
+        classified = classify_url(url)
+        if classified is None:
+            return None
+        return self.add_classified(*classified)
+
+    def add_classified(self, canonical: str, channel: str | None, domain: str | None) -> str:
+        """Add a URL already classified by ``classify_url`` and return its canonical form."""
+        if channel is not None:
+            self.telegram_channels[channel] += 1
+        elif domain is not None:
+            self.domains[domain] += 1
+        self.canonical_urls.add(canonical)
+        return canonical
+
+
+class UrlStore:
+    """Append-only text file of canonical URLs, each written once.
+
+    Args:
+        path (str | Path): File to append the URLs to; compressed if it ends in ``.gz`` or ``.zst``.
+        deduplicator (Deduplicator, optional): Filter of URLs already seen, shared
+            across the run and possibly loaded from a previous run.
+        compression_level (int, optional): Level of a compressed file (None: the codec default).
+    """
+
+    def __init__(self, path: str | Path, deduplicator: Deduplicator | None = None,
+                 compression_level: int | None = None) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: TextIO = open_text(self.path, 'a', compression_level)
+        self._seen = deduplicator if deduplicator is not None else Deduplicator()
+        self.written = 0
+        self.duplicates = 0
+
+    def add(self, url: str) -> bool:
+        """Write ``url`` unless it was already stored; return whether it was written."""
+        if not self._seen.add(url):
+            self.duplicates += 1
+            return False
+        self._file.write(f"{url}\n")
+        self.written += 1
+        return True
+
+    def close(self) -> None:
+        self._file.close()
+        logger.info("Stored %d unique URLs in %s (%d duplicates skipped)",
+                    self.written, self.path, self.duplicates)
+
+    def __enter__(self) -> 'UrlStore':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
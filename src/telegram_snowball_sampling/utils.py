@@ -10,6 +10,7 @@ from typing import Any
 from colorama import Fore, Style
 from telethon import TelegramClient
 
+from .compression import open_text
 from .config import Config
 
 # Set up logging
@@ -43,12 +44,15 @@ def intro() -> None:
 
 
 def final_message(start_time: float, total_messages_processed: int,
-                  iteration_durations: list[float], channel_counts: list[int]) -> None:
+                  iteration_durations: list[float], channel_counts: list[int],
+                  stopped_by: str | None = None) -> None:
     """Display final statistics after completion"""
     end_time = time.time()
     total_time = end_time - start_time
 
     logger.info("\n==== EXECUTION SUMMARY ====")
+    if stopped_by:
+        logger.info("Crawl stopped early: %s (unexplored channels are listed in the results folder)", stopped_by)
     logger.info("Total messages processed: %d", total_messages_processed)
 
     # Print iteration durations
@@ -109,7 +113,7 @@ def remove_inaccessible_channels(file_path: str, inaccessible_channels: list[str
 
     Args:
         file_path (str): Path to the CSV file
-        inaccessible_channels (list[str]): List of channel names to remove
+        inaccessible_channels (list[str]): IDs of the channels to remove
     """
     logger.info(
         "Removing %d inaccessible channels from %s",
@@ -118,12 +122,13 @@ def remove_inaccessible_channels(file_path: str, inaccessible_channels: list[str
     )
 
     try:
-        with open(file_path, mode='r', encoding='utf-8') as file:
+        with open_text(file_path, 'r') as file:
             reader = csv.DictReader(file)
             fieldnames = reader.fieldnames
-            channels = [row for row in reader if row['Channel Name'] not in inaccessible_channels]
+            inaccessible = set(inaccessible_channels)
+            channels = [row for row in reader if row.get('Channel ID') not in inaccessible]
 
-        with open(file_path, mode='w', newline='', encoding='utf-8') as file:
+        with open_text(file_path, 'w') as file:
             writer = csv.DictWriter(file, fieldnames=fieldnames)
             writer.writeheader()
             writer.writerows(channels)
@@ -201,18 +206,75 @@ DEFAULT_MIN_MENTIONS=5
 DEFAULT_ITERATIONS=3
 DEFAULT_MAX_POSTS=100
 
+# Further minimum mentions derived from the same crawl, e.g. 10,20 (leave empty to disable)
+SWEEP_THRESHOLDS=
+
+# Study period: YYYY-MM-DD or number of days back (leave empty for no limit)
+DEFAULT_START_DATE=
+DEFAULT_END_DATE=
+
 # Channel recommendations configuration
 DEFAULT_INCLUDE_RECOMMENDATIONS=True
 DEFAULT_RECOMMENDATIONS_DEPTH=2
 
+# Crawl order (priority or fifo)
+CRAWL_FRONTIER=priority
+
+# Per-channel scan depth (adaptive or fixed)
+SCAN_POLICY=fixed
+SCAN_WINDOW=100
+SCAN_MIN_NEW_SOURCES=1
+SCAN_MAX_EXTENSION=4
+
+# Capacity of the queues between the fetch, parse, resolve and write stages
+PIPELINE_QUEUE_SIZE=100
+
+# Crawl budgets (leave empty for no limit)
+BUDGET_MAX_API_CALLS=
+BUDGET_MAX_MESSAGES=
+BUDGET_MAX_CHANNELS_PER_ITERATION=
+BUDGET_DEADLINE_MINUTES=
+BUDGET_MAX_FLOOD_WAIT_SECONDS=
+
 # URL extraction configuration
 DEFAULT_INCLUDE_URLS=True
+SAVE_RAW_URLS=True
+URL_DEDUP_CAPACITY=10000000
+URL_DEDUP_ERROR_RATE=0.001
+URL_DEDUP_FILE=
+
+# URL extraction workers (0 extracts inline; executor is process or thread)
+EXTRACTION_WORKERS=0
+EXTRACTION_EXECUTOR=process
+EXTRACTION_BATCH_SIZE=256
+
+# Archive fetched messages for offline analysis (leave empty to disable)
+ARCHIVE_FOLDER=
+ARCHIVE_SEGMENT_MB=64
+
+# Forward-source histograms per channel, reused instead of re-reading recent scans (leave empty to disable)
+HISTOGRAM_FILE=
+HISTOGRAM_MAX_AGE_DAYS=7
+
+# Inaccessible channels skipped until the retry period (days) has passed
+NEGATIVE_CACHE_FILE=negative_cache.json
+NEGATIVE_CACHE_RETRY_DAYS=30
+
+# Output writers (fsync: never, close, interval or batch; rotation size in MB, 0 to disable)
+OUTPUT_BATCH_SIZE=500
+OUTPUT_FSYNC=close
+OUTPUT_FSYNC_INTERVAL=5
+OUTPUT_ROTATE_MB=0
+OUTPUT_COMPRESSION=none
+OUTPUT_COMPRESSION_LEVEL=0
 
 # File paths and directories
 RESULTS_FOLDER=results
 MERGED_FOLDER=merged
 EDGE_LIST_FOLDER=EdgeList
 EDGE_LIST_FILENAME=Edge_List.csv
+EDGE_STORE_FOLDER=
+EDGE_STORE_PARTITION=run
 MERGED_FILENAME=merged_channels.csv
 API_DETAILS_FILE=api_values.txt
 
@@ -282,13 +344,48 @@ def update_env_file(env_file_path: str, api_id: str, api_hash: str) -> None:
                 f.write("DEFAULT_MIN_MENTIONS=5\n")
                 f.write("DEFAULT_ITERATIONS=3\n")
                 f.write("DEFAULT_MAX_POSTS=100\n")
+                f.write("SWEEP_THRESHOLDS=\n")
+                f.write("DEFAULT_START_DATE=\n")
+                f.write("DEFAULT_END_DATE=\n")
                 f.write("DEFAULT_INCLUDE_RECOMMENDATIONS=True\n")
                 f.write("DEFAULT_RECOMMENDATIONS_DEPTH=2\n")
+                f.write("CRAWL_FRONTIER=priority\n")
+                f.write("SCAN_POLICY=fixed\n")
+                f.write("SCAN_WINDOW=100\n")
+                f.write("SCAN_MIN_NEW_SOURCES=1\n")
+                f.write("SCAN_MAX_EXTENSION=4\n")
+                f.write("PIPELINE_QUEUE_SIZE=100\n")
+                f.write("BUDGET_MAX_API_CALLS=\n")
+                f.write("BUDGET_MAX_MESSAGES=\n")
+                f.write("BUDGET_MAX_CHANNELS_PER_ITERATION=\n")
+                f.write("BUDGET_DEADLINE_MINUTES=\n")
+                f.write("BUDGET_MAX_FLOOD_WAIT_SECONDS=\n")
                 f.write("DEFAULT_INCLUDE_URLS=True\n")
+                f.write("SAVE_RAW_URLS=True\n")
+                f.write("URL_DEDUP_CAPACITY=10000000\n")
+                f.write("URL_DEDUP_ERROR_RATE=0.001\n")
+                f.write("URL_DEDUP_FILE=\n")
+                f.write("EXTRACTION_WORKERS=0\n")
+                f.write("EXTRACTION_EXECUTOR=process\n")
+                f.write("EXTRACTION_BATCH_SIZE=256\n")
+                f.write("ARCHIVE_FOLDER=\n")
+                f.write("ARCHIVE_SEGMENT_MB=64\n")
+                f.write("HISTOGRAM_FILE=\n")
+                f.write("HISTOGRAM_MAX_AGE_DAYS=7\n")
+                f.write("NEGATIVE_CACHE_FILE=negative_cache.json\n")
+                f.write("NEGATIVE_CACHE_RETRY_DAYS=30\n")
+                f.write("OUTPUT_BATCH_SIZE=500\n")
+                f.write("OUTPUT_FSYNC=close\n")
+                f.write("OUTPUT_FSYNC_INTERVAL=5\n")
+                f.write("OUTPUT_ROTATE_MB=0\n")
+                f.write("OUTPUT_COMPRESSION=none\n")
+                f.write("OUTPUT_COMPRESSION_LEVEL=0\n")
                 f.write("RESULTS_FOLDER=results\n")
                 f.write("MERGED_FOLDER=merged\n")
                 f.write("EDGE_LIST_FOLDER=EdgeList\n")
                 f.write("EDGE_LIST_FILENAME=Edge_List.csv\n")
+                f.write("EDGE_STORE_FOLDER=\n")
+                f.write("EDGE_STORE_PARTITION=run\n")
                 f.write("MERGED_FILENAME=merged_channels.csv\n")
                 f.write("DEBUG=False\n")
             logger.info("Created new .env file with API credentials")
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+from telegram_snowball_sampling.analysis_state import AnalysisState
+from telegram_snowball_sampling.compact_graph import CompactGraph
+from telegram_snowball_sampling.output import rotated_parts, rotated_path
+
+HEADER = ['From_Channel_ID', 'From_Channel_Name', 'From_Channel_Username',
+          'To_Channel_ID', 'To_Channel_Name', 'To_Channel_Username',
+          'ConnectionType', 'Weight']
+
+
+def append_rows(path: Path, rows: list[list[str]]) -> None:
+    new_file = not path.exists()
+    with path.open('a', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        if new_file:
+            writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+def test_incremental_update_matches_full_rebuild(tmp_path: Path) -> None:
+    edges = tmp_path / 'edges.csv'
+    state_path = str(tmp_path / 'state.npz')
+    append_rows(edges, [
+        ['1', 'A', 'a', '2', 'B', 'b', 'forward', '1'],
+        ['2', 'B', 'b', '3', 'C', 'c', 'forward', '1'],
+        ['4', 'D', 'd', '5', 'E', 'e', 'recommendation', '1'],
+    ])
+
+    state = AnalysisState()
+    assert state.update_from_edge_list(str(edges)) == 3
+    state.save(state_path)
+    assert state.metrics()['weakly_connected_components'] == 2
+
+    append_rows(edges, [
+        ['3', 'C', 'c', '4', 'D', 'd', 'forward', '1'],
+        ['1', 'A', 'a', '2', 'B', 'b', 'forward', '1'],
+    ])
+    # A half-written row must wait for the next update
+    with edges.open('a', encoding='utf-8') as file:
+        file.write('9,Partial')
+
+    resumed = AnalysisState.load(state_path)
+    assert resumed.update_from_edge_list(str(edges)) == 2
+
+    metrics = resumed.metrics()
+    assert metrics['node_count'] == 5
+    assert metrics['edge_count'] == 4
+    assert metrics['weakly_connected_components'] == 1
+    assert metrics['connection_types'] == {'forward': 3, 'recommendation': 1}
+    assert metrics['top_sources'][0][1] == 1
+    assert resumed.edge_weights.sum() == 5.0
+    assert resumed.node_name('4') == 'D'
+
+
+def test_rewritten_edge_list_triggers_rebuild(tmp_path: Path) -> None:
+    edges = tmp_path / 'edges.csv'
+    append_rows(edges, [['1', 'A', 'a', '2', 'B', 'b', 'forward', '1']])
+    state = AnalysisState()
+    state.update_from_edge_list(str(edges))
+
+    edges.unlink()
+    append_rows(edges, [['7', 'G', 'g', '8', 'H', 'h', 'forward', '3'],
+                        ['8', 'H', 'h', '9', 'I', 'i', 'forward', '1']])
+    state.update_from_edge_list(str(edges))
+
+    assert sorted(state.node_ids) == ['7', '8', '9']
+    assert state.metrics()['edge_count'] == 2
+
+
+def test_rotated_edge_list_parts_are_kept(tmp_path: Path) -> None:
+    edges = tmp_path / 'edges.csv'
+    append_rows(edges, [['1', 'A', 'a', '2', 'B', 'b', 'forward', '1']])
+    state = AnalysisState()
+    state.update_from_edge_list(str(edges))
+
+    # More rows, then the writer rotates the full file and starts a new one
+    append_rows(edges, [['2', 'B', 'b', '3', 'C', 'c', 'forward', '1']])
+    edges.rename(rotated_path(str(edges), 1))
+    append_rows(edges, [['3', 'C', 'c', '4', 'D', 'd', 'forward', '1']])
+
+    assert state.update_from_edge_list(str(edges)) == 2
+    assert state.rows_consumed == 3 and state.metrics()['edge_count'] == 3
+    assert CompactGraph.from_edge_list(*rotated_parts(str(edges))).number_of_edges() == 3
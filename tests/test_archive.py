@@ -0,0 +1,44 @@
+import datetime
+from types import SimpleNamespace
+
+from telethon.tl.types import MessageEntityTextUrl, MessageFwdHeader, PeerChannel
+
+from telegram_snowball_sampling.archive import MessageArchive
+
+UTC = datetime.timezone.utc
+
+
+def make_message(message_id: int, forward_from: int | None = None) -> SimpleNamespace:
+    date = datetime.datetime(2024, 5, 1, tzinfo=UTC) + datetime.timedelta(minutes=message_id)
+    header = None
+    if forward_from is not None:
+        header = MessageFwdHeader(date=date, from_id=PeerChannel(forward_from), channel_post=7)
+    return SimpleNamespace(
+        id=message_id, date=date, message=f"post {message_id}", grouped_id=None, fwd_from=header,
+        forward=SimpleNamespace(chat=SimpleNamespace(id=forward_from, title='Source', username='source')) if header else None,
+        entities=[MessageEntityTextUrl(offset=0, length=4, url='https://example.com')],
+    )
+
+
+def test_archive_round_trip_across_segments_and_reopen(tmp_path) -> None:
+    with MessageArchive(str(tmp_path), segment_size=300, block_messages=2) as archive:
+        for message_id in range(5, 0, -1):
+            archive.add(1, make_message(message_id, forward_from=99 if message_id % 2 else None))
+        archive.add(2, make_message(1))
+
+    assert len(list(tmp_path.glob('segment_*.bin'))) > 1
+
+    # A later crawl of channel 1 overlaps the archived history
+    with MessageArchive(str(tmp_path), segment_size=300) as archive:
+        archive.add(1, make_message(6))
+        archive.add(1, make_message(5, forward_from=99))
+
+    archive = MessageArchive(str(tmp_path))
+    assert sorted(archive.channels()) == [1, 2]
+    records = list(archive.iter_channel(1))
+    assert [record['id'] for record in records] == [6, 5, 4, 3, 2, 1]
+    assert records[1]['forward']['from_id'] == 99 and records[1]['forward']['chat']['username'] == 'source'
+    assert records[1]['entities'] == [{'type': 'MessageEntityTextUrl', 'offset': 0, 'length': 4,
+                                       'url': 'https://example.com'}]
+    assert records[2]['forward'] is None
+    assert archive.message_count(1) == 7
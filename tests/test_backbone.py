@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import networkx as nx
+import numpy as np
+
+from telegram_snowball_sampling.backbone import core_numbers, extract_backbone
+
+
+def test_core_numbers_match_networkx() -> None:
+    G = nx.gnm_random_graph(200, 800, seed=3)
+    edges = np.array(G.edges())
+
+    core = core_numbers(edges[:, 0], edges[:, 1], 200)
+
+    assert core.tolist() == [nx.core_number(G)[node] for node in range(200)]
+
+
+def test_extract_backbone_respects_budget_and_keeps_dominant_edges() -> None:
+    # Node 0 sends most of its weight to node 1; the other edges are noise
+    src = np.array([0, 0, 0, 0, 2, 3, 4])
+    dst = np.array([1, 2, 3, 4, 3, 4, 2])
+    weights = np.array([100.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0])
+
+    for method in ('disparity', 'kcore', 'topk'):
+        keep = extract_backbone(src, dst, weights, 5, edge_budget=3, method=method)
+        assert keep.sum() <= 3
+        assert keep.any()
+
+    disparity = extract_backbone(src, dst, weights, 5, edge_budget=1, method='disparity')
+    assert disparity.tolist() == [True, False, False, False, False, False, False]
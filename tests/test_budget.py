@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from telegram_snowball_sampling.budget import BudgetedClient, BudgetExhausted, CrawlBudget
+
+
+class FakeMessage:
+    def __init__(self, message_id: int) -> None:
+        self.id = message_id
+
+
+class FakeClient:
+    async def get_entity(self, entity):
+        return entity
+
+    async def iter_messages(self, entity, limit=None, **kwargs):
+        for message_id in range(1000, 1000 - (limit or 250), -1):
+            yield FakeMessage(message_id)
+
+
+async def read_all(client: BudgetedClient, messages: list) -> None:
+    async for message in client.iter_messages('channel'):
+        messages.append(message)
+
+
+def test_budgeted_client_charges_pages_and_messages() -> None:
+    budget = CrawlBudget(max_messages=150)
+    client = BudgetedClient(FakeClient(), budget)
+
+    # A channel cut short by the budget raises instead of ending like a complete one
+    messages = []
+    with pytest.raises(BudgetExhausted):
+        asyncio.run(read_all(client, messages))
+    assert len(messages) == 150
+    assert budget.api_calls == 2 and budget.exhausted
+    assert 'message budget' in budget.reason
+
+
+def test_budgeted_client_stops_requests_when_spent() -> None:
+    budget = CrawlBudget(max_api_calls=2)
+    client = BudgetedClient(FakeClient(), budget)
+
+    asyncio.run(client.get_entity('a'))
+    asyncio.run(client.get_entity('b'))
+    with pytest.raises(BudgetExhausted):
+        asyncio.run(client.get_entity('c'))
+    assert budget.summary()['api_calls'] == 2
+    assert not CrawlBudget().iteration_full(10) and CrawlBudget(max_channels_per_iteration=10).iteration_full(10)
+
+
+def test_budgeted_client_restores_flood_sleep_threshold() -> None:
+    fake = FakeClient()
+    fake.flood_sleep_threshold = 60
+    client = BudgetedClient(fake, CrawlBudget(max_flood_wait_seconds=30))
+    thresholds = []
+
+    async def read() -> None:
+        async for _ in client.iter_messages('channel', limit=2):
+            thresholds.append(fake.flood_sleep_threshold)
+        await client.get_entity('a')
+
+    asyncio.run(read())
+    assert thresholds == [0, 0]
+    assert fake.flood_sleep_threshold == 60
@@ -0,0 +1,52 @@
+import csv
+import os
+import subprocess
+import sys
+
+import telegram_snowball_sampling
+from telegram_snowball_sampling.cli import main
+from telegram_snowball_sampling.compaction import read_edge_rows
+
+PROBE = """
+import sys
+from telegram_snowball_sampling.cli import main
+for command in ([], ['crawl'], ['merge'], ['analyze'], ['compact']):
+    try:
+        main([*command, '--help'])
+    except SystemExit:
+        pass
+heavy = ('telethon', 'networkx', 'numpy', 'pandas', 'matplotlib', 'dotenv', 'telegram_snowball_sampling.config')
+print('loaded:' + ','.join(module for module in heavy if module in sys.modules))
+"""
+
+
+def test_help_imports_no_command_dependencies() -> None:
+    package_root = os.path.dirname(os.path.dirname(telegram_snowball_sampling.__file__))
+    result = subprocess.run([sys.executable, '-c', PROBE], capture_output=True, text=True, check=True,
+                            env={**os.environ, 'PYTHONPATH': package_root})
+
+    assert 'analyze' in result.stdout and 'compact' in result.stdout
+    assert result.stdout.strip().splitlines()[-1] == 'loaded:'
+
+
+def test_merge_and_compact_commands_run_without_prompts(tmp_path) -> None:
+    results = tmp_path / 'results'
+    results.mkdir()
+    (results / 'run.csv').write_text('Channel ID,Channel Name,Channel Username\n1,One,one\n1,One,one\n2,Two,two\n')
+    assert main(['merge', '--results-folder', str(results), '--merged-folder', str(tmp_path / 'merged')]) == 0
+    with open(tmp_path / 'merged' / 'merged_channels.csv', newline='', encoding='utf-8') as file:
+        assert len(list(csv.reader(file))) == 3
+
+    edge_list = tmp_path / 'Edge_List.csv'
+    edge_list.write_text('From_Channel_ID,From_Channel_Name,From_Channel_Username,To_Channel_ID,To_Channel_Name,'
+                         'To_Channel_Username,ConnectionType,Weight\n'
+                         '1,One,one,2,Two,two,forward,1\n1,One,one,2,Two,two,forward,1\n2,Two,two,1,One,one,forward,1\n')
+    assert main(['compact', '--input', str(edge_list), '--max-edges', '1']) == 0
+    assert list(read_edge_rows(str(tmp_path / 'Edge_List.compact.csv'))) == [
+        ['1', 'One', 'one', '2', 'Two', 'two', 'forward', '2'],
+        ['2', 'Two', 'two', '1', 'One', 'one', 'forward', '1'],
+    ]
+
+
+def test_analyze_rejects_malformed_iterations(tmp_path) -> None:
+    assert main(['analyze', '--store', str(tmp_path), '--iterations', '1,x', '--output-dir', str(tmp_path)]) == 2
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import networkx as nx
+import numpy as np
+
+from telegram_snowball_sampling.compact_graph import CompactGraph
+from telegram_snowball_sampling.graph_algorithms import weakly_connected_components
+
+
+def test_compact_graph_merges_rows_and_converts_to_networkx() -> None:
+    graph = CompactGraph.from_rows([
+        ['1', 'A', 'a', '2', 'B', 'b', 'forward', '1'],
+        ['2', 'B', 'b', '3', 'C', 'c', 'recommendation', '1'],
+        ['1', 'A', 'a', '2', 'B', 'b', 'outbound_link', '2'],
+        ['3', 'C', 'c', '1', 'A', 'a', 'forward', ''],
+    ])
+
+    assert graph.number_of_nodes() == 3
+    assert graph.number_of_edges() == 3
+    assert graph.node_index('3') == 2
+    assert graph.node_label(1) == 'B (@b)'
+    assert graph.out_degree().tolist() == [1, 1, 1]
+    assert graph.connection_type_counts() == {'forward': 1, 'recommendation': 1, 'outbound_link': 1}
+
+    G = graph.to_networkx()
+    assert G.edges['1', '2'] == {'connection_type': 'outbound_link', 'weight': 3.0}
+    assert G.edges['3', '1']['weight'] == 1.0
+    assert G.nodes['2'] == {'name': 'B', 'username': 'b'}
+
+    sub = graph.edge_subgraph(np.array([True, False, False]))
+    assert list(sub.node_ids) == ['1', '2']
+    assert sub.to_networkx().edges['1', '2']['weight'] == 3.0
+
+
+def test_weakly_connected_components_matches_networkx() -> None:
+    G = nx.gnm_random_graph(500, 400, seed=3, directed=True)
+    src, dst = np.array(list(G.edges())).T
+
+    labels = weakly_connected_components(src, dst, G.number_of_nodes())
+
+    assert len(np.unique(labels)) == nx.number_weakly_connected_components(G)
+    for component in nx.weakly_connected_components(G):
+        assert len(set(labels[list(component)])) == 1
+
+
+def test_compact_graph_keeps_exact_weights_and_many_types_without_a_node_dict() -> None:
+    rows = [[str(i), f'N{i}', f'n{i}', str(i + 1), f'N{i + 1}', f'n{i + 1}', f'type_{i}', '1'] for i in range(300)]
+    rows += [['0', 'N0', 'n0', '1', 'N1', 'n1', 'type_0', str(2 ** 24)]]
+    graph = CompactGraph.from_rows(rows)
+
+    assert len(graph.type_names) == 300 and graph.types.max() == 299
+    assert graph.weights[graph.successors(0).tolist().index(1)] == 2 ** 24 + 1
+    assert all(graph.node_index(str(i)) == i for i in range(301))
+    assert graph.node_index('missing') is None and '150' in graph.node_ids
+    assert graph.node_ids._index is None
@@ -0,0 +1,58 @@
+import csv
+import gzip
+import random
+
+from telegram_snowball_sampling.compact_graph import CompactGraph
+from telegram_snowball_sampling.compaction import aggregate_edges, compact_edge_list, read_edge_rows
+
+
+def rows(count, seed=7):
+    generator = random.Random(seed)
+    result = []
+    for number in range(count):
+        source, target = generator.sample('ABCDEFGHIJ', 2)
+        connection_type = generator.choice(['forward', 'forward', 'recommendation', 'telegram_link'])
+        result.append([source, f'{source} v{number}', source.lower(), target, f'{target} v{number}', target.lower(),
+                       connection_type, 1])
+    return result
+
+
+def edges(graph):
+    src, dst, weights, types = graph.edge_arrays()
+    return sorted((graph.node_ids[s], graph.node_ids[d], float(w), graph.type_names[t])
+                  for s, d, w, t in zip(src, dst, weights, types))
+
+
+def test_spilled_aggregation_matches_in_memory_and_keeps_the_graph(tmp_path) -> None:
+    data = rows(2000)
+    in_memory = list(aggregate_edges(data))
+    spilled = list(aggregate_edges(data, max_edges=5, buckets=4, temp_dir=str(tmp_path)))
+
+    assert spilled == in_memory
+    assert sum(row[7] for row in in_memory) == 2000
+    assert len({tuple(row[i] for i in (0, 3, 6)) for row in in_memory}) == len(in_memory)
+    assert edges(CompactGraph.from_rows(in_memory)) == edges(CompactGraph.from_rows(data))
+    # Every row carries the most recent names of both channels
+    latest = {}
+    for row in data:
+        latest[row[0]], latest[row[3]] = row[1], row[4]
+    assert all(row[1] == latest[row[0]] and row[4] == latest[row[3]] for row in in_memory)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_compact_edge_list_reads_and_writes_compressed_files(tmp_path) -> None:
+    source = tmp_path / 'Edge_List.csv.gz'
+    with gzip.open(source, 'wt', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['From_Channel_ID', 'From_Channel_Name', 'From_Channel_Username', 'To_Channel_ID',
+                         'To_Channel_Name', 'To_Channel_Username', 'ConnectionType', 'Weight'])
+        writer.writerows(rows(500))
+    target = tmp_path / 'Edge_List.compact.csv.gz'
+
+    stats = compact_edge_list(str(source), str(target), max_edges=10, buckets=3)
+
+    compacted = list(read_edge_rows(str(target)))
+    assert stats.rows_in == 500 and stats.rows_out == len(compacted) and stats.spills > 0
+    assert stats.ratio == 500 / len(compacted) and stats.rows_per_second > 0
+    assert sum(int(row[7]) for row in compacted) == 500
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['Edge_List.compact.csv.gz', 'Edge_List.csv.gz']
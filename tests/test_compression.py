@@ -0,0 +1,60 @@
+import asyncio
+import csv
+
+import pytest
+
+from telegram_snowball_sampling.analysis_state import AnalysisState
+from telegram_snowball_sampling.compact_graph import EDGE_LIST_COLUMNS, CompactGraph
+from telegram_snowball_sampling.compression import open_text
+from telegram_snowball_sampling.merge_csv_data import merge_csv_files
+from telegram_snowball_sampling.output import OutputService, rotated_path
+
+
+def edge(number):
+    return [str(number), f'Channel {number}', f'chan{number}', str(number + 1), 'Target', 'target', 'forward', 1]
+
+
+@pytest.mark.parametrize('compression', ['gzip', 'zstd'])
+def test_compressed_edge_list_is_read_while_written_and_after_appends(tmp_path, compression) -> None:
+    if compression == 'zstd':
+        pytest.importorskip('zstandard')
+    state = AnalysisState(chunk_size=256)
+
+    async def crawl(first, last):
+        async with OutputService(batch_size=10, compression=compression) as outputs:
+            sink = outputs.open(tmp_path / 'Edge_List.csv', EDGE_LIST_COLUMNS)
+            sink.writerows(edge(number) for number in range(first, last))
+            # An analysis during the crawl sees every flushed row of the unfinished stream
+            await outputs.flush()
+            consumed = state.update_from_edge_list(sink.path)
+        return sink.path, consumed
+
+    path, during_first = asyncio.run(crawl(0, 100))
+    assert path.endswith('.gz' if compression == 'gzip' else '.zst')
+    assert during_first == 100
+
+    # A second run appends a new gzip member or zstd frame to the same file
+    _, during_second = asyncio.run(crawl(100, 150))
+    assert during_second == 50
+    assert state.update_from_edge_list(path) == 0
+
+    graph = CompactGraph.from_edge_list(path)
+    assert graph.number_of_edges() == 150
+    assert len(state.edge_keys) == 150
+
+
+def test_compressed_results_are_merged_and_rotated_names_keep_the_suffix(tmp_path) -> None:
+    results = tmp_path / 'results'
+    results.mkdir()
+    for name, rows in (('run1.csv.gz', [['1', 'A', 'a'], ['2', 'B', 'b']]), ('run2.csv', [['2', 'B', 'b']])):
+        with open_text(results / name, 'w') as file:
+            writer = csv.writer(file)
+            writer.writerow(['Channel ID', 'Channel Name', 'Channel Username'])
+            writer.writerows(rows)
+    (results / 'urls_1.txt.gz').write_bytes(b'')
+
+    merge_csv_files(str(results), str(tmp_path / 'merged'), 'merged.csv')
+
+    with open(tmp_path / 'merged' / 'merged.csv', newline='', encoding='utf-8') as file:
+        assert list(csv.reader(file))[1:] == [['1', 'A', 'a'], ['2', 'B', 'b']]
+    assert rotated_path('EdgeList/Edge_List.csv.gz', 2) == 'EdgeList/Edge_List.002.csv.gz'
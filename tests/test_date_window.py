@@ -0,0 +1,44 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from telegram_snowball_sampling.date_window import DateWindow, parse_date
+
+UTC = datetime.timezone.utc
+
+
+def test_parse_date_formats() -> None:
+    now = datetime.datetime(2024, 6, 30, 12, tzinfo=UTC)
+
+    assert parse_date('') is None
+    assert parse_date('2024-03-01') == datetime.datetime(2024, 3, 1, tzinfo=UTC)
+    assert parse_date('2024-03-01', end=True) == datetime.datetime(2024, 3, 2, tzinfo=UTC)
+    assert parse_date('90d', now=now) == now - datetime.timedelta(days=90)
+    assert parse_date('90', now=now) == now - datetime.timedelta(days=90)
+    with pytest.raises(ValueError):
+        DateWindow.parse('2024-03-02', '2024-03-01')
+
+
+def test_window_reads_from_end_and_stops_at_start() -> None:
+    window = DateWindow.parse('2024-03-01', '2024-03-10')
+    history = [SimpleNamespace(id=i, date=datetime.datetime(2024, 3, i, tzinfo=UTC)) for i in range(31, 0, -1)]
+    requested = {}
+
+    async def iter_messages(**kwargs):
+        requested.update(kwargs)
+        for message in history:
+            if message.date < kwargs['offset_date']:
+                yield message
+
+    async def read():
+        ids = []
+        async for message in iter_messages(**window.iter_kwargs()):
+            if window.before_start(message):
+                break
+            ids.append(message.id)
+        return ids
+
+    assert asyncio.run(read()) == list(range(10, 0, -1))
+    assert requested['offset_date'] == datetime.datetime(2024, 3, 11, tzinfo=UTC)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from telegram_snowball_sampling.dedup import BloomFilter, Deduplicator
+
+
+def test_bloom_filter_respects_error_rate() -> None:
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"https://example.com/{i}")
+
+    assert all(f"https://example.com/{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"https://other.org/{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_deduplicator_switches_to_bloom_and_persists(tmp_path: Path) -> None:
+    path = str(tmp_path / 'filter.npz')
+    dedup = Deduplicator(capacity=1_000, error_rate=0.001, exact_limit=10)
+
+    assert dedup.add('a') and not dedup.add('a')
+    for i in range(20):
+        dedup.add(str(i))
+    assert dedup.exact is None and 'a' in dedup and not dedup.add('5')
+
+    dedup.save(path)
+    loaded = Deduplicator.load(path)
+    assert not loaded.add('a') and loaded.add('new')
+
+    small = Deduplicator()
+    small.add('x')
+    small.save(path)
+    assert 'x' in Deduplicator.load(path) and Deduplicator.load(path).exact == {'x'}
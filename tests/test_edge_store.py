@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+from telegram_snowball_sampling.compact_graph import CompactGraph
+from telegram_snowball_sampling.edge_store import EdgeStore
+from telegram_snowball_sampling.output import OutputService
+
+
+def row(source, target, connection_type='forward', weight=1, name=None):
+    return [source, name or f'Channel {source}', source.lower(), target, f'Channel {target}', target.lower(),
+            connection_type, weight]
+
+
+def write_run(store, iterations, mode='iteration', run_id=None, finish=True):
+    async def crawl():
+        async with OutputService() as outputs:
+            partitions = store.begin_run(outputs, {'seeds': ['A']}, mode, run_id)
+            for number, rows in enumerate(iterations, start=1):
+                partitions.start_iteration(number)
+                partitions.writerows(rows)
+        return partitions
+
+    partitions = asyncio.run(crawl())
+    if finish:
+        store.finish_run(partitions)
+    return partitions
+
+
+def edges(graph):
+    src, dst, weights, types = graph.edge_arrays()
+    return sorted((graph.node_ids[s], graph.node_ids[d], float(w), graph.type_names[t])
+                  for s, d, w, t in zip(src, dst, weights, types))
+
+
+def test_runs_are_partitioned_and_selected_from_the_manifest(tmp_path) -> None:
+    store = EdgeStore(str(tmp_path / 'store'))
+    write_run(store, [[row('A', 'B')], [row('B', 'C'), row('B', 'D')], []], run_id='first')
+    write_run(store, [[row('X', 'Y')]], mode='run', run_id='second')
+    write_run(store, [[row('Q', 'R')]], run_id='crashed', finish=False)
+
+    manifest = store.read_manifest()
+    assert {run_id: run['status'] for run_id, run in manifest['runs'].items()} == {
+        'first': 'complete', 'second': 'complete', 'crashed': 'running'}
+    assert manifest['runs']['first']['rows'] == 3
+    assert [(p.name, p.iteration, p.rows) for p in manifest['partitions']] == [
+        ('first_it01', 1, 1), ('first_it02', 2, 2), ('second', None, 1)]
+
+    assert [p.name for p in store.select()] == ['first_it01', 'first_it02', 'second']
+    assert [p.name for p in store.select(runs=['second'])] == ['second']
+    # Runs not split by iteration cannot be sliced by iteration
+    assert [p.name for p in store.select(iterations=[2])] == ['first_it02']
+    assert [r[3] for r in store.iter_rows(store.select(runs=['first'], iterations=[2]))] == ['C', 'D']
+
+
+def test_compaction_folds_a_run_into_a_segment_with_the_same_graph(tmp_path) -> None:
+    store = EdgeStore(str(tmp_path / 'store'))
+    iterations = [
+        [row('A', 'B'), row('A', 'B'), row('A', 'B', 'recommendation'), row('B', 'C', weight=3)],
+        [row('A', 'B'), row('C', 'A', 'telegram_link'), row('B', 'C', name='Renamed B')],
+    ]
+    write_run(store, iterations, run_id='run')
+    before = CompactGraph.from_rows(store.iter_rows(store.select()))
+
+    [segment] = store.compact()
+
+    assert segment.kind == 'segment' and segment.sources == ['run_it01', 'run_it02']
+    assert segment.rows == 4
+    assert os.listdir(tmp_path / 'store' / 'partitions') == []
+    assert [p.name for p in store.read_manifest()['partitions']] == ['run']
+    assert edges(CompactGraph.from_rows(store.iter_rows(store.select()))) == edges(before)
+    segment_rows = list(store.iter_rows([segment]))
+    assert segment_rows[-1][:3] == ['B', 'Renamed B', 'b'] and segment_rows[-1][7] == '4'
+    assert store.compact() == []
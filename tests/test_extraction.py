@@ -0,0 +1,47 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from telethon.tl.types import MessageEntityBold, MessageEntityTextUrl, MessageEntityUrl
+
+from telegram_snowball_sampling.extraction import ExtractionExecutor
+from telegram_snowball_sampling.urls import classify_url, extract_urls, message_payload
+
+
+def make_messages():
+    messages = []
+    for number in range(20):
+        # The emoji takes two UTF-16 code units, which entity offsets count
+        prefix = f"🔥 news {number} "
+        text = f"{prefix}example.com/a?utm_source=x and t.me/chan{number % 4}x"
+        offset = len(prefix.encode('utf-16-le')) // 2
+        entities = [MessageEntityBold(0, 2), MessageEntityUrl(offset=offset, length=26),
+                    MessageEntityTextUrl(offset=0, length=2, url=f"https://site{number % 3}.org/")]
+        messages.append(SimpleNamespace(message=text, entities=entities if number % 2 else None))
+    messages.append(SimpleNamespace(message='', entities=None))
+    return messages
+
+
+async def extract(executor, messages):
+    async def payloads():
+        for message in messages:
+            payload = message_payload(message)
+            if payload is not None:
+                yield payload
+
+    try:
+        return [urls async for urls in executor.extract(payloads())]
+    finally:
+        executor.close()
+
+
+@pytest.mark.parametrize('kind', ['process', 'thread'])
+def test_pool_extraction_matches_inline_in_order(kind) -> None:
+    messages = make_messages()
+    expected = [[classify_url(url) for url in extract_urls(message)] for message in messages if message.message]
+    assert expected[1][0][0] == 'https://example.com/a'
+
+    executor = ExtractionExecutor(workers=2, kind=kind, batch_size=3)
+    assert asyncio.run(extract(executor, messages)) == expected
+    assert asyncio.run(extract(ExtractionExecutor(), messages)) == expected
+    assert executor.summary()['batches'] == 7
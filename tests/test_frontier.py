@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import pytest
+from telethon.tl.types import PeerChannel
+
+from telegram_snowball_sampling.frontier import FifoFrontier, Frontier, PriorityFrontier, channel_key
+
+
+def test_priority_frontier_orders_by_score_and_updates() -> None:
+    frontier = PriorityFrontier()
+    frontier.add('a', key='1', mentions=5)
+    frontier.add('b', key='2', mentions=50)
+    frontier.add('c', key='3', mentions=5, depth=2)
+
+    assert not frontier.add('a-again', key='1', mentions=500, referrers=3)
+    assert len(frontier) == 3
+    assert [frontier.pop() for _ in range(3)] == ['a', 'b', 'c']
+    assert not frontier
+
+
+def test_fifo_frontier_dedupes_and_removes() -> None:
+    frontier = FifoFrontier()
+    for item in ['x', PeerChannel(7), 'X', 'y']:
+        frontier.add(item)
+    frontier.remove('y')
+
+    assert '7' in frontier and channel_key('@X') == 'x'
+    assert [frontier.pop(), frontier.pop()] == ['x', PeerChannel(7)]
+    assert len(frontier) == 0
+
+
+def test_incomplete_frontier_cannot_be_created() -> None:
+    class Incomplete(Frontier):
+        def _push(self, entry):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import numpy as np
+
+from telegram_snowball_sampling.graph_algorithms import label_propagation, pagerank
+
+
+def test_pagerank_matches_reference_and_warm_starts() -> None:
+    # 0 -> 1 -> 2 -> 0 cycle plus a dangling node 3 pointed to by 0
+    src = np.array([0, 1, 2, 0])
+    dst = np.array([1, 2, 0, 3])
+
+    rank, iterations = pagerank(src, dst, 4, tol=1e-12)
+    warm_rank, warm_iterations = pagerank(src, dst, 4, tol=1e-12, x0=rank)
+
+    assert abs(rank.sum() - 1.0) < 1e-9
+    assert rank[0] > rank[3]
+    np.testing.assert_allclose(warm_rank, rank, atol=1e-9)
+    assert warm_iterations < iterations
+
+
+def test_label_propagation_finds_planted_communities() -> None:
+    src, dst = [], []
+    for offset in (0, 10):
+        for i in range(10):
+            for j in range(i + 1, 10):
+                src.append(offset + i)
+                dst.append(offset + j)
+    # A single bridge between the two cliques
+    src.append(0)
+    dst.append(10)
+
+    labels = label_propagation(np.array(src), np.array(dst), 20)
+
+    assert len(set(labels[:10])) == 1
+    assert len(set(labels[10:])) == 1
+    assert labels[0] != labels[10]
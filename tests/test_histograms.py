@@ -0,0 +1,60 @@
+import asyncio
+import csv
+import io
+
+from telegram_snowball_sampling.config import Config
+from telegram_snowball_sampling.crawler import process_channels
+from telegram_snowball_sampling.histograms import DAY, ChannelHistogram, HistogramStore
+from tests.test_replay import CHANNELS, LiveClient, make_posts
+
+
+class CountingClient(LiveClient):
+    def __init__(self) -> None:
+        self.reads = 0
+
+    async def iter_messages(self, entity, limit=None, **kwargs):
+        self.reads += 1
+        async for message in super().iter_messages(entity, limit, **kwargs):
+            yield message
+
+
+async def crawl(client, tmp_path, histograms) -> list[list[str]]:
+    edges = io.StringIO()
+    await process_channels(client, str(tmp_path / 'results.csv'), ['chan1'], 3, min_mentions=2,
+                           recommendations_depth=1, include_urls=False, edge_list_writer=csv.writer(edges),
+                           histograms=histograms)
+    return sorted(csv.reader(io.StringIO(edges.getvalue())))
+
+
+def test_stored_histograms_replace_rescans(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(Config, 'SAVE_RAW_URLS', False)
+    store = HistogramStore(str(tmp_path / 'histograms.sqlite'))
+
+    first = CountingClient()
+    live_edges = asyncio.run(crawl(first, tmp_path, store))
+    second = CountingClient()
+    reused_edges = asyncio.run(crawl(second, tmp_path, store))
+
+    assert first.reads > 0 and second.reads == 0
+    assert reused_edges == live_edges
+    assert store.summary()['reused'] == first.reads
+
+
+def test_histogram_counts_and_freshness(tmp_path) -> None:
+    store = HistogramStore(str(tmp_path / 'histograms.sqlite'), max_age_days=1)
+    histogram = ChannelHistogram(1)
+    for message in make_posts(1):
+        histogram.add_message(message)
+        if message.forward:
+            histogram.add_forward(message.forward.chat, message)
+    store.save(histogram, 'scope', now=0)
+
+    loaded = store.load(1)
+    assert loaded.messages == 12 and (loaded.newest_id, loaded.oldest_id) == (12, 1)
+    source = loaded.sources[CHANNELS[3].id]
+    assert (source.count, source.first_id, source.last_id) == (2, 1, 7)
+    assert store.inbound(CHANNELS[3].id) == {1: 2}
+
+    assert store.fresh(1, 'scope', now=DAY / 2) is not None
+    assert store.fresh(1, 'other scope', now=DAY / 2) is None
+    assert store.fresh(1, 'scope', now=2 * DAY) is None
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import base64
+import json
+from pathlib import Path
+
+import numpy as np
+
+from telegram_snowball_sampling.html_viewer import build_viewer_payload, write_html_viewer
+
+
+def test_viewer_payload_encodes_binary_arrays(tmp_path: Path) -> None:
+    positions = np.array([[0.0, 0.5], [1.0, 0.25], [0.5, 1.0]])
+    payload = build_viewer_payload(
+        ['A (@a)', 'B', 'https://example.com'],
+        positions,
+        np.array([0, 0, 1]),
+        np.array([1, 2, 2]),
+        ['forward', 'outbound_link', 'forward'],
+        communities=np.array([0, 0, 1]),
+        centrality=np.array([0.2, 0.5, 0.3]),
+        edge_weights=np.array([1.0, 5.0, 3.0]),
+        max_edges=2,
+    )
+
+    assert payload['nodeCount'] == 3
+    assert payload['edgeCount'] == 2
+    np.testing.assert_allclose(
+        np.frombuffer(base64.b64decode(payload['positions']), dtype='<f4').reshape(-1, 2), positions)
+    edges = np.frombuffer(base64.b64decode(payload['edges']), dtype='<u4').reshape(-1, 2)
+    assert edges.tolist() == [[0, 2], [1, 2]]
+    assert base64.b64decode(payload['labels']).decode('utf-8').split('\n')[2] == 'https://example.com'
+
+    output = tmp_path / 'viewer.html'
+    write_html_viewer(str(output), payload, title='Test </script>')
+    html = output.read_text(encoding='utf-8')
+    embedded = html.split('<script id="graph-data" type="application/json">')[1].split('</script>')[0]
+
+    assert json.loads(embedded)['typeNames'] == ['forward', 'outbound_link']
+    # The page must not load anything from the network
+    assert 'src="http' not in html
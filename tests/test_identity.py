@@ -0,0 +1,37 @@
+import datetime
+
+from telethon.tl.types import Channel, ChatPhotoEmpty, PeerChannel
+
+from telegram_snowball_sampling.frontier import PriorityFrontier
+from telegram_snowball_sampling.identity import ChannelRegistry
+
+
+def make_channel(channel_id: int, username: str) -> Channel:
+    return Channel(id=channel_id, title=username.title(), photo=ChatPhotoEmpty(),
+                   date=datetime.datetime(2024, 1, 1), username=username, access_hash=1)
+
+
+def test_aliases_map_to_one_identity() -> None:
+    registry = ChannelRegistry()
+    channel = make_channel(42, 'SomeChannel')
+    registry.register(channel, 'https://t.me/somechannel')
+
+    for alias in (channel, PeerChannel(42), 42, '42', '@somechannel', 'SomeChannel', 'https://t.me/somechannel'):
+        assert registry.resolve_id(alias) == 42
+        assert registry.key(alias) == '42'
+    assert registry.key('@Unknown') == 'unknown'
+
+    assert registry.cached('@SomeChannel') is channel
+    assert registry.cached('unknown') is None
+    assert registry.summary()['duplicate_fetches_prevented'] == 1
+
+
+def test_frontier_with_registry_queues_a_channel_once() -> None:
+    registry = ChannelRegistry()
+    registry.register(make_channel(7, 'seven'))
+    frontier = PriorityFrontier(key=registry.key)
+
+    assert frontier.add('@Seven')
+    assert not frontier.add(PeerChannel(7), mentions=3)
+    assert not frontier.add('7')
+    assert len(frontier) == 1 and frontier.entries()[0].mentions == 3
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from telegram_snowball_sampling.layout import (
+    coarsen_graph,
+    load_layout_cache,
+    multilevel_layout,
+    rasterize_graph,
+    save_layout_cache,
+)
+
+
+def two_cliques(size: int) -> tuple[np.ndarray, np.ndarray]:
+    src, dst = [], []
+    for offset in (0, size):
+        for i in range(size):
+            for j in range(i + 1, size):
+                src.append(offset + i)
+                dst.append(offset + j)
+    return np.array(src), np.array(dst)
+
+
+def test_multilevel_layout_separates_components() -> None:
+    src, dst = two_cliques(30)
+    positions = multilevel_layout(src, dst, 60, iterations=40, coarsest_size=10)
+
+    assert positions.shape == (60, 2)
+    assert np.isfinite(positions).all()
+    gap = np.linalg.norm(positions[:30].mean(axis=0) - positions[30:].mean(axis=0))
+    spread = max(positions[:30].std(axis=0).max(), positions[30:].std(axis=0).max())
+    assert gap > 2 * spread
+
+
+def test_coarsen_graph_collapses_star() -> None:
+    src = np.zeros(50, dtype=np.int64)
+    dst = np.arange(1, 51)
+    mapping, coarse_n = coarsen_graph(src, dst, np.ones(50), 51, np.random.default_rng(0))
+
+    assert coarse_n == 1
+    assert (mapping == 0).all()
+
+
+def test_layout_cache_round_trip_places_new_nodes(tmp_path: Path) -> None:
+    path = str(tmp_path / 'layout.npz')
+    positions = np.array([[0.0, 0.0], [1.0, 1.0]])
+    save_layout_cache(path, ['a', 'b'], positions, 'fp')
+
+    cached, coverage, fingerprint = load_layout_cache(path, ['b', 'a', 'c'])
+
+    assert fingerprint == 'fp'
+    assert coverage == 2 / 3
+    np.testing.assert_allclose(cached[:2], [[1.0, 1.0], [0.0, 0.0]])
+    assert np.isfinite(cached[2]).all()
+
+
+def test_rasterize_graph_draws_edges_and_nodes() -> None:
+    positions = np.array([[0.0, 0.0], [1.0, 1.0]])
+    image = rasterize_graph(positions, np.array([0]), np.array([1]),
+                            edge_colors=np.array([[1.0, 0.0, 0.0]]), width=64, height=48, margin=4)
+
+    assert image.shape == (48, 64, 3)
+    assert image.min() < 1.0
+    assert image.max() <= 1.0
+
+
+def test_rasterize_graph_batches_match_a_single_pass() -> None:
+    rng = np.random.default_rng(3)
+    positions = rng.random((50, 2))
+    src, dst = rng.integers(0, 50, 400), rng.integers(0, 50, 400)
+    colors = rng.random((400, 3))
+
+    whole = rasterize_graph(positions, src, dst, edge_colors=colors, width=80, height=80)
+    batched = rasterize_graph(positions, src, dst, edge_colors=colors, width=80, height=80,
+                              chunk_size=150, max_samples_per_batch=100)
+
+    np.testing.assert_allclose(batched, whole)
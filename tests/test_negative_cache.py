@@ -0,0 +1,56 @@
+from telethon.errors import ChannelPrivateError, FloodWaitError, UsernameNotOccupiedError
+
+from telegram_snowball_sampling.frontier import FifoFrontier
+from telegram_snowball_sampling.negative_cache import DAY, NegativeCache
+from telegram_snowball_sampling.utils import remove_inaccessible_channels
+
+
+def test_retry_policy_and_persistence(tmp_path) -> None:
+    path = tmp_path / 'negative_cache.json'
+    cache = NegativeCache(str(path))
+
+    assert cache.add('100', ChannelPrivateError(None), name='Private Channel', now=0)
+    assert cache.add('ghost', 'invalid', now=0)
+    assert not cache.add('200', FloodWaitError(None, capture=5), now=0)
+    cache.save()
+
+    loaded = NegativeCache.load(str(path))
+    assert loaded.blocked('100', now=29 * DAY)
+    assert not loaded.blocked('100', now=31 * DAY)
+    assert loaded.blocked('ghost', now=1000 * DAY)
+    assert not loaded.blocked('200')
+    assert loaded.blocked_ids(now=29 * DAY) == ['100'] and loaded.blocked_ids(now=31 * DAY) == []
+    assert loaded.summary() == {'channels': 2, 'requests_avoided': 2, 'private': 1, 'invalid': 1}
+
+
+def test_frontier_skips_cached_channels() -> None:
+    cache = NegativeCache()
+    cache.add('dead', 'private')
+    frontier = FifoFrontier(exclude=cache.blocked)
+
+    assert not frontier.add('@Dead')
+    assert frontier.add('alive')
+    assert list(frontier) == ['alive']
+
+
+def test_only_lookup_errors_are_cached_and_successes_are_forgotten(tmp_path) -> None:
+    cache = NegativeCache()
+    try:
+        try:
+            raise UsernameNotOccupiedError(None)
+        except UsernameNotOccupiedError as e:
+            raise ValueError('No user has "gone" as username') from e
+    except ValueError as e:
+        assert cache.add('gone', e)
+    assert not cache.add('300', ValueError('Could not find the input entity for PeerChannel'))
+    cache.add('100', 'private', name='Shared Name')
+    cache.add('200', 'private', now=0)
+
+    results = tmp_path / 'results.csv'
+    results.write_text('Channel ID,Channel Name,Channel Username\n100,Shared Name,a\n101,Shared Name,b\n'
+                       '200,Old,c\n')
+    remove_inaccessible_channels(str(results), cache.blocked_ids())
+    assert results.read_text().splitlines()[1:] == ['101,Shared Name,b', '200,Old,c']
+
+    cache.discard('100')
+    assert not cache.blocked('100') and cache.summary()['channels'] == 2
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+from telegram_snowball_sampling.analysis import (
+    calculate_network_metrics,
+    extract_backbone_graph,
+    load_compact_graph,
+    load_edge_list,
+)
+
+
+def write_edge_list(path: Path, rows: list[list[str]]) -> None:
+    with path.open('w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['From_Channel_ID', 'From_Channel_Name', 'From_Channel_Username',
+                         'To_Channel_ID', 'To_Channel_Name', 'To_Channel_Username',
+                         'ConnectionType', 'Weight'])
+        writer.writerows(rows)
+
+
+def test_load_edge_list_sums_repeated_rows(tmp_path: Path) -> None:
+    path = tmp_path / 'edges.csv'
+    write_edge_list(path, [
+        ['1', 'A', 'a', '2', 'B', 'b', 'forward', '1'],
+        ['1', 'A', 'a', '2', 'B', 'b', 'forward', '1'],
+        ['2', 'B', 'b', '3', 'C', 'c', 'recommendation', '1'],
+    ])
+
+    G = load_edge_list(str(path))
+
+    assert G.number_of_edges() == 2
+    assert G.edges['1', '2']['weight'] == 2.0
+    assert G.nodes['3']['name'] == 'C'
+
+
+def test_extract_backbone_graph_drops_isolated_nodes(tmp_path: Path) -> None:
+    path = tmp_path / 'edges.csv'
+    write_edge_list(path, [
+        ['1', 'A', 'a', '2', 'B', 'b', 'forward', '10'],
+        ['1', 'A', 'a', '3', 'C', 'c', 'forward', '1'],
+        ['1', 'A', 'a', '4', 'D', 'd', 'forward', '1'],
+    ])
+
+    backbone = extract_backbone_graph(load_edge_list(str(path)), edge_budget=1)
+
+    assert list(backbone.edges()) == [('1', '2')]
+    assert backbone.nodes['2']['username'] == 'b'
+
+
+def test_compact_metrics_match_networkx(tmp_path: Path) -> None:
+    path = tmp_path / 'edges.csv'
+    write_edge_list(path, [
+        ['1', 'A', 'a', '2', 'B', 'b', 'forward', '1'],
+        ['2', 'B', 'b', '1', 'A', 'a', 'forward', '1'],
+        ['2', 'B', 'b', '3', 'C', 'c', 'recommendation', '1'],
+        ['4', 'D', 'd', '5', 'E', 'e', 'outbound_link', '1'],
+    ])
+
+    compact = calculate_network_metrics(load_compact_graph(str(path)))
+    expected = calculate_network_metrics(load_edge_list(str(path)))
+
+    assert compact == expected
@@ -0,0 +1,54 @@
+import asyncio
+import csv
+
+from telegram_snowball_sampling.output import OutputService, rotated_path
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        return list(csv.reader(file))
+
+
+def test_concurrent_rows_are_written_whole_and_rotated(tmp_path) -> None:
+    path = str(tmp_path / 'edges.csv')
+
+    async def write(sink, task):
+        for number in range(50):
+            sink.writerow([task, number, 'x' * 20])
+            await asyncio.sleep(0)
+
+    async def run():
+        async with OutputService(batch_size=7, fsync='batch', rotate_mb=2 / 1024) as outputs:
+            sink = outputs.open(path, ['Task', 'Number', 'Text'])
+            await asyncio.gather(*(write(sink, task) for task in range(4)))
+            await outputs.flush()
+            return sink.summary()
+
+    summary = asyncio.run(run())
+    assert summary['rows'] == 200 and summary['rotations'] >= 1
+
+    files = [rotated_path(path, number) for number in range(1, summary['rotations'] + 1)] + [path]
+    rows = [row for file in files for row in read_rows(file)[1:]]
+    assert all(read_rows(file)[0] == ['Task', 'Number', 'Text'] for file in files)
+    assert sorted((int(task), int(number)) for task, number, _ in rows) == [
+        (task, number) for task in range(4) for number in range(50)]
+
+
+def test_rows_are_flushed_when_cancelled(tmp_path) -> None:
+    path = str(tmp_path / 'results.csv')
+
+    async def crawl(sink):
+        sink.writerow(['1', 'Channel', 'chan'])
+        await asyncio.sleep(3600)
+
+    async def run():
+        outputs = OutputService()
+        try:
+            await asyncio.wait_for(crawl(outputs.open(path)), timeout=0.05)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await outputs.close()
+
+    asyncio.run(run())
+    assert read_rows(path) == [['1', 'Channel', 'chan']]
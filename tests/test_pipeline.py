@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from telegram_snowball_sampling.pipeline import STOP, Pipeline
+
+
+async def numbers(count, fetched, error_at=None):
+    for number in range(count):
+        if number == error_at:
+            raise RuntimeError('fetch failed')
+        fetched.append(number)
+        yield number
+
+
+def run(source, written, stop_at=None, read_ahead=None):
+    async def parse(number, emit):
+        await emit(number * 10)
+        if number == stop_at:
+            return STOP
+
+    async def write(value, emit):
+        await asyncio.sleep(0)
+        written.append(value)
+
+    pipeline = Pipeline(queue_size=2)
+    asyncio.run(pipeline.run(source, [('parse', parse), ('write', write)], read_ahead=read_ahead))
+    return pipeline.summary()
+
+
+def test_stages_keep_order_and_stop() -> None:
+    fetched, written = [], []
+    summary = run(numbers(50, fetched), written, stop_at=9, read_ahead=lambda: 10)
+    assert written == [number * 10 for number in range(10)]
+    # The producer never reads past the read-ahead limit
+    assert fetched == list(range(10))
+    assert summary['parse']['items'] == 10 and summary['write']['max_queue'] <= 2
+
+
+def test_source_error_after_draining() -> None:
+    fetched, written = [], []
+    with pytest.raises(RuntimeError):
+        run(numbers(50, fetched, error_at=5), written)
+    # Items read before the error are still handled by every stage
+    assert written == [number * 10 for number in range(5)]
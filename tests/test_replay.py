@@ -0,0 +1,70 @@
+import asyncio
+import csv
+import datetime
+import io
+from types import SimpleNamespace
+
+from telethon.tl.types import Channel, ChatPhotoEmpty, MessageFwdHeader, PeerChannel
+
+from telegram_snowball_sampling.archive import MessageArchive
+from telegram_snowball_sampling.config import Config
+from telegram_snowball_sampling.crawler import process_channels
+from telegram_snowball_sampling.replay import ReplayClient
+
+UTC = datetime.timezone.utc
+CHANNELS = {i: Channel(id=i, title=f"Channel {i}", photo=ChatPhotoEmpty(), date=datetime.datetime(2024, 1, 1),
+                       username=f"chan{i}", broadcast=True, access_hash=1) for i in range(1, 7)}
+
+
+def make_posts(channel_id: int) -> list[SimpleNamespace]:
+    posts = []
+    for message_id in range(12, 0, -1):
+        source = CHANNELS[(channel_id + message_id % 3) % 6 + 1] if message_id % 2 else None
+        posts.append(SimpleNamespace(
+            id=message_id, date=datetime.datetime(2024, 5, message_id, tzinfo=UTC),
+            message=f"post https://example.com/{message_id}", entities=None, grouped_id=None,
+            fwd_from=MessageFwdHeader(date=datetime.datetime(2024, 4, 1), from_id=PeerChannel(source.id)) if source else None,
+            forward=SimpleNamespace(chat=source) if source else None,
+        ))
+    return posts
+
+
+class LiveClient:
+    """Minimal stand-in for TelegramClient."""
+
+    async def get_entity(self, reference):
+        if isinstance(reference, Channel):
+            return reference
+        if isinstance(reference, PeerChannel):
+            return CHANNELS[reference.channel_id]
+        return next(c for c in CHANNELS.values() if c.username == str(reference).lstrip('@').lower())
+
+    async def iter_messages(self, entity, limit=None, **kwargs):
+        for message in make_posts(entity.id)[:limit]:
+            yield message
+
+    async def __call__(self, request):
+        return SimpleNamespace(chats=[CHANNELS[request.channel.id % 6 + 1]])
+
+
+async def crawl(client, tmp_path, archive=None) -> list[list[str]]:
+    edges = io.StringIO()
+    await process_channels(client, str(tmp_path / 'results.csv'), ['chan1'], 3, min_mentions=2,
+                           recommendations_depth=1, edge_list_writer=csv.writer(edges), archive=archive)
+    return sorted(csv.reader(io.StringIO(edges.getvalue())))
+
+
+def test_replay_reproduces_live_crawl(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(Config, 'SAVE_RAW_URLS', False)
+    monkeypatch.setattr(Config, 'URL_DEDUP_FILE', '')
+
+    archive = MessageArchive(str(tmp_path / 'archive'))
+    live_edges = asyncio.run(crawl(LiveClient(), tmp_path, archive))
+    archive.close()
+
+    replay = ReplayClient(MessageArchive(str(tmp_path / 'archive')))
+    replay_edges = asyncio.run(crawl(replay, tmp_path))
+
+    assert live_edges and replay_edges == live_edges
+    assert {row[6] for row in live_edges} == {'forward', 'recommendation', 'outbound_link'}
+    assert replay.summary()['missing_channels'] == 0
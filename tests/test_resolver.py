@@ -0,0 +1,77 @@
+import asyncio
+import datetime
+
+from telethon.errors import ServerError, UsernameNotOccupiedError
+from telethon.sessions import MemorySession
+from telethon.tl.functions.channels import GetChannelsRequest
+from telethon.tl.functions.contacts import ResolveUsernameRequest
+from telethon.tl.types import Channel, ChatPhotoEmpty, PeerChannel, contacts
+
+from telegram_snowball_sampling.frontier import PriorityFrontier
+from telegram_snowball_sampling.negative_cache import NegativeCache
+from telegram_snowball_sampling.resolver import EntityResolver
+
+
+def make_channel(channel_id: int) -> Channel:
+    return Channel(id=channel_id, title=f"Channel {channel_id}", photo=ChatPhotoEmpty(),
+                   date=datetime.datetime(2024, 1, 1), username=f"chan{channel_id}", access_hash=channel_id * 7)
+
+
+class FakeClient:
+    def __init__(self, channels: list[Channel]) -> None:
+        self.channels = {channel.id: channel for channel in channels}
+        self.session = MemorySession()
+        self.session.process_entities(type('Result', (), {'chats': channels, 'users': []})())
+        self.requests = []
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        if isinstance(request, GetChannelsRequest):
+            return type('Chats', (), {'chats': [self.channels[c.channel_id] for c in request.id]})()
+        if isinstance(request, ResolveUsernameRequest):
+            if request.username == 'flaky':
+                raise ServerError(request, 'INTERNAL', 500)
+            for channel in self.channels.values():
+                if channel.username == request.username:
+                    return contacts.ResolvedPeer(peer=PeerChannel(channel.id), chats=[channel], users=[])
+            raise UsernameNotOccupiedError(request)
+        raise AssertionError(request)
+
+
+def test_resolve_frontier_in_bulk() -> None:
+    channels = [make_channel(i) for i in range(1, 251)]
+    client = FakeClient(channels)
+    frontier = PriorityFrontier()
+    for channel_id in range(1, 251):
+        frontier.add(PeerChannel(channel_id))
+    frontier.add('@Chan5')
+    frontier.add('missing_channel')
+
+    resolver = EntityResolver(client)
+    asyncio.run(resolver.resolve_frontier(frontier, processed_ids={1, 2}))
+
+    get_channels = [r for r in client.requests if isinstance(r, GetChannelsRequest)]
+    assert [len(r.id) for r in get_channels] == [100, 100, 48]
+    assert '1' not in frontier and 'missing_channel' not in frontier
+    assert all(isinstance(item, Channel) for item in frontier)
+    # '@Chan5' is merged into the entry of channel 5
+    assert len(frontier) == 248 and 'chan5' not in frontier
+    assert resolver.summary() == {'bulk_requests': 5, 'resolved': 249, 'inaccessible': 1, 'skipped_processed': 2}
+
+    # Nothing left to resolve: no further requests
+    asyncio.run(resolver.resolve_frontier(frontier, processed_ids=set()))
+    assert len(client.requests) == 5
+
+
+def test_transient_username_errors_are_not_cached() -> None:
+    frontier = PriorityFrontier()
+    frontier.add('flaky')
+    frontier.add('missing_channel')
+    cache = NegativeCache()
+
+    asyncio.run(EntityResolver(FakeClient([]), negative_cache=cache).resolve_frontier(frontier, processed_ids=set()))
+
+    # The server error leaves the channel queued for its individual lookup
+    assert list(frontier) == ['flaky']
+    assert 'flaky' not in cache
+    assert cache.entries['missing_channel']['error'] == 'not_found'
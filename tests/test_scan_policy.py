@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from telegram_snowball_sampling.scan_policy import ScanPolicy
+
+
+def scan_length(policy: ScanPolicy, new_source_every: int | None, available: int = 10_000) -> int:
+    scan = policy.start()
+    for i in range(1, available + 1):
+        if not scan.record(new_source_every is not None and i % new_source_every == 0):
+            break
+    policy.finish(scan)
+    return scan.count
+
+
+def test_adaptive_policy_stops_saturated_and_extends_productive_channels() -> None:
+    policy = ScanPolicy(max_posts=300, adaptive=True, window=100)
+
+    assert scan_length(policy, None) == 100
+    assert scan_length(policy, 10) == 1200
+    assert policy.summary() == {'channels': 2, 'messages': 1300, 'stopped_saturated': 1, 'extensions': 3}
+
+
+def test_fixed_policy_reads_max_posts() -> None:
+    policy = ScanPolicy(max_posts=300, adaptive=False)
+
+    assert scan_length(policy, None) == 300
+    assert scan_length(ScanPolicy(None, adaptive=False), None, available=500) == 500
@@ -0,0 +1,72 @@
+import asyncio
+import csv
+import io
+
+import pytest
+
+from telegram_snowball_sampling.config import Config
+from telegram_snowball_sampling.crawler import process_channels
+from telegram_snowball_sampling.edge_store import EdgeStore
+from telegram_snowball_sampling.sweep import RESULTS_COLUMNS, SweepRecorder, parse_thresholds, sweep_directory
+from tests.test_replay import LiveClient
+
+
+async def crawl(tmp_path, name, min_mentions, sweep_thresholds=None):
+    results_path = tmp_path / name / 'results.csv'
+    results_path.parent.mkdir()
+    results_path.write_text('Channel ID,Channel Name,Channel Username\n', encoding='utf-8')
+    edges = io.StringIO()
+    _, _, channel_counts, _ = await process_channels(
+        LiveClient(), str(results_path), ['chan1'], 3, min_mentions=min_mentions, recommendations_depth=1,
+        edge_list_writer=csv.writer(edges), sweep_thresholds=sweep_thresholds)
+    with open(results_path, newline='', encoding='utf-8') as file:
+        results = sorted(csv.reader(file))
+    return results, sorted(csv.reader(io.StringIO(edges.getvalue()))), channel_counts
+
+
+def read_sorted(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        return sorted(csv.reader(file))
+
+
+def test_sweep_matches_separate_crawls(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(Config, 'SAVE_RAW_URLS', False)
+    monkeypatch.setattr(Config, 'URL_DEDUP_FILE', '')
+
+    loose = asyncio.run(crawl(tmp_path, 'sweep', 2, sweep_thresholds=[4, 6]))
+    assert loose == asyncio.run(crawl(tmp_path, 'min2', 2))
+
+    for threshold in (4, 6):
+        results, edges, _ = asyncio.run(crawl(tmp_path, f'min{threshold}', threshold))
+        directory = sweep_directory(str(tmp_path / 'sweep' / 'results.csv'), threshold)
+        assert read_sorted(f"{directory}/results.csv") == results
+        # The derived edge list has a header; the crawl writer above did not
+        assert read_sorted(f"{directory}/{Config.EDGE_LIST_FILENAME}")[:-1] == edges
+    assert len(edges) < len(loose[1])
+
+
+def test_parse_thresholds() -> None:
+    assert parse_thresholds(' 10, 5,,10 ') == [5, 10]
+    assert parse_thresholds('') == []
+    with pytest.raises(ValueError):
+        parse_thresholds('0')
+
+
+def test_sweep_drops_blocked_channels_and_writes_store_runs(tmp_path) -> None:
+    recorder = SweepRecorder(iterations=1, thresholds=[2])
+    recorder.start_channel('1', 'One', 'one', seed=True)
+    for source in ('2', '3', '2', '3'):
+        recorder.add_forward(source)
+    recorder.add_source('2', 'Two', 'two')
+    recorder.add_source('3', 'Three', 'three')
+    store = EdgeStore(str(tmp_path / 'store'))
+    run = store.begin_run(None, {'min_mentions': 1})
+
+    results_path = tmp_path / 'results.csv'
+    recorder.write(str(results_path), 'Edge_List.csv', exclude=['3'], store_run=run)
+
+    directory = sweep_directory(str(results_path), 2)
+    assert read_sorted(f"{directory}/results.csv") == [['2', 'Two', 'two'], RESULTS_COLUMNS]
+    derived = f"{run.run_id}_min2"
+    assert store.read_manifest()['runs'][derived]['params'] == {'min_mentions': 2, 'sweep_of': run.run_id}
+    assert sorted(row[0] for row in store.iter_rows(store.select(runs=[derived]))) == ['2', '3']
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+from pathlib import Path
+from types import SimpleNamespace
+
+from telegram_snowball_sampling.dedup import Deduplicator
+from telegram_snowball_sampling.recommendations import process_urls
+from telegram_snowball_sampling.urls import (
+    UrlAggregator,
+    UrlStore,
+    canonicalize_url,
+    telegram_channel_from_url,
+)
+
+
+def test_canonicalize_url_removes_tracking_and_noise() -> None:
+    assert canonicalize_url('HTTPS://WWW.Example.com/Path?utm_source=tg&id=5&fbclid=x#top).') == \
+        'https://example.com/Path?id=5'
+    assert canonicalize_url('https://example.com/') == 'https://example.com'
+    assert canonicalize_url('http://example.com:80/a') == 'http://example.com/a'
+    assert canonicalize_url('https://en.wikipedia.org/wiki/Foo_(bar)') == 'https://en.wikipedia.org/wiki/Foo_(bar)'
+    assert canonicalize_url('https://localhost/x') is None
+
+
+def test_telegram_links_are_unwrapped() -> None:
+    assert telegram_channel_from_url('https://t.me/SomeChannel/123') == 'somechannel'
+    assert telegram_channel_from_url('https://t.me/s/somechannel') == 'somechannel'
+    assert telegram_channel_from_url('https://t.me/c/1234567/89') == '1234567'
+    assert telegram_channel_from_url('https://t.me/joinchat/AbCdEf') is None
+    assert telegram_channel_from_url('https://t.me/+AbCdEf') is None
+
+
+def test_aggregator_and_store(tmp_path: Path) -> None:
+    aggregator = UrlAggregator()
+    for url in ['https://example.com/a?utm_medium=x', 'https://www.example.com/a', 'https://news.org/b',
+                'https://t.me/somechannel/5', 'https://t.me/joinchat/abc']:
+        aggregator.add(url)
+
+    assert aggregator.domains == {'example.com': 2, 'news.org': 1}
+    assert aggregator.telegram_channels == {'somechannel': 1}
+
+    with UrlStore(tmp_path / 'urls.txt') as store:
+        for url in sorted(aggregator.canonical_urls) + ['https://news.org/b']:
+            store.add(url)
+    assert (tmp_path / 'urls.txt').read_text().splitlines() == sorted(aggregator.canonical_urls)
+
+
+def test_url_edges_are_written_every_run_while_urls_are_deduplicated(tmp_path: Path) -> None:
+    class Client:
+        async def iter_messages(self, entity, limit=None, **kwargs):
+            for number in range(3):
+                yield SimpleNamespace(id=number, message=f"see https://example.com/{number % 2}", entities=None)
+
+    channel = SimpleNamespace(id=1, title='One', username='one')
+    shared_filter = Deduplicator()
+    runs = []
+    for run in range(2):
+        edges = io.StringIO()
+        with UrlStore(tmp_path / f'urls_{run}.txt', shared_filter) as store:
+            asyncio.run(process_urls(Client(), channel, csv.writer(edges), store))
+        runs.append(list(csv.reader(io.StringIO(edges.getvalue()))))
+
+    assert runs[0] == runs[1] == [['1', 'One', 'one', 'example.com', 'example.com', 'Unknown', 'outbound_link', '3']]
+    assert len((tmp_path / 'urls_0.txt').read_text().splitlines()) == 2
+    assert (tmp_path / 'urls_1.txt').read_text() == ''